@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Operator's Edge - Affected Test Selection
+Picks the hook test modules a commit can actually break.
+
+The import graph comes from tools/import_analyzer.analyze_project, run
+over the hooks directory and cached in .claude/state/hook_import_graph.json
+together with the mtime of every hook file. A test module is selected if
+it reaches a committed file through imports (the reverse-import closure).
+Deferred imports - lazy_function("module", "name") - count as imports.
+
+Whenever the answer could be wrong, the selection is a full run:
+  - git or the analyzer is unavailable
+  - the cached graph is stale and cannot be rebuilt
+  - a committed hook file is not in the graph (data files, deletions)
+
+The changes considered are everything since the last passing run, so a
+failing commit keeps its tests selected until they pass again.
+"""
+import ast
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from state_utils import atomic_write_text, get_project_dir, get_state_dir
+
+GIT_TIMEOUT_SECONDS = 10
+TEST_PATTERN = re.compile(r"^test_.*\.py$")
+
+
+@dataclass
+class Selection:
+    """Which test modules to run; modules is None for a full run."""
+    modules: Optional[List[str]]
+    total: int
+    reason: str = ""
+    commit: Optional[str] = None
+
+    @property
+    def full(self) -> bool:
+        return self.modules is None
+
+    def describe(self, saved_seconds: Optional[float] = None) -> str:
+        if self.full:
+            return f"full run: {self.reason}" if self.reason else "full run"
+        text = f"{len(self.modules)}/{self.total} test modules affected"
+        if saved_seconds is not None and saved_seconds >= 1:
+            text += f", ~{saved_seconds:.0f}s saved"
+        return text
+
+
+# =============================================================================
+# PERSISTED STATE
+# =============================================================================
+
+def get_graph_file() -> Path:
+    return get_state_dir() / "hook_import_graph.json"
+
+
+def get_selection_state_file() -> Path:
+    return get_state_dir() / "affected_tests.json"
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def load_selection_state() -> Dict[str, Any]:
+    """{"last_passed_commit": sha, "full_run_seconds": float}"""
+    return _read_json(get_selection_state_file()) or {}
+
+
+def record_run(selection: Selection, success: bool, duration: float) -> Optional[float]:
+    """
+    Remember a finished run; returns the seconds saved against a full run.
+
+    Only passing runs advance last_passed_commit.
+    """
+    if selection.commit is None:
+        return None
+    state = load_selection_state()
+    saved = None
+    if selection.full:
+        state["full_run_seconds"] = round(duration, 2)
+    elif isinstance(state.get("full_run_seconds"), (int, float)):
+        saved = max(0.0, state["full_run_seconds"] - duration)
+    if success:
+        state["last_passed_commit"] = selection.commit
+    try:
+        atomic_write_text(get_selection_state_file(), json.dumps(state, indent=2))
+    except OSError:
+        pass
+    return saved
+
+
+# =============================================================================
+# GIT
+# =============================================================================
+
+def _git(args: List[str], cwd: str) -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git"] + args,
+            capture_output=True,
+            text=True,
+            timeout=GIT_TIMEOUT_SECONDS,
+            cwd=cwd,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0 or not isinstance(result.stdout, str):
+        return None
+    return result.stdout
+
+
+def changed_files(hooks_dir: str, since: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Files changed by the last commit, or since `since` if it is an ancestor.
+
+    Returns {"head": sha, "files": [absolute paths]} or None without git.
+    """
+    out = _git(["rev-parse", "--show-toplevel", "HEAD"], hooks_dir)
+    lines = out.split("\n") if out else []
+    if len(lines) < 2 or not re.fullmatch(r"[0-9a-f]{40}", lines[1].strip()):
+        return None
+    toplevel, head = lines[0].strip(), lines[1].strip()
+
+    names = None
+    if since and since != head and _git(["merge-base", "--is-ancestor", since, head], hooks_dir) is not None:
+        names = _git(["diff", "--name-only", since, head], hooks_dir)
+    if names is None:
+        names = _git(["diff-tree", "--no-commit-id", "--name-only", "-r", "--root", head], hooks_dir)
+    if names is None:
+        return None
+
+    files = [os.path.normpath(os.path.join(toplevel, n)) for n in names.splitlines() if n.strip()]
+    return {"head": head, "files": files}
+
+
+# =============================================================================
+# IMPORT GRAPH
+# =============================================================================
+
+def _hook_fingerprint(hooks_dir: Path) -> Dict[str, int]:
+    """mtime of every Python file the analyzer would see."""
+    fingerprint = {}
+    for path in hooks_dir.rglob("*.py"):
+        if "__pycache__" in path.parts:
+            continue
+        try:
+            fingerprint[str(path.relative_to(hooks_dir))] = path.stat().st_mtime_ns
+        except OSError:
+            continue
+    return fingerprint
+
+
+def _find_analyzer(hooks_dir: Path) -> Optional[Path]:
+    candidates = [get_project_dir() / "tools" / "import_analyzer.py"]
+    candidates += [parent / "tools" / "import_analyzer.py" for parent in hooks_dir.parents]
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def _build_graph(hooks_dir: Path) -> Optional[Dict[str, Any]]:
+    analyzer_path = _find_analyzer(hooks_dir)
+    if analyzer_path is None:
+        return None
+    try:
+        spec = importlib.util.spec_from_file_location("import_analyzer", analyzer_path)
+        analyzer = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(analyzer)
+        # The analyzer reports progress on stdout, which is hook output here
+        with contextlib.redirect_stdout(io.StringIO()):
+            graph = analyzer.analyze_project(hooks_dir, exclude_patterns=["__pycache__"])
+            graph = _prune_fuzzy_edges(graph, hooks_dir, analyzer.parse_imports)
+        return _add_lazy_edges(graph, hooks_dir)
+    except Exception:
+        return None
+
+
+def _prune_fuzzy_edges(graph: Dict[str, Any], hooks_dir: Path, parse_imports) -> Dict[str, Any]:
+    """
+    Drop edges the source does not really import.
+
+    The analyzer falls back to substring matching for unresolved modules,
+    so `import os` can land on post_tool.py. Through such an edge every
+    module looks affected by everything.
+    """
+    imported: Dict[str, Set[str]] = {}
+    kept = []
+    for edge in graph.get("edges", []):
+        source = edge["source"]
+        if source not in imported:
+            names: Set[str] = set()
+            for imp in parse_imports(hooks_dir / source):
+                names.update(part for part in imp["module"].split(".") if part)
+                names.update(imp.get("names", []))
+            imported[source] = names
+        target = Path(edge["target"])
+        target_name = target.parent.name if target.stem == "__init__" else target.stem
+        if target_name in imported[source]:
+            kept.append(edge)
+    graph["edges"] = kept
+    return graph
+
+
+def _lazy_imports(path: Path) -> Set[str]:
+    """Modules named in lazy_function("<module>", ...) calls."""
+    try:
+        tree = ast.parse(path.read_text())
+    except (OSError, SyntaxError, ValueError):
+        return set()
+    modules = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or not node.args:
+            continue
+        func = node.func
+        name = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+        first = node.args[0]
+        if name == "lazy_function" and isinstance(first, ast.Constant) \
+                and isinstance(first.value, str):
+            modules.add(first.value)
+    return modules
+
+
+def _add_lazy_edges(graph: Dict[str, Any], hooks_dir: Path) -> Dict[str, Any]:
+    """
+    Add an edge for every lazy_function("<module>", ...) literal.
+
+    The analyzer only sees import statements, so without these a change
+    to a lazily loaded module would not select the tests of its users.
+    """
+    nodes = {node["id"] for node in graph.get("nodes", [])}
+    edges = graph.setdefault("edges", [])
+    existing = {(e["source"], e["target"]) for e in edges}
+    for source in sorted(nodes):
+        if not source.endswith(".py"):
+            continue
+        for module in sorted(_lazy_imports(hooks_dir / source)):
+            target = module.replace(".", "/") + ".py"
+            if target in nodes and (source, target) not in existing:
+                edges.append({"source": source, "target": target, "module": module})
+                existing.add((source, target))
+    return graph
+
+
+def load_import_graph(hooks_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    Import graph of the hooks directory, rebuilt if any hook file changed.
+
+    Returns None if the cached graph is stale and cannot be rebuilt.
+    """
+    root = Path(hooks_dir)
+    fingerprint = _hook_fingerprint(root)
+    cached = _read_json(get_graph_file())
+    if cached and cached.get("fingerprint") == fingerprint and isinstance(cached.get("graph"), dict):
+        return cached["graph"]
+
+    graph = _build_graph(root)
+    if graph is None:
+        return None
+    try:
+        atomic_write_text(get_graph_file(), json.dumps({"fingerprint": fingerprint, "graph": graph}))
+    except OSError:
+        pass
+    return graph
+
+
+def reverse_closure(graph: Dict[str, Any], changed: Iterable[str]) -> Set[str]:
+    """Every node that imports a changed node, directly or transitively."""
+    importers: Dict[str, List[str]] = {}
+    for edge in graph.get("edges", []):
+        importers.setdefault(edge["target"], []).append(edge["source"])
+
+    reached = set(changed)
+    stack = list(reached)
+    while stack:
+        for source in importers.get(stack.pop(), ()):
+            if source not in reached:
+                reached.add(source)
+                stack.append(source)
+    return reached
+
+
+# =============================================================================
+# SELECTION
+# =============================================================================
+
+def _test_modules(hooks_dir: str) -> List[str]:
+    try:
+        return sorted(n for n in os.listdir(hooks_dir) if TEST_PATTERN.match(n))
+    except OSError:
+        return []
+
+
+def select_tests(hooks_dir: str) -> Selection:
+    """Choose the test modules to run after a commit. Never raises."""
+    hooks_dir = os.path.abspath(hooks_dir)
+    tests = _test_modules(hooks_dir)
+    total = len(tests)
+    try:
+        changes = changed_files(hooks_dir, load_selection_state().get("last_passed_commit"))
+        if changes is None:
+            return Selection(None, total, "git history unavailable")
+        head = changes["head"]
+
+        changed_hooks = []
+        for path in changes["files"]:
+            rel = os.path.relpath(path, hooks_dir)
+            if not rel.startswith(os.pardir):
+                changed_hooks.append(rel)
+        if not changed_hooks:
+            return Selection([], total, "no hook files changed", head)
+
+        graph = load_import_graph(hooks_dir)
+        if graph is None:
+            return Selection(None, total, "import graph is stale", head)
+        nodes = {node["id"] for node in graph.get("nodes", [])}
+        unknown = [rel for rel in changed_hooks if rel not in nodes]
+        if unknown:
+            return Selection(None, total, f"{unknown[0]} is not in the import graph", head)
+
+        reached = reverse_closure(graph, changed_hooks)
+        selected = [t[:-3] for t in tests if t in reached]
+        return Selection(selected, total, commit=head)
+    except Exception as e:
+        return Selection(None, total, f"selection failed: {e}")
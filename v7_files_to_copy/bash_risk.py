@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Operator's Edge - Bash Risk Matcher
+Precompiled, single-pass classification of Bash commands.
+
+All block and ask patterns are compiled once into a single alternation.
+A safe command (the common case) costs one regex scan. When something
+matches, the earlier-listed patterns are re-checked individually so the
+decision and reason are exactly what a pattern-by-pattern scan would
+give: block beats ask, and list order decides between rules.
+
+classify_command scans the masked form from command_segments, so quoted
+text, comments and heredoc bodies don't trigger rules, while commands
+run via `bash -c`, `eval` or `$(...)` are still checked.
+
+Longer commands are scanned in overlapping MAX_SCAN_CHARS windows, up
+to MAX_TOTAL_SCAN_CHARS, which bounds the cost of pathological input.
+Past MAX_SCAN_CHARS the result fails closed: a command with no block
+match still gets at least "ask", since a match spanning windows or
+lying beyond the total cap can't be ruled out.
+"""
+import re
+from typing import List, Optional, Tuple
+
+from command_segments import parse_command
+
+# Longest text scanned in one regex pass; longer text is windowed
+MAX_SCAN_CHARS = 16384
+SCAN_OVERLAP = 1024
+MAX_TOTAL_SCAN_CHARS = 256 * 1024
+
+# HARD BLOCK - Never allow these
+BLOCK_PATTERNS: List[Tuple[str, str]] = [
+    (r"(^|\s|&&|\|)rm\s+-rf\s+/", "Blocked: rm -rf on root"),
+    (r"(^|\s|&&|\|)rm\s+-rf\s+~", "Blocked: rm -rf on home"),
+    (r"(^|\s|&&|\|)rm\s+-rf\s+\.\.", "Blocked: rm -rf on parent"),
+    (r"(^|\s|&&|\|)git\s+reset\s+--hard", "Blocked: git reset --hard"),
+    (r"(^|\s|&&|\|)git\s+clean\s+-fdx", "Blocked: git clean -fdx"),
+    (r"(^|\s|&&|\|)git\s+push\s+.*--force", "Blocked: force push"),
+    (r"(^|\s|&&|\|)chmod\s+-R\s+777", "Blocked: chmod 777 recursive"),
+    (r"(^|\s|&&|\|):()\s*{\s*:|:&\s*};\s*:", "Blocked: fork bomb"),
+    (r"(^|\s|&&|\|)mkfs\.", "Blocked: filesystem format"),
+    (r"(^|\s|&&|\|)dd\s+if=.*/dev/", "Blocked: dd from device"),
+]
+
+# ASK CONFIRMATION - Risky but sometimes necessary
+ASK_PATTERNS: List[Tuple[str, str]] = [
+    (r"(^|\s|&&|\|)git\s+push(\s|$)", "Confirm: git push"),
+    (r"(^|\s|&&|\|)rm\s+(-r\s+)?[^|&;]+", "Confirm: file deletion"),
+    (r"(^|\s|&&|\|)kubectl\s+", "Confirm: kubernetes operation"),
+    (r"(^|\s|&&|\|)terraform\s+", "Confirm: terraform operation"),
+    (r"(^|\s|&&|\|)docker\s+push", "Confirm: docker push"),
+    (r"(^|\s|&&|\|)npm\s+publish", "Confirm: npm publish"),
+    (r"(^|\s|&&|\|)aws\s+", "Confirm: AWS operation"),
+    (r"(^|\s|&&|\|)gcloud\s+", "Confirm: GCloud operation"),
+]
+
+
+class RiskMatcher:
+    """Classify a command against ordered (decision, pattern, reason) rules."""
+
+    def __init__(self, rules: List[Tuple[str, str, str]], flags: int = re.IGNORECASE):
+        self.rules = rules
+        self.compiled = [re.compile(pattern, flags) for _, pattern, _ in rules]
+        self.combined = re.compile(
+            "|".join(f"(?P<r{i}>{pattern})" for i, (_, pattern, _) in enumerate(rules)),
+            flags,
+        )
+
+    def match_index(self, text: str) -> Optional[int]:
+        """Index of the first rule (in list order) that matches, or None."""
+        m = self.combined.search(text)
+        if m is None:
+            return None
+
+        # Leftmost match found; an earlier rule may still match further right
+        hit = int(m.lastgroup[1:])
+        for i in range(hit):
+            if self.compiled[i].search(text):
+                return i
+        return hit
+
+    def scan(self, text: str) -> Tuple[Optional[int], bool]:
+        """
+        (first matching rule index, whole text scanned in one pass).
+
+        Text over MAX_SCAN_CHARS is scanned window by window (overlapping
+        by SCAN_OVERLAP) up to MAX_TOTAL_SCAN_CHARS; the lowest index wins.
+        """
+        if len(text) <= MAX_SCAN_CHARS:
+            return self.match_index(text), True
+        best = None
+        step = MAX_SCAN_CHARS - SCAN_OVERLAP
+        for start in range(0, min(len(text), MAX_TOTAL_SCAN_CHARS), step):
+            i = self.match_index(text[start:start + MAX_SCAN_CHARS])
+            if i is not None and (best is None or i < best):
+                best = i
+                if best == 0:
+                    break
+        return best, False
+
+    def classify(self, cmd: str, scan_text: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """Return (decision, reason) or None to continue checking.
+
+        scan_text, if given, is matched instead of the command itself;
+        the ask reason still quotes the original command. Text too long
+        for one pass never comes back None (see the module docstring).
+        """
+        cmd_norm = cmd.strip()
+        if scan_text is None:
+            scan_text = cmd_norm
+        i, complete = self.scan(scan_text)
+        if i is None:
+            if complete:
+                return None
+            return ("ask", f"Confirm: command too long to check fully "
+                           f"({len(scan_text)} chars): {cmd_norm[:80]}")
+
+        decision, _, reason = self.rules[i]
+        if decision == "ask":
+            return (decision, f"{reason}: {cmd_norm[:80]}")
+        return (decision, reason)
+
+
+DEFAULT_MATCHER = RiskMatcher(
+    [("block", p, r) for p, r in BLOCK_PATTERNS]
+    + [("ask", p, r) for p, r in ASK_PATTERNS]
+)
+
+
+def classify_command(cmd: str) -> Optional[Tuple[str, str]]:
+    """Gate a Bash command by risk level using the shared matcher."""
+    return DEFAULT_MATCHER.classify(cmd, parse_command(cmd.strip()).scan_text())
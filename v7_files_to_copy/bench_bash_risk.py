@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Bash risk classification, legacy loop vs. precompiled matcher.
+
+The corpus is every Bash command recorded in the project's session logs
+(.proof/sessions/*.jsonl and .proof/session_log.jsonl), plus a few
+built-in samples including a large heredoc. Decisions that differ from
+the legacy scan are listed; with command segmentation these should only
+be commands whose risky text sits inside quotes, comments or heredocs.
+
+Usage:
+    python3 bench_bash_risk.py
+    python3 bench_bash_risk.py --rounds 20 --proof-dir /path/to/.proof
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bash_risk import ASK_PATTERNS, BLOCK_PATTERNS, MAX_SCAN_CHARS, classify_command
+from command_segments import parse_command
+
+BUILTIN_COMMANDS = [
+    "ls -la",
+    "git status",
+    "git diff --stat HEAD~1",
+    "python3 -m unittest discover -s .claude/hooks -p 'test_*.py'",
+    "npm install && npm run build",
+    "rm -rf node_modules",
+    "git push origin main",
+    "kubectl get pods -n default",
+    "ls && rm -rf /",
+    "cat > notes.md <<'EOF'\n" + ("Some generated documentation line.\n" * 6000) + "EOF",
+    'git commit -m "Stop rm -rf ~/cache in cleanup"',
+]
+
+
+def legacy_check_bash_command(cmd):
+    """The pattern-by-pattern scan this matcher replaced."""
+    cmd_norm = cmd.strip()
+    for pattern, reason in BLOCK_PATTERNS:
+        if re.search(pattern, cmd_norm, re.IGNORECASE):
+            return ("block", reason)
+    for pattern, reason in ASK_PATTERNS:
+        if re.search(pattern, cmd_norm, re.IGNORECASE):
+            return ("ask", f"{reason}: {cmd_norm[:80]}")
+    return None
+
+
+def load_corpus(proof_dir: Path) -> list:
+    """Collect recorded Bash commands from session logs."""
+    commands = []
+    log_files = sorted(proof_dir.glob("sessions/*.jsonl"))
+    legacy_log = proof_dir / "session_log.jsonl"
+    if legacy_log.exists() and not legacy_log.is_symlink():
+        log_files.append(legacy_log)
+
+    for log_file in log_files:
+        try:
+            with open(log_file) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    preview = entry.get("input_preview")
+                    if entry.get("tool") == "Bash" and isinstance(preview, dict):
+                        cmd = preview.get("command")
+                        if isinstance(cmd, str) and cmd:
+                            commands.append(cmd)
+        except OSError:
+            continue
+    return commands
+
+
+def _time(fn, commands, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for cmd in commands:
+            fn(cmd)
+    return (time.perf_counter() - start) / (rounds * len(commands)) * 1e6
+
+
+def _classify_uncached(cmd):
+    parse_command.cache_clear()
+    return classify_command(cmd)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Bash risk classification")
+    parser.add_argument("--proof-dir", default=None,
+                        help="Directory with session logs (default: $CLAUDE_PROJECT_DIR/.proof)")
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    proof_dir = Path(args.proof_dir) if args.proof_dir else \
+        Path(os.environ.get("CLAUDE_PROJECT_DIR", ".")) / ".proof"
+    recorded = load_corpus(proof_dir)
+    commands = recorded + BUILTIN_COMMANDS
+
+    changes = [
+        (cmd, legacy_check_bash_command(cmd), classify_command(cmd))
+        for cmd in commands
+    ]
+    changes = [c for c in changes if c[1] != c[2]]
+
+    legacy_us = _time(legacy_check_bash_command, commands, args.rounds)
+    cold_us = _time(_classify_uncached, commands, args.rounds)
+    cached_us = _time(classify_command, commands, args.rounds)
+
+    print(f"Corpus: {len(recorded)} recorded + {len(BUILTIN_COMMANDS)} built-in commands")
+    print(f"Legacy loop:           {legacy_us:8.1f} us/command")
+    print(f"Parse + matcher:       {cold_us:8.1f} us/command ({legacy_us / cold_us:.1f}x)")
+    print(f"Cached parse + matcher:{cached_us:8.1f} us/command ({legacy_us / cached_us:.1f}x)")
+    print(f"Decision changes: {len(changes)}")
+    for cmd, old, new in changes[:10]:
+        print(f"  {cmd[:80]!r}: {old and old[0]} -> {new and new[0]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Benchmark: replay a recorded session through pre_tool and post_tool.
+
+Each tool call in a session log (.proof/session_log.jsonl or a file in
+.proof/sessions/) becomes a PreToolUse payload for pre_tool.main and a
+PostToolUse payload for post_tool.main, run in-process against a scratch
+project dir. Reported per hook:
+  latency    p50 / p95 / p99 / max per call
+  throughput calls per second over the whole replay
+  drift      late-call p50 / early-call p50 - per-call cost that grows
+             with session length (e.g. the old read-rewrite proof log)
+             shows up here
+  growth     bytes added under .proof/ and .claude/state/ per call
+
+Results can be saved as a named baseline in .proof/hook_bench_baselines.json
+and later checked against it; --check exits 1 on a regression.
+
+Commits in the log do not start test runs: post_tool.start_job is
+replaced with a stub for the replay.
+
+Usage:
+    python3 bench_hooks.py
+    python3 bench_hooks.py --log .proof/sessions/20260101-120000.jsonl --repeat 5
+    python3 bench_hooks.py --synthetic 500 --save-baseline
+    python3 bench_hooks.py --synthetic 500 --check --tolerance 0.5
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from hook_timing import percentile
+
+BASELINE_FILE = "hook_bench_baselines.json"
+DRIFT_WINDOW = 0.1      # Fraction of calls at each end compared for drift
+MIN_DRIFT_LIMIT = 1.5   # Drift below this is noise, never a regression
+NOISE_FLOOR_MS = 0.5    # Latency increases smaller than this are ignored
+
+SCRATCH_CONTEXT = """objective: "Replay benchmark"
+current_step: 1
+plan:
+  - description: "Replay recorded tool calls"
+    status: in_progress
+"""
+
+
+# =============================================================================
+# SESSION -> PAYLOADS
+# =============================================================================
+
+def find_session_log(project: Path) -> Optional[Path]:
+    """The legacy session log, else the newest per-session log."""
+    legacy = project / ".proof" / "session_log.jsonl"
+    if legacy.is_file() and legacy.stat().st_size:
+        return legacy
+    sessions = sorted((project / ".proof" / "sessions").glob("*.jsonl"),
+                      key=lambda p: p.stat().st_mtime)
+    return sessions[-1] if sessions else None
+
+
+def load_session(path: Path, limit: int = 0) -> List[Dict[str, Any]]:
+    entries = []
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict):
+                entries.append(entry)
+                if limit and len(entries) >= limit:
+                    break
+    return entries
+
+
+def synthetic_session(calls: int) -> List[Dict[str, Any]]:
+    """A mixed workload shaped like a coding session."""
+    cycle = [
+        {"tool": "Read", "input_preview": {"file": "src/app.py"}, "success": True},
+        {"tool": "Bash", "input_preview": {"command": "git status --short"}, "success": True,
+         "output_preview": " M src/app.py"},
+        {"tool": "Edit", "input_preview": {"file": "src/app.py", "old_string": "x = 1",
+                                           "new_string": "x = 2"}, "success": True},
+        {"tool": "Bash", "input_preview": {"command": "python3 -m pytest -q tests/"},
+         "success": False, "output_preview": "1 failed, 41 passed"},
+        {"tool": "Edit", "input_preview": {"file": "tests/test_app.py", "old_string": "== 1",
+                                           "new_string": "== 2"}, "success": True},
+        {"tool": "Bash", "input_preview": {"command": "python3 -m pytest -q tests/"},
+         "success": True, "output_preview": "42 passed"},
+        {"tool": "Write", "input_preview": {"file": "docs/notes.md"}, "success": True},
+        {"tool": "Bash", "input_preview": {"command": "git add -A && git commit -m 'wip'"},
+         "success": True, "output_preview": "[main abc1234] wip"},
+    ]
+    return [dict(cycle[i % len(cycle)]) for i in range(calls)]
+
+
+def _scratch_path(path: str, scratch: Path) -> str:
+    """Keep replayed file paths inside the scratch project."""
+    rel = path.replace("\\", "/").lstrip("/")
+    return str(scratch / "src" / rel) if rel else str(scratch / "src" / "unknown")
+
+
+def entry_to_payloads(entry: Dict[str, Any], scratch: Path) -> Optional[Tuple[dict, dict]]:
+    """
+    (PreToolUse payload, PostToolUse payload) for a logged tool call.
+
+    Entries that are not tool calls (eval cleanup, archive notes) give None.
+    """
+    tool = entry.get("tool")
+    if not isinstance(tool, str) or not tool[:1].isupper():
+        return None
+    preview = entry.get("input_preview")
+    preview = preview if isinstance(preview, dict) else {}
+    success = bool(entry.get("success", True))
+    output = entry.get("output_preview") or ""
+
+    if tool == "Bash":
+        tool_input = {"command": str(preview.get("command", ""))}
+        tool_result = {"exit_code": 0 if success else 1,
+                       "stdout": output if success else "",
+                       "stderr": "" if success else output}
+    elif tool in ("Edit", "Write", "Read", "NotebookEdit"):
+        file_path = preview.get("file") or preview.get("file_path") or "unknown"
+        tool_input = {"file_path": _scratch_path(str(file_path), scratch)}
+        if tool == "Edit":
+            tool_input["old_string"] = preview.get("old_string", "")
+            tool_input["new_string"] = preview.get("new_string", "")
+        tool_result = {"success": success}
+    else:
+        tool_input = dict(preview)
+        tool_result = {"output": output}
+
+    pre = {"hook_event_name": "PreToolUse", "tool_name": tool, "tool_input": tool_input}
+    post = dict(pre, hook_event_name="PostToolUse", tool_result=tool_result)
+    return pre, post
+
+
+# =============================================================================
+# REPLAY
+# =============================================================================
+
+def make_scratch_project() -> Path:
+    project = Path(tempfile.mkdtemp(prefix="edge-replay-"))
+    state = project / ".claude" / "state"
+    state.mkdir(parents=True)
+    (state / "session_id").write_text("replay")
+    (project / "active_context.yaml").write_text(SCRATCH_CONTEXT)
+    (project / ".proof").mkdir()
+    return project
+
+
+def _tree_sizes(project: Path) -> Dict[str, int]:
+    sizes = {}
+    for root in (project / ".proof", project / ".claude" / "state"):
+        for path in root.rglob("*"):
+            if path.is_file() and not path.is_symlink():  # session_log.jsonl links a session
+                sizes[str(path.relative_to(project))] = path.stat().st_size
+    return sizes
+
+
+def _call_hook(main_fn, payload: dict) -> float:
+    """Run one hook main() on a payload; returns milliseconds."""
+    stdin = sys.stdin
+    sys.stdin = io.StringIO(json.dumps(payload))
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            start = time.perf_counter()
+            try:
+                main_fn()
+            except SystemExit:
+                pass  # respond() exits
+            return (time.perf_counter() - start) * 1000
+    finally:
+        sys.stdin = stdin
+
+
+def _latency(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "p50": round(percentile(ordered, 50), 3),
+        "p95": round(percentile(ordered, 95), 3),
+        "p99": round(percentile(ordered, 99), 3),
+        "max": round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+def _drift(samples: List[float]) -> float:
+    window = max(1, int(len(samples) * DRIFT_WINDOW))
+    if len(samples) < 2 * window or not samples:
+        return 1.0
+    early = statistics.median(samples[:window])
+    late = statistics.median(samples[-window:])
+    return round(late / early, 3) if early > 0 else 1.0
+
+
+def replay(entries: List[Dict[str, Any]], repeat: int = 1) -> Dict[str, Any]:
+    """Replay entries `repeat` times in a fresh scratch project."""
+    import jsonl_utils
+
+    project = make_scratch_project()
+    payloads = [p for p in (entry_to_payloads(e, project) for e in entries) if p]
+    if not payloads:
+        shutil.rmtree(project, ignore_errors=True)
+        raise ValueError("No tool calls to replay")
+
+    old_env = {k: os.environ.get(k) for k in ("CLAUDE_PROJECT_DIR", "EDGE_HOOK_TIMING")}
+    os.environ["CLAUDE_PROJECT_DIR"] = str(project)
+    os.environ.pop("EDGE_HOOK_TIMING", None)
+    jsonl_utils._writer = None  # Fresh descriptors for the scratch project
+
+    import post_tool
+    import pre_tool
+    real_start_job = post_tool.start_job
+    post_tool.start_job = lambda name: "started"
+    try:
+        before = _tree_sizes(project)
+        pre_ms: List[float] = []
+        post_ms: List[float] = []
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for pre, post in payloads:
+                pre_ms.append(_call_hook(pre_tool.main, pre))
+                post_ms.append(_call_hook(post_tool.main, post))
+        wall = time.perf_counter() - start
+        after = _tree_sizes(project)
+    finally:
+        post_tool.start_job = real_start_job
+        jsonl_utils.get_append_writer().close()
+        jsonl_utils._writer = None
+        for key, value in old_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(project, ignore_errors=True)
+
+    calls = len(pre_ms)
+    growth = {k: v - before.get(k, 0) for k, v in after.items() if v != before.get(k, 0)}
+    total_growth = sum(growth.values())
+    return {
+        "calls": calls,
+        "wall_s": round(wall, 3),
+        "throughput_per_s": round(calls / wall, 1) if wall else 0.0,
+        "pre_tool": dict(_latency(pre_ms), drift=_drift(pre_ms)),
+        "post_tool": dict(_latency(post_ms), drift=_drift(post_ms)),
+        "growth_bytes": total_growth,
+        "bytes_per_call": round(total_growth / calls, 1),
+        "growth_by_file": dict(sorted(growth.items(), key=lambda kv: -kv[1])[:8]),
+    }
+
+
+# =============================================================================
+# BASELINES
+# =============================================================================
+
+def load_baselines(path: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_baseline(path: Path, name: str, results: Dict[str, Any]) -> None:
+    from state_utils import atomic_write_text
+    baselines = load_baselines(path)
+    baselines[name] = results
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(path, json.dumps(baselines, indent=2))
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions of results against a baseline, as readable lines."""
+    problems = []
+    for hook in ("pre_tool", "post_tool"):
+        now, base = results.get(hook, {}), baseline.get(hook, {})
+        for key in ("p50", "p95"):
+            if key not in now or key not in base:
+                continue
+            limit = base[key] * (1 + tolerance)
+            if now[key] > limit and now[key] - base[key] > NOISE_FLOOR_MS:
+                problems.append(f"{hook} {key} {now[key]:.2f}ms > {limit:.2f}ms "
+                                f"(baseline {base[key]:.2f}ms)")
+        if "drift" in now and "drift" in base:
+            limit = max(base["drift"] * (1 + tolerance), MIN_DRIFT_LIMIT)
+            if now["drift"] > limit:
+                problems.append(f"{hook} drift {now['drift']:.2f}x > {limit:.2f}x "
+                                f"- per-call cost grows with session length")
+    if "bytes_per_call" in baseline:
+        limit = baseline["bytes_per_call"] * (1 + tolerance)
+        if results["bytes_per_call"] > limit:
+            problems.append(f"growth {results['bytes_per_call']:.0f} bytes/call > {limit:.0f} "
+                            f"(baseline {baseline['bytes_per_call']:.0f})")
+    return problems
+
+
+def format_results(results: Dict[str, Any]) -> str:
+    lines = [
+        f"Replayed {results['calls']} tool calls in {results['wall_s']:.2f}s "
+        f"({results['throughput_per_s']:.0f} calls/s, pre+post per call)",
+        "",
+        f"{'hook':<10} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'drift':>7}",
+    ]
+    for hook in ("pre_tool", "post_tool"):
+        s = results[hook]
+        lines.append(f"{hook:<10} {s['p50']:>6.2f}ms {s['p95']:>6.2f}ms {s['p99']:>6.2f}ms "
+                     f"{s['max']:>6.2f}ms {s['drift']:>6.2f}x")
+    lines += ["", f"growth: {results['growth_bytes']} bytes ({results['bytes_per_call']:.0f}/call)"]
+    for name, size in results["growth_by_file"].items():
+        lines.append(f"  {size:>10}  {name}")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    from state_utils import get_proof_dir
+
+    parser = argparse.ArgumentParser(description="Replay a session log through the hooks")
+    parser.add_argument("--log", help="Session log to replay (default: this project's)")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Replay N generated calls instead of a log")
+    parser.add_argument("--limit", type=int, default=0, help="Use the first N log entries")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the calls N times")
+    parser.add_argument("--name", default="default", help="Baseline name")
+    parser.add_argument("--save-baseline", action="store_true", help="Store results as baseline")
+    parser.add_argument("--check", action="store_true", help="Exit 1 on regression vs. baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed relative slowdown before --check fails")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    # Resolved before the replay points CLAUDE_PROJECT_DIR at the scratch dir
+    baselines_path = get_proof_dir() / BASELINE_FILE
+
+    if args.synthetic:
+        entries = synthetic_session(args.synthetic)
+        source = f"synthetic ({args.synthetic} calls)"
+    else:
+        log = Path(args.log) if args.log else find_session_log(get_proof_dir().parent)
+        if log is None or not log.is_file():
+            print("No session log found - pass --log or --synthetic N", file=sys.stderr)
+            return 2
+        entries = load_session(log, args.limit)
+        source = str(log)
+
+    try:
+        results = replay(entries, max(1, args.repeat))
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    results["source"] = source
+
+    print(json.dumps(results, indent=2) if args.json else format_results(results))
+
+    status = 0
+    if args.check:
+        baseline = load_baselines(baselines_path).get(args.name)
+        if baseline is None:
+            print(f"\nNo baseline '{args.name}' in {baselines_path} - run with --save-baseline",
+                  file=sys.stderr)
+            return 2
+        if baseline.get("calls") != results["calls"]:
+            print(f"\nNote: baseline replayed {baseline.get('calls')} calls, this run "
+                  f"{results['calls']}", file=sys.stderr)
+        problems = compare(results, baseline, args.tolerance)
+        if problems:
+            print("\nREGRESSION vs. baseline '%s':" % args.name)
+            for problem in problems:
+                print(f"  - {problem}")
+            status = 1
+        else:
+            print(f"\nOK vs. baseline '{args.name}' (tolerance {args.tolerance:.0%})")
+
+    if args.save_baseline:
+        save_baseline(baselines_path, args.name, results)
+        print(f"\nSaved baseline '{args.name}' to {baselines_path}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-call cost of proof logging vs. session log size.
+
+Pre-fills a session log with N entries, then times log_proof_entry().
+The append writer should stay flat from 100 to 100k entries; the old
+read-whole-file-then-rewrite path grows linearly (quadratic per session).
+
+Usage:
+    python3 bench_proof_logging.py
+    python3 bench_proof_logging.py --sizes 100,1000,10000,100000 --calls 200
+    python3 bench_proof_logging.py --legacy-max 10000 --fsync never
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_INPUT = {"command": "python3 -m unittest discover -s . -p 'test_*.py'"}
+SAMPLE_OUTPUT = "Ran 120 tests in 1.234s\n\nOK"
+
+
+def _prefill(log_path: Path, n: int) -> None:
+    """Write n realistic entries directly (not part of the measurement)."""
+    line = json.dumps({
+        "timestamp": "2026-01-01T00:00:00",
+        "tool": "Bash",
+        "input_preview": SAMPLE_INPUT,
+        "success": True,
+        "output_preview": SAMPLE_OUTPUT,
+        "session_id": "bench",
+    }) + "\n"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "w") as f:
+        f.write(line * n)
+
+
+def _legacy_log_proof_entry(log_path: Path, entry: dict) -> None:
+    """The pre-append implementation: lock, read all, rewrite all."""
+    from state_utils import file_lock, atomic_write_text
+    with file_lock(log_path):
+        existing = log_path.read_text() if log_path.exists() else ""
+        if existing and not existing.endswith("\n"):
+            existing += "\n"
+        atomic_write_text(log_path, existing + json.dumps(entry) + "\n")
+
+
+def _time_calls(fn, calls: int) -> list:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def run(sizes, calls: int, legacy_max: int) -> list:
+    """Run the benchmark and return result rows."""
+    import jsonl_utils
+    from proof_utils import log_proof_entry, get_session_log_path
+
+    rows = []
+    for n in sizes:
+        project = Path(tempfile.mkdtemp(prefix="edge-bench-"))
+        os.environ["CLAUDE_PROJECT_DIR"] = str(project)
+        jsonl_utils._writer = None  # Fresh descriptor per project
+        try:
+            (project / ".claude" / "state").mkdir(parents=True)
+            (project / ".claude" / "state" / "session_id").write_text("bench")
+            log_path = get_session_log_path("bench")
+
+            _prefill(log_path, n)
+            append = _time_calls(
+                lambda: log_proof_entry("Bash", SAMPLE_INPUT, SAMPLE_OUTPUT, True), calls)
+
+            legacy = None
+            if n <= legacy_max:
+                _prefill(log_path, n)
+                entry = {"tool": "Bash", "input_preview": SAMPLE_INPUT}
+                legacy = _time_calls(lambda: _legacy_log_proof_entry(log_path, entry), calls)
+
+            rows.append({
+                "entries": n,
+                "append_median_us": statistics.median(append),
+                "append_p95_us": sorted(append)[int(len(append) * 0.95) - 1],
+                "legacy_median_us": statistics.median(legacy) if legacy else None,
+            })
+        finally:
+            jsonl_utils.get_append_writer().close()
+            shutil.rmtree(project, ignore_errors=True)
+    return rows
+
+
+def format_rows(rows: list) -> str:
+    lines = [f"{'entries':>10}  {'append p50':>12}  {'append p95':>12}  {'legacy p50':>12}"]
+    for r in rows:
+        legacy = f"{r['legacy_median_us']:>10.0f}us" if r["legacy_median_us"] else f"{'-':>12}"
+        lines.append(f"{r['entries']:>10}  {r['append_median_us']:>10.0f}us  "
+                     f"{r['append_p95_us']:>10.0f}us  {legacy}")
+
+    first, last = rows[0]["append_median_us"], rows[-1]["append_median_us"]
+    lines.append("")
+    lines.append(f"append cost ratio {rows[-1]['entries']}/{rows[0]['entries']} entries: "
+                 f"{last / first:.2f}x (flat is ~1x)")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark proof logging cost vs. log size")
+    parser.add_argument("--sizes", default="100,1000,10000,100000",
+                        help="Comma-separated pre-filled entry counts")
+    parser.add_argument("--calls", type=int, default=200, help="Timed calls per size")
+    parser.add_argument("--legacy-max", type=int, default=10000,
+                        help="Largest size to time the legacy rewrite path at")
+    parser.add_argument("--fsync", default=None,
+                        help="EDGE_PROOF_FSYNC policy (entry, every:N, exit, never)")
+    args = parser.parse_args()
+
+    if args.fsync:
+        os.environ["EDGE_PROOF_FSYNC"] = args.fsync
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    rows = run(sizes, args.calls, args.legacy_max)
+    print(format_rows(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: rule evaluation throughput, per-call vs. batch.
+
+Generates a burst of Edit/Write calls shaped like a working session -
+a handful of files edited over and over, with a share of exact repeats -
+and times:
+  per-call   rules_engine.check_rules once per call (pre_tool's path)
+  batch      rules_engine.check_rules_batch over the whole burst
+
+With --rules N, N synthetic graduated rules (extension and basename
+triggers) are added and rule selection is timed both ways:
+  scan       search every rule's compiled trigger against the path
+  index      RuleIndex.rules_for on a fresh index (no per-path memo)
+
+Usage:
+    python3 bench_rules.py
+    python3 bench_rules.py --calls 20000 --files 50 --repeat-share 0.5
+    python3 bench_rules.py --rules 5000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rules_engine import Rule, RuleIndex, check_rules, check_rules_batch, load_rules
+
+EXTENSIONS = (".py", ".md", ".ts", ".yaml", ".json")
+
+
+def make_calls(count: int, files: int, repeat_share: float, seed: int = 7):
+    """(tool_name, tool_input) pairs over `files` distinct paths."""
+    rng = random.Random(seed)
+    paths = [f"/project/src/module_{i}{EXTENSIONS[i % len(EXTENSIONS)]}" for i in range(files)]
+    paths.append("/project/CLAUDE.md")
+    calls = []
+    for i in range(count):
+        if calls and rng.random() < repeat_share:
+            calls.append(rng.choice(calls))
+            continue
+        path = rng.choice(paths)
+        if rng.random() < 0.3:
+            calls.append(("Write", {"file_path": path,
+                                    "content": f"#!/usr/bin/env python\n# rev {i}\n" + "x = 1\n" * 40}))
+        else:
+            calls.append(("Edit", {"file_path": path, "old_string": "x = 1",
+                                   "new_string": f"x = {i}  # callers should check this"}))
+    return calls
+
+
+def make_rules(count: int):
+    """Graduated-style rules spread over many extensions and basenames."""
+    rules = []
+    for i in range(count):
+        trigger = rf"(^|/)tool_{i}\.cfg$" if i % 4 == 0 else rf"\.gen{i % 500}$"
+        rules.append(Rule(id=f"generated-{i}", trigger_pattern=trigger,
+                          check_fn="check_python_shebang", message=f"Generated rule {i}"))
+    return rules
+
+
+def bench_selection(rule_count: int, calls) -> None:
+    rules = load_rules() + make_rules(rule_count)
+    paths = [tool_input["file_path"] for _, tool_input in calls]
+
+    compiled = [(rule, re.compile(rule.trigger_pattern)) for rule in rules]
+    start = time.perf_counter()
+    for path in paths:
+        [rule for rule, trigger in compiled if trigger.search(path)]
+    scan = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = RuleIndex(rules)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    for path in paths:
+        index._by_path.clear()  # Time selection, not the per-path memo
+        index.rules_for(path)
+    indexed = time.perf_counter() - start
+
+    print(f"rule selection with {len(rules)} rules (index built in {build * 1e3:.1f}ms)")
+    print(f"  scan      {scan * 1e6 / len(paths):>10.1f}us/call")
+    print(f"  index     {indexed * 1e6 / len(paths):>10.1f}us/call")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark rule evaluation throughput")
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--repeat-share", type=float, default=0.3,
+                        help="fraction of calls that repeat an earlier call exactly")
+    parser.add_argument("--rules", type=int, default=0,
+                        help="also time rule selection with this many extra rules")
+    args = parser.parse_args()
+
+    calls = make_calls(args.calls, args.files, args.repeat_share)
+
+    start = time.perf_counter()
+    expected = [check_rules(tool_name, tool_input) for tool_name, tool_input in calls]
+    per_call = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = check_rules_batch(calls)
+    batched = time.perf_counter() - start
+
+    if batch != expected:
+        print("MISMATCH: batch results differ from check_rules", file=sys.stderr)
+        return 1
+
+    fired = sum(1 for v in expected if v)
+    print(f"{len(calls)} calls over {args.files + 1} files, {fired} with violations")
+    print(f"  per-call  {len(calls) / per_call:>10,.0f} calls/s  ({per_call * 1e6 / len(calls):.1f}us/call)")
+    print(f"  batch     {len(calls) / batched:>10,.0f} calls/s  ({batched * 1e6 / len(calls):.1f}us/call)")
+    if args.rules:
+        bench_selection(args.rules, calls)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: active_context.yaml loading, parse vs. snapshot cache.
+
+Generates a context file of the requested size in a temporary project
+and times three paths:
+  parse      state_utils.load_yaml_state (read + parse_simple_yaml)
+  snapshot   state_cache with no memo, as in a fresh hook process
+  memo       state_cache within one process (e.g. pre_tool's second load)
+
+Usage:
+    python3 bench_state_cache.py
+    python3 bench_state_cache.py --lines 20000 --rounds 50
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import state_cache
+import state_utils
+
+
+def make_context(lines: int) -> str:
+    """A context file shaped like a long-running objective."""
+    out = [
+        'objective: "Benchmark the state cache"',
+        "current_step: 3",
+        "plan:",
+    ]
+    step = 0
+    while len(out) < lines - 10:
+        step += 1
+        out += [
+            f'  - description: "Step {step}: refactor module_{step} and update its tests"',
+            "    status: completed",
+            f'    proof: "commit {step:07x} - tests pass"',
+        ]
+    out += [
+        "risks:",
+        '  - risk: "Cache serves a stale plan"',
+        '    mitigation: "Key on mtime, size and content hash"',
+        "constraints:",
+        '  - "Hooks must stay under 100ms"',
+    ]
+    return "\n".join(out) + "\n"
+
+
+def _time(fn, rounds, before=None):
+    total = 0.0
+    for _ in range(rounds):
+        if before:
+            before()
+        start = time.perf_counter()
+        fn()
+        total += time.perf_counter() - start
+    return total / rounds * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark active_context.yaml loading")
+    parser.add_argument("--lines", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    project = Path(tempfile.mkdtemp())
+    old_env = os.environ.get("CLAUDE_PROJECT_DIR")
+    os.environ["CLAUDE_PROJECT_DIR"] = str(project)
+    try:
+        state_file = project / "active_context.yaml"
+        state_file.write_text(make_context(args.lines))
+        old = time.time() - 60  # Past the racy window, like a file being worked from
+        os.utime(state_file, (old, old))
+
+        expected = state_utils.load_yaml_state()
+        state_cache.clear_cache()
+        if state_cache.load_yaml_state() != expected:
+            print("Cached state differs from parsed state")
+            return 1
+
+        def drop_memo():
+            state_cache._memo = None
+
+        parse_us = _time(state_utils.load_yaml_state, args.rounds)
+        snapshot_us = _time(state_cache.load_yaml_state, args.rounds, before=drop_memo)
+        memo_us = _time(state_cache.load_yaml_state, args.rounds)
+
+        size_kb = state_file.stat().st_size / 1024
+        print(f"Context file: {args.lines} lines, {size_kb:.0f} KB")
+        print(f"Parse:          {parse_us:9.1f} us/load")
+        print(f"Snapshot hit:   {snapshot_us:9.1f} us/load ({parse_us / snapshot_us:.1f}x)")
+        print(f"Memo hit:       {memo_us:9.1f} us/load ({parse_us / memo_us:.1f}x)")
+        return 0
+    finally:
+        if old_env is None:
+            os.environ.pop("CLAUDE_PROJECT_DIR", None)
+        else:
+            os.environ["CLAUDE_PROJECT_DIR"] = old_env
+        shutil.rmtree(project, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
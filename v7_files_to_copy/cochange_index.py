@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Operator's Edge - Co-change Index
+Persistent index of which files change together in git history.
+
+pattern_engine used to answer "what changes with this file?" with a
+`git log` plus up to 30 `git show` subprocesses on every Edit. This
+module keeps the answer in .proof/cochange.sqlite instead:
+
+  - Built once from a single streamed `git log --name-only`, by the
+    background job runner (job "cochange_index"): lookups return no
+    partners until that build is done, rather than wait for it
+  - Updated from the last indexed commit to HEAD; if that commit is no
+    longer an ancestor (rebase, reset), the index is rebuilt in the
+    background too
+  - HEAD is read from .git directly, so the common case - nothing new
+    committed - costs no subprocess and takes no write lock
+  - A lookup is one indexed query over the file's RECENT_COMMITS most
+    recent commits, the same window the subprocess version used
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Newest commits indexed on a first build (bounds the one-off cost)
+MAX_INDEX_COMMITS = 5000
+
+# Commits per file considered for partners
+RECENT_COMMITS = 30
+
+GIT_TIMEOUT_SECONDS = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS commit_files (
+    path TEXT NOT NULL,
+    commit_idx INTEGER NOT NULL,
+    PRIMARY KEY (path, commit_idx)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_commit_files_commit ON commit_files(commit_idx, path);
+"""
+
+_PARTNERS_SQL = """
+WITH recent AS (
+    SELECT commit_idx FROM commit_files
+    WHERE path = ? ORDER BY commit_idx DESC LIMIT ?
+)
+SELECT cf.path, COUNT(*) AS n
+FROM commit_files cf JOIN recent r ON cf.commit_idx = r.commit_idx
+WHERE cf.path != ? AND cf.path NOT LIKE '.%'
+GROUP BY cf.path
+ORDER BY n DESC, cf.path
+LIMIT ?
+"""
+
+
+# =============================================================================
+# GIT DISCOVERY
+# =============================================================================
+
+def find_repo(start: Path) -> Optional[Tuple[Path, Path]]:
+    """Return (work tree root, git dir) for the repo containing start."""
+    current = Path(start).resolve()
+    for directory in [current] + list(current.parents):
+        dot_git = directory / ".git"
+        if dot_git.is_dir():
+            return directory, dot_git
+        if dot_git.is_file():
+            # Worktree or submodule: "gitdir: <path>"
+            try:
+                content = dot_git.read_text().strip()
+            except OSError:
+                return None
+            if content.startswith("gitdir:"):
+                git_dir = Path(content[len("gitdir:"):].strip())
+                if not git_dir.is_absolute():
+                    git_dir = (directory / git_dir).resolve()
+                return directory, git_dir
+            return None
+    return None
+
+
+def _common_dir(git_dir: Path) -> Path:
+    """Where shared refs live (differs from git_dir for worktrees)."""
+    try:
+        common = (git_dir / "commondir").read_text().strip()
+    except OSError:
+        return git_dir
+    path = Path(common)
+    return path if path.is_absolute() else (git_dir / path).resolve()
+
+
+def read_head(git_dir: Path) -> Optional[str]:
+    """Resolve HEAD to a commit hash without running git, or None."""
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+    except OSError:
+        return None
+    if not head.startswith("ref:"):
+        return head or None
+
+    ref = head[len("ref:"):].strip()
+    for base in (git_dir, _common_dir(git_dir)):
+        try:
+            return (base / ref).read_text().strip() or None
+        except OSError:
+            pass
+        try:
+            with open(base / "packed-refs") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 2 and parts[1] == ref:
+                        return parts[0]
+        except OSError:
+            pass
+    return None  # e.g. unborn branch
+
+
+def _git(repo_root: Path, *args) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["git", *args], cwd=repo_root, capture_output=True, text=True,
+        timeout=GIT_TIMEOUT_SECONDS,
+    )
+
+
+# =============================================================================
+# INDEX MAINTENANCE
+# =============================================================================
+
+def get_index_path(repo_root: Path) -> Path:
+    return repo_root / ".proof" / "cochange.sqlite"
+
+
+def _get_meta(conn, key: str) -> Optional[str]:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _set_meta(conn, key: str, value) -> None:
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+
+def _stream_commit_files(proc, first_idx: int, counter: list):
+    """Yield (path, commit_idx) from `git log --pretty=%x00%H --name-only`."""
+    idx = first_idx - 1
+    for line in proc.stdout:
+        line = line.rstrip("\n")
+        if line.startswith("\x00"):
+            idx += 1
+        elif line:
+            yield line, idx
+    counter[0] = idx + 1
+
+
+def update_index(conn, repo_root: Path, head: str, build: bool = True) -> bool:
+    """
+    Bring the index up to head. Raises on git failure.
+
+    With build=False only an incremental update is done; if the index
+    needs building from scratch, it is marked unbuilt and False returned.
+    """
+    conn.execute("BEGIN IMMEDIATE")  # One updater at a time; others wait
+    try:
+        last = _get_meta(conn, "last_commit")
+        if last == head:
+            conn.rollback()
+            return True
+
+        if last and _git(repo_root, "merge-base", "--is-ancestor", last, head).returncode != 0:
+            last = None  # History was rewritten - start over
+        if last is None:
+            if not build:
+                conn.execute("DELETE FROM meta WHERE key = 'last_commit'")
+                conn.commit()
+                return False
+            conn.execute("DELETE FROM commit_files")
+            next_idx = 0
+        else:
+            next_idx = int(_get_meta(conn, "next_idx") or 0)
+
+        rev_range = f"{last}..{head}" if last else head
+        proc = subprocess.Popen(
+            ["git", "-c", "core.quotepath=off", "log", "--reverse", "--no-renames",
+             "--name-only", "--pretty=format:%x00%H", "-n", str(MAX_INDEX_COMMITS), rev_range],
+            cwd=repo_root, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, errors="replace",
+        )
+        counter = [next_idx]
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO commit_files (path, commit_idx) VALUES (?, ?)",
+                _stream_commit_files(proc, next_idx, counter),
+            )
+        finally:
+            proc.stdout.close()
+            returncode = proc.wait(timeout=GIT_TIMEOUT_SECONDS)
+        if returncode != 0:
+            raise RuntimeError(f"git log exited with {returncode}")
+
+        _set_meta(conn, "last_commit", head)
+        _set_meta(conn, "next_idx", counter[0])
+        conn.commit()
+        return True
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def _resolve_head(repo_root: Path, git_dir: Path) -> Optional[str]:
+    head = read_head(git_dir)
+    if head is None:
+        result = _git(repo_root, "rev-parse", "--verify", "-q", "HEAD")
+        if result.returncode != 0:
+            return None  # No commits yet
+        head = result.stdout.strip()
+    return head
+
+
+def build_index(project_dir: Path) -> Tuple[bool, str]:
+    """Job body: build or update the index for project_dir's repo."""
+    from db_utils import connect
+
+    repo = find_repo(project_dir)
+    head = _resolve_head(*repo) if repo else None
+    if head is None:
+        return True, "no git history to index"
+    repo_root = repo[0]
+    conn = connect(get_index_path(repo_root), _SCHEMA)
+    try:
+        update_index(conn, repo_root, head)
+        commits = _get_meta(conn, "next_idx")
+    finally:
+        conn.close()
+    return True, f"co-change index covers {commits} commits"
+
+
+def _request_build() -> None:
+    from job_runner import start_job
+    start_job("cochange_index")  # Coalesced while a build is running
+
+
+def _relative_path(file_path: str, project_dir: Path, repo_root: Path) -> str:
+    """Normalize to the repo-relative form git history uses."""
+    path = Path(file_path)
+    if not path.is_absolute():
+        path = Path(project_dir) / path
+    try:
+        return Path(os.path.normpath(path)).relative_to(repo_root).as_posix()
+    except ValueError:
+        try:
+            return path.resolve().relative_to(repo_root).as_posix()
+        except ValueError:
+            return Path(file_path).as_posix()
+
+
+# =============================================================================
+# LOOKUP
+# =============================================================================
+
+def find_cochanged_files(file_path: str, project_dir: Path,
+                         limit: int = 5) -> Optional[List[Tuple[str, int]]]:
+    """
+    Files that most often changed together with file_path, with counts.
+
+    Returns [] while the index is being built in the background, and None
+    if it can't be used (no sqlite, git failure), so the caller can fall
+    back to querying git directly.
+    """
+    repo = find_repo(project_dir)
+    if repo is None:
+        return []  # Not a git repo - no history to learn from
+    repo_root, git_dir = repo
+
+    try:
+        from db_utils import connect
+
+        head = _resolve_head(repo_root, git_dir)
+        if head is None:
+            return []
+
+        conn = connect(get_index_path(repo_root), _SCHEMA)
+        try:
+            last = _get_meta(conn, "last_commit")  # Plain read - no write lock
+            if last is None or (last != head
+                                and not update_index(conn, repo_root, head, build=False)):
+                _request_build()
+                return []
+            rel_path = _relative_path(file_path, project_dir, repo_root)
+            rows = conn.execute(
+                _PARTNERS_SQL, (rel_path, RECENT_COMMITS, rel_path, limit)
+            ).fetchall()
+        finally:
+            conn.close()
+    except Exception:
+        return None
+
+    return [(path, count) for path, count in rows]
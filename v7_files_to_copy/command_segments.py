@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Operator's Edge - Command Segmentation
+Shell-aware parse of Bash commands, shared by the pre/post tool hooks.
+
+A command like `a && b | c; d` is split once into its list and pipeline
+segments. The parse is cached per command string, so the risk matcher
+(bash_risk), retry fingerprinting (failure_index) and the proof log all
+reuse the same structured form within a process (and across calls when
+the hook daemon is running).
+
+What the parse gives the risk matcher:
+  - masked: the command with quoted text collapsed into single words,
+    comments dropped and heredoc bodies removed, so `echo "rm -rf /"`
+    or `git commit -m "drop rm -rf"` no longer look like deletions
+  - segmented: masked with a line break after every list, pipeline and
+    subshell operator, so each command starts a line and `cd x;rm -rf /`
+    matches a rule anchored on the start of a command
+  - nested: commands the shell will run from inside strings -
+    `bash -c "..."`, `eval ...`, `$(...)`, backticks, and heredocs or
+    here-strings fed to a shell - parsed the same way so nothing hides
+    in quotes
+
+Unbalanced quotes stop the parse; the rest is kept verbatim, which only
+ever makes matching stricter.
+"""
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Tuple
+
+SHELL_PROGRAMS = ("bash", "sh", "zsh", "dash", "ksh")
+MAX_NESTING = 3
+
+_SUBSTITUTION = r"""\$\((?:[^()'"]|'[^']*'|"(?:[^"\\]|\\.)*"|\([^()]*\))*\)|`(?:[^`\\]|\\.)*`"""
+
+_TOKEN = re.compile(r"""
+    (?P<ws>[ \t]+|\\\r?\n)
+  | (?P<nl>\r?\n)
+  | (?P<heredoc><<-?)(?!<)[ \t]*(?P<delim>'[^'\n]*'|"[^"\n]*"|\\?[^\s;&|<>()]+)
+  | (?P<redir>\d*(?:>>|>&|<&|>\||<>|<<<|>|<)(?:\d+-?|-)?|&>>?)
+  | (?P<op>&&|\|\||;;|\|&|[|;&()])
+  | (?P<comment>\#[^\n]*)
+  | (?P<word>(?:'[^']*'|"(?:[^"\\]|\\.)*"|\\.|""" + _SUBSTITUTION + r"""|[^\s'"\\|&;()<>`])+)
+""", re.VERBOSE | re.DOTALL)
+
+_WORD_PART = re.compile(r"""
+    '(?P<sq>[^']*)'
+  | "(?P<dq>(?:[^"\\]|\\.)*)"
+  | \\(?P<esc>.)
+  | (?P<sub>""" + _SUBSTITUTION + r""")
+  | (?P<plain>[^'"\\`$]+|\$)
+""", re.VERBOSE | re.DOTALL)
+
+# Operators after which a new command starts
+_SEGMENT_BREAKS = frozenset({"&&", "||", ";;", "|&", "|", ";", "&", "("})
+
+_DQ_ESCAPE = re.compile(r'\\([\\"$`\n])')
+_SUBSTITUTION_RE = re.compile(_SUBSTITUTION, re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class Segment:
+    """One simple command in a list or pipeline."""
+    argv: Tuple[str, ...]   # Words with quotes removed, redirections dropped
+    operator: str = ""      # What follows: &&, ||, ;, |, &, newline or ""
+
+    @property
+    def program(self) -> str:
+        return os.path.basename(self.argv[0]) if self.argv else ""
+
+
+@dataclass(frozen=True)
+class ParsedCommand:
+    """Structured form of a Bash command."""
+    source: str
+    masked: str
+    segments: Tuple[Segment, ...]
+    nested: Tuple["ParsedCommand", ...] = field(default_factory=tuple)
+    heredocs: Tuple[str, ...] = field(default_factory=tuple)
+    segmented: str = ""
+
+    def scan_text(self) -> str:
+        """Text for risk matching: one line per segment, then every nested command."""
+        if not self.nested:
+            return self.segmented
+        return "\n".join([self.segmented] + [n.scan_text() for n in self.nested])
+
+    def programs(self) -> List[str]:
+        """Programs invoked, in order, including nested commands."""
+        names = [s.program for s in self.segments if s.program]
+        for n in self.nested:
+            names.extend(n.programs())
+        return names
+
+    def fingerprint(self) -> str:
+        """Whitespace- and quote-insensitive form used to match retries."""
+        parts = []
+        for seg in self.segments:
+            if seg.argv:
+                parts.append(" ".join(seg.argv))
+            if seg.operator and seg.operator != "\n":
+                parts.append(seg.operator)
+            elif seg.operator == "\n":
+                parts.append(";")
+        for body in self.heredocs:
+            parts.append("<<")
+            parts.append(" ".join(body.split()))
+        return " ".join(parts).strip(" ;")
+
+
+def _dequote(word: str, nested: list) -> str:
+    """Remove quoting from a word; collect command substitutions."""
+    value = []
+    pos = 0
+    while pos < len(word):
+        m = _WORD_PART.match(word, pos)
+        if m is None:
+            value.append(word[pos:])
+            break
+        if m.group("sq") is not None:
+            value.append(m.group("sq"))
+        elif m.group("dq") is not None:
+            content = m.group("dq")
+            for sub in _SUBSTITUTION_RE.finditer(content):
+                nested.append(_substitution_body(sub.group(0)))
+            value.append(_DQ_ESCAPE.sub(r"\1", content))
+        elif m.group("esc") is not None:
+            value.append(m.group("esc"))
+        elif m.group("sub") is not None:
+            nested.append(_substitution_body(m.group("sub")))
+            value.append(m.group("sub"))
+        else:
+            value.append(m.group("plain"))
+        pos = m.end()
+    return "".join(value)
+
+
+def _substitution_body(text: str) -> str:
+    return text[2:-1] if text.startswith("$(") else text[1:-1]
+
+
+def _shell_strings(argv: Tuple[str, ...]) -> List[str]:
+    """Strings a segment hands to a shell for evaluation."""
+    if not argv:
+        return []
+    if os.path.basename(argv[0]) == "eval":
+        return [" ".join(argv[1:])]
+    for i, arg in enumerate(argv[:-1]):
+        if os.path.basename(arg) in SHELL_PROGRAMS:
+            flag = argv[i + 1]
+            if flag.startswith("-") and "c" in flag and i + 2 < len(argv):
+                return [argv[i + 2]]
+    return []
+
+
+def _parse(cmd: str, depth: int) -> ParsedCommand:
+    masked: List[str] = []
+    breaks = set()  # Indices in masked followed by a line break in segmented
+    segments: List[Segment] = []
+    nested_sources: List[str] = []
+    heredoc_bodies: List[str] = []
+    pending_heredocs: List[Tuple[str, bool]] = []
+
+    argv: List[str] = []
+    herestrings: List[str] = []
+    skip_next_word = False
+    herestring_next = False
+    pos, n = 0, len(cmd)
+
+    def end_segment(operator: str) -> None:
+        nonlocal argv, herestrings
+        if argv or operator not in ("\n", ""):
+            seg = Segment(tuple(argv), operator)
+            segments.append(seg)
+            shell_strings = _shell_strings(seg.argv)
+            nested_sources.extend(shell_strings)
+            if seg.program in SHELL_PROGRAMS and not shell_strings:
+                nested_sources.extend(herestrings)  # `bash <<< '...'` runs the string
+        argv = []
+        herestrings = []
+
+    while pos < n:
+        m = _TOKEN.match(cmd, pos)
+        if m is None:
+            # Unbalanced quote - keep the rest verbatim (stricter matching)
+            rest = cmd[pos:]
+            masked.append(rest)
+            argv.extend(rest.split())
+            break
+
+        text = m.group(0)
+        kind = "heredoc" if m.group("heredoc") else m.lastgroup
+        pos = m.end()
+
+        if kind == "ws":
+            masked.append(text)
+        elif kind == "nl":
+            masked.append(text)
+            end_segment("\n")
+            for delim, strip_tabs in pending_heredocs:
+                end = re.compile(
+                    r"^" + (r"\t*" if strip_tabs else "") + re.escape(delim) + r"[ \t]*\r?$",
+                    re.MULTILINE,
+                ).search(cmd, pos)
+                if end is None:
+                    heredoc_bodies.append(cmd[pos:])
+                    pos = n
+                    break
+                heredoc_bodies.append(cmd[pos:end.start()])
+                masked.append(delim)
+                pos = end.end()
+            pending_heredocs = []
+        elif kind == "heredoc":
+            masked.append(text)
+            delim = m.group("delim")
+            pending_heredocs.append((delim.strip("'\"").lstrip("\\"), m.group("heredoc") == "<<-"))
+        elif kind == "redir":
+            masked.append(text)
+            skip_next_word = not text[-1].isdigit() and not text.endswith("-")
+            herestring_next = text.endswith("<<<")
+        elif kind == "op":
+            masked.append(text)
+            if text in _SEGMENT_BREAKS:
+                breaks.add(len(masked) - 1)
+            end_segment(text)
+        elif kind == "comment":
+            masked.append(" ")
+        else:
+            value = _dequote(text, nested_sources)
+            masked.append(_WHITESPACE.sub("_", value))
+            if herestring_next:
+                herestrings.append(value)
+                herestring_next = False
+            if skip_next_word:
+                skip_next_word = False
+            else:
+                argv.append(value)
+
+    end_segment("")
+
+    if heredoc_bodies and any(
+        s.program in SHELL_PROGRAMS and not _shell_strings(s.argv) for s in segments
+    ):
+        nested_sources.extend(heredoc_bodies)  # Heredoc is a script for the shell
+
+    nested: Tuple[ParsedCommand, ...] = ()
+    if depth < MAX_NESTING:
+        nested = tuple(_parse(src, depth + 1) for src in nested_sources if src.strip())
+
+    return ParsedCommand(
+        source=cmd,
+        masked="".join(masked),
+        segments=tuple(segments),
+        nested=nested,
+        heredocs=tuple(heredoc_bodies),
+        segmented="".join(piece + "\n" if i in breaks else piece
+                          for i, piece in enumerate(masked)),
+    )
+
+
+@lru_cache(maxsize=128)
+def parse_command(cmd: str) -> ParsedCommand:
+    """Parse a Bash command (cached per command string)."""
+    return _parse(cmd or "", 0)
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Operator's Edge - SQLite Utilities
+Shared connection setup for the small indexed stores under .proof/ and
+.claude/state/.
+
+Hook processes are short-lived and may run concurrently (pre_tool and
+post_tool overlap, parallel tool calls), so every store uses:
+  - WAL journaling: readers never block the single writer
+  - A busy timeout: writers wait briefly instead of raising "locked"
+  - synchronous=NORMAL: durable at checkpoint, cheap per commit
+"""
+import sqlite3
+from pathlib import Path
+
+BUSY_TIMEOUT_SECONDS = 2.0
+
+
+def connect(db_path: Path, schema: str = "") -> sqlite3.Connection:
+    """
+    Open (creating if needed) a store and apply its schema.
+
+    The schema should be idempotent (CREATE ... IF NOT EXISTS).
+    """
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(str(db_path), timeout=BUSY_TIMEOUT_SECONDS)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    except sqlite3.OperationalError:
+        pass  # e.g. network filesystems - default journal still works
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if schema:
+        conn.executescript(schema)
+    return conn
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Operator's Edge - Failure Index
+Time-indexed store of recent command failures for retry blocking.
+
+state_utils.get_recent_failures re-reads and re-parses the whole
+failure_log.jsonl on every Bash command, although only the last few
+minutes matter. This module keeps a small SQLite table indexed by time:
+
+  - log_failure appends to failure_log.jsonl (audit trail, unchanged
+    format) and inserts into the index in one transaction, expiring
+    rows older than RETENTION_SECONDS
+  - get_recent_failures reads only rows inside the window, so lookup
+    cost is O(recent) instead of O(history)
+
+failure_log.jsonl still marks the session: session_start deletes it, and
+a missing log means "no failures this session", exactly as before.
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from state_utils import get_state_dir
+
+RETENTION_SECONDS = 24 * 60 * 60   # Longest window anyone asks for, with margin
+PREFIX_MATCH_CHARS = 50            # Same fuzzy prefix rule as state_utils
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS failures (
+    ts REAL NOT NULL,
+    fingerprint TEXT NOT NULL,
+    command TEXT NOT NULL,
+    error_preview TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_failures_ts ON failures(ts);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _get_log_file() -> Path:
+    return get_state_dir() / "failure_log.jsonl"
+
+
+def _get_index_file() -> Path:
+    return get_state_dir() / "failure_index.sqlite"
+
+
+def normalize_command(command: str) -> str:
+    """Fingerprint used for retry matching.
+
+    Built from the parsed segments, so quoting and spacing differences
+    (`pytest  "tests/"` vs `pytest tests/`) count as the same command.
+    """
+    from command_segments import parse_command
+    return parse_command((command or "").strip()).fingerprint().lower()[:100]
+
+
+def _connect():
+    from db_utils import connect
+    conn = connect(_get_index_file(), _SCHEMA)
+    try:
+        if not _is_seeded(conn):
+            _seed_from_log(conn)
+    except Exception:
+        conn.close()
+        raise
+    return conn
+
+
+def _is_seeded(conn) -> bool:
+    return conn.execute("SELECT 1 FROM meta WHERE key = 'seeded'").fetchone() is not None
+
+
+def _seed_from_log(conn) -> None:
+    """One-time import of recent entries when the index is first created.
+
+    Runs under BEGIN IMMEDIATE and records meta(seeded) in the same
+    transaction, so concurrent hooks seed exactly once.
+    """
+    conn.execute("BEGIN IMMEDIATE")  # One seeder at a time; others wait
+    try:
+        if _is_seeded(conn):
+            conn.rollback()
+            return
+        # An index from before meta(seeded) already holds the log's rows
+        empty = conn.execute("SELECT 1 FROM failures LIMIT 1").fetchone() is None
+        if empty:
+            conn.executemany(
+                "INSERT INTO failures (ts, fingerprint, command, error_preview) "
+                "VALUES (?, ?, ?, ?)",
+                _read_log_rows(),
+            )
+        conn.execute("INSERT INTO meta (key, value) VALUES ('seeded', '1')")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _read_log_rows() -> list:
+    """Recent entries of failure_log.jsonl as index rows."""
+    log_file = _get_log_file()
+    if not log_file.exists():
+        return []
+
+    cutoff = time.time() - RETENTION_SECONDS
+    rows = []
+    with open(log_file) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                ts = datetime.fromisoformat(entry["timestamp"]).timestamp()
+            except (ValueError, KeyError, TypeError):
+                continue
+            if ts > cutoff:
+                command = entry.get("command", "")
+                rows.append((ts, normalize_command(command), command, entry.get("error_preview", "")))
+    return rows
+
+
+def _fingerprints_match(a: str, b: str) -> bool:
+    """Fuzzy match - one command is a prefix of the other."""
+    return a.startswith(b[:PREFIX_MATCH_CHARS]) or b.startswith(a[:PREFIX_MATCH_CHARS])
+
+
+def log_failure(command, error):
+    """Log a command failure for retry tracking."""
+    state_dir = get_state_dir()
+    state_dir.mkdir(parents=True, exist_ok=True)
+
+    log_file = _get_log_file()
+    new_session = not log_file.exists()
+
+    now = time.time()
+    entry = {
+        "timestamp": datetime.fromtimestamp(now).isoformat(),
+        "command": command[:200],  # Truncate long commands
+        "error_preview": str(error)[:200]
+    }
+
+    try:
+        conn = _connect()  # Before the append, so seeding can't double-count
+    except Exception:
+        conn = None
+
+    with open(log_file, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+    if conn is None:
+        return  # The JSONL log is still authoritative via the fallback
+    try:
+        with conn:
+            if new_session:
+                # session_start removed the log - forget last session too
+                conn.execute("DELETE FROM failures")
+            conn.execute(
+                "INSERT INTO failures (ts, fingerprint, command, error_preview) "
+                "VALUES (?, ?, ?, ?)",
+                (now, normalize_command(command), entry["command"], entry["error_preview"]),
+            )
+            conn.execute("DELETE FROM failures WHERE ts < ?", (now - RETENTION_SECONDS,))
+    except Exception:
+        pass
+    finally:
+        conn.close()
+
+
+def get_recent_failures(command, window_minutes=30):
+    """Count recent failures of similar commands."""
+    if not _get_log_file().exists():
+        return 0
+
+    cutoff = time.time() - (window_minutes * 60)
+    cmd_normalized = normalize_command(command)
+
+    try:
+        conn = _connect()
+        try:
+            rows = conn.execute(
+                "SELECT fingerprint FROM failures WHERE ts > ?", (cutoff,)
+            ).fetchall()
+        finally:
+            conn.close()
+    except Exception:
+        # Index unavailable - scan the log the old way
+        from state_utils import get_recent_failures as scan_failure_log
+        return scan_failure_log(command, window_minutes=window_minutes)
+
+    return sum(1 for (fingerprint,) in rows if _fingerprints_match(fingerprint, cmd_normalized))
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Operator's Edge - Hook Daemon
+Opt-in warm process for pre_tool.py and post_tool.py.
+
+Every tool call normally starts a fresh interpreter that re-imports
+edge_utils, rules_engine, pattern_engine and outcome_tracker before it can
+make a decision. The daemon keeps those modules loaded and serves hook
+invocations over a local Unix socket.
+
+The hook scripts stay the source of truth:
+- When the daemon is running, they forward the raw stdin JSON and relay
+  the daemon's stdout/stderr/exit code.
+- When it isn't (or anything goes wrong), they run in-process as before.
+- When a hook source file changes, the daemon refuses the call, shuts
+  down, and the hook falls back to a fresh interpreter.
+
+Usage:
+    python3 hook_daemon.py start     # Serve in the foreground
+    python3 hook_daemon.py stop      # Ask a running daemon to exit
+    python3 hook_daemon.py status    # Show pid and calls served
+
+Set EDGE_HOOK_DAEMON=0 to bypass a running daemon.
+"""
+import hashlib
+import io
+import json
+import os
+import socket
+import stat
+import sys
+import time
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Hooks the daemon is allowed to run (module name → entry point main()).
+SERVED_HOOKS = ("pre_tool", "post_tool")
+
+# Modules imported at startup so the first call is already warm.
+WARM_MODULES = (
+    "edge_utils",
+    "rules_engine",
+    "pattern_engine",
+    "outcome_tracker",
+    "learning_loop",
+    "pattern_metrics",
+)
+
+# Environment the hooks read; forwarded per call so one daemon can serve
+# sessions with different project dirs.
+FORWARDED_ENV = (
+    "CLAUDE_PROJECT_DIR",
+    "CODEX_PROJECT_DIR",
+    "EDGE_HOOK_TIMING",
+)
+
+CONNECT_TIMEOUT = 0.2   # seconds - give up fast and run in-process
+CALL_TIMEOUT = 150.0    # seconds - post_tool may run tests after a commit
+
+
+# =============================================================================
+# SOCKET LOCATION
+# =============================================================================
+
+def get_socket_path() -> str:
+    """
+    Get the daemon socket path for this hooks directory.
+
+    One daemon per hooks directory, since that's the code it serves. The
+    socket lives in a per-user 0700 directory (see is_trusted_socket).
+    Override with EDGE_HOOK_SOCKET.
+    """
+    override = os.environ.get("EDGE_HOOK_SOCKET")
+    if override:
+        return override
+
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    digest = hashlib.sha1(HOOKS_DIR.encode("utf-8")).hexdigest()[:10]
+    tmp_dir = os.environ.get("TMPDIR", "/tmp")
+    return os.path.join(tmp_dir, f"operators-edge-{uid}", f"hooks-{digest}.sock")
+
+
+def _owned_private(st: os.stat_result) -> bool:
+    """Owned by us and closed to group and others."""
+    return st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def is_trusted_socket(path: str) -> bool:
+    """
+    True if path is a socket only this user could have created.
+
+    The hooks send the full tool call to the daemon and obey its answer,
+    so a socket (or directory) another user owns or can write to is
+    never used - they could have put a listener there that says "allow".
+    """
+    try:
+        st = os.lstat(path)
+        parent = os.lstat(os.path.dirname(os.path.abspath(path)))
+    except OSError:
+        return False
+    return (stat.S_ISSOCK(st.st_mode) and _owned_private(st)
+            and stat.S_ISDIR(parent.st_mode) and _owned_private(parent))
+
+
+def daemon_available() -> bool:
+    """Check whether the daemon fast path can be attempted."""
+    if os.environ.get("EDGE_HOOK_DAEMON", "1") == "0":
+        return False
+    if not hasattr(socket, "AF_UNIX"):
+        return False  # Windows - always in-process
+    return is_trusted_socket(get_socket_path())
+
+
+# =============================================================================
+# CLIENT (used by the hook scripts)
+# =============================================================================
+
+def _call_daemon(request: dict, timeout: float = CALL_TIMEOUT) -> dict:
+    """Send one request and return the decoded response."""
+    socket_path = get_socket_path()
+    if not is_trusted_socket(socket_path):
+        raise OSError(f"Refusing untrusted daemon socket: {socket_path}")
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(socket_path)
+        sock.settimeout(timeout)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        sock.close()
+
+    return json.loads(b"".join(chunks).decode("utf-8"))
+
+
+def relay_to_daemon(hook_name: str) -> bool:
+    """
+    Forward this hook invocation to the daemon, if one is running.
+
+    On success, writes the daemon's output and exits the process with its
+    exit code. Returns False when the caller should run in-process; stdin
+    is left readable in that case.
+    """
+    if not daemon_available():
+        return False
+
+    raw = sys.stdin.read()
+    request = {
+        "hook": hook_name,
+        "stdin": raw,
+        "cwd": os.getcwd(),
+        "env": {k: os.environ[k] for k in FORWARDED_ENV if k in os.environ},
+    }
+
+    try:
+        response = _call_daemon(request)
+    except (OSError, ValueError):
+        response = {}
+
+    if response.get("status") != "ok":
+        # Daemon missing, stale, or broken - run the normal path
+        sys.stdin = io.StringIO(raw)
+        return False
+
+    sys.stderr.write(response.get("stderr", ""))
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stdout.flush()
+    sys.exit(response.get("exit_code", 0))
+
+
+# =============================================================================
+# SERVER
+# =============================================================================
+
+def _source_mtimes(hooks_dir: str) -> dict:
+    """Snapshot mtimes of the hook sources to detect edits."""
+    mtimes = {}
+    try:
+        for entry in os.scandir(hooks_dir):
+            if entry.name.endswith(".py"):
+                mtimes[entry.name] = entry.stat().st_mtime_ns
+    except OSError:
+        pass
+    return mtimes
+
+
+def run_hook_in_process(module, stdin_text: str, env: dict, cwd: str) -> dict:
+    """
+    Run a hook's main() with swapped stdio, env and cwd.
+
+    Mirrors what a fresh interpreter would see, including respond()'s
+    sys.exit() and uncaught exceptions.
+    """
+    saved_env = {k: os.environ.get(k) for k in FORWARDED_ENV}
+    saved_cwd = os.getcwd()
+    saved_stdio = (sys.stdin, sys.stdout, sys.stderr)
+    out, err = io.StringIO(), io.StringIO()
+    exit_code = 0
+
+    try:
+        for key in FORWARDED_ENV:
+            if key in env:
+                os.environ[key] = env[key]
+            else:
+                os.environ.pop(key, None)
+        if cwd and os.path.isdir(cwd):
+            os.chdir(cwd)
+
+        sys.stdin, sys.stdout, sys.stderr = io.StringIO(stdin_text), out, err
+        try:
+            module.main()
+        except SystemExit as e:
+            if e.code is None:
+                exit_code = 0
+            elif isinstance(e.code, int):
+                exit_code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                exit_code = 1
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            exit_code = 1
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = saved_stdio
+        os.chdir(saved_cwd)
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    return {
+        "status": "ok",
+        "stdout": out.getvalue(),
+        "stderr": err.getvalue(),
+        "exit_code": exit_code,
+    }
+
+
+class HookDaemon:
+    """Serve hook invocations from warm modules, one call at a time."""
+
+    def __init__(self, socket_path: str = None, hooks: dict = None,
+                 hooks_dir: str = HOOKS_DIR):
+        self.socket_path = socket_path or get_socket_path()
+        self.hooks_dir = hooks_dir
+        self.hooks = hooks if hooks is not None else self._import_hooks()
+        self.started_at = time.time()
+        self.calls_served = 0
+        self.stop_requested = False
+        self._mtimes = _source_mtimes(hooks_dir)
+        self._server = None
+
+    @staticmethod
+    def _import_hooks() -> dict:
+        import importlib
+
+        sys.path.insert(0, HOOKS_DIR)
+        for name in WARM_MODULES:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass  # Optional module - the hook handles its absence
+        return {name: importlib.import_module(name) for name in SERVED_HOOKS}
+
+    def is_stale(self) -> bool:
+        """True if any hook source changed since startup."""
+        return _source_mtimes(self.hooks_dir) != self._mtimes
+
+    def handle_request(self, request: dict) -> dict:
+        """Dispatch one decoded request."""
+        hook = request.get("hook", "")
+
+        if hook == "__ping__":
+            return {
+                "status": "ok",
+                "pid": os.getpid(),
+                "calls_served": self.calls_served,
+                "uptime_seconds": round(time.time() - self.started_at, 1),
+            }
+        if hook == "__stop__":
+            self.stop_requested = True
+            return {"status": "ok", "stopping": True}
+
+        if hook not in self.hooks:
+            return {"status": "error", "message": f"Unknown hook: {hook}"}
+
+        if self.is_stale():
+            # Never serve outdated enforcement code
+            self.stop_requested = True
+            return {"status": "stale"}
+
+        self.calls_served += 1
+        return run_hook_in_process(
+            self.hooks[hook],
+            request.get("stdin", ""),
+            request.get("env", {}) or {},
+            request.get("cwd", ""),
+        )
+
+    def serve(self, poll_interval: float = 0.5) -> None:
+        """Serve until stopped or stale."""
+        import socketserver
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    request = json.loads(self.rfile.readline().decode("utf-8"))
+                    response = daemon.handle_request(request)
+                except Exception as e:
+                    response = {"status": "error", "message": str(e)}
+                self.wfile.write(json.dumps(response).encode("utf-8"))
+
+        socket_dir = os.path.dirname(os.path.abspath(self.socket_path))
+        os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+        if not _owned_private(os.lstat(socket_dir)):
+            raise PermissionError(f"{socket_dir} must be a 0700 directory owned by this user")
+        if os.path.lexists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        # Created 0600 - no window where other users can connect
+        old_umask = os.umask(0o177)
+        try:
+            self._server = socketserver.UnixStreamServer(self.socket_path, Handler)
+        finally:
+            os.umask(old_umask)
+        self._server.timeout = poll_interval
+
+        try:
+            while not self.stop_requested:
+                self._server.handle_request()
+        finally:
+            self._server.server_close()
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else "status"
+
+    if command == "start":
+        if not hasattr(socket, "AF_UNIX"):
+            print("Hook daemon requires Unix domain sockets", file=sys.stderr)
+            return 1
+        print(f"Hook daemon serving on {get_socket_path()} (pid {os.getpid()})")
+        HookDaemon().serve()
+        return 0
+
+    if command in ("stop", "status"):
+        if not daemon_available():
+            print("Hook daemon is not running")
+            return 0 if command == "stop" else 1
+        try:
+            response = _call_daemon({"hook": "__stop__" if command == "stop" else "__ping__"},
+                                    timeout=5.0)
+        except (OSError, ValueError) as e:
+            print(f"Hook daemon not responding: {e}")
+            return 1
+        if command == "stop":
+            print("Hook daemon stopping")
+        else:
+            print(f"Hook daemon running: pid {response.get('pid')}, "
+                  f"{response.get('calls_served', 0)} calls served, "
+                  f"up {response.get('uptime_seconds', 0)}s")
+        return 0
+
+    print(f"Unknown command: {command}", file=sys.stderr)
+    print("Usage: python3 hook_daemon.py [start|stop|status]", file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
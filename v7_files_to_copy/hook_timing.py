@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Operator's Edge - Hook Timing
+Span tracing for hook checks, off unless EDGE_HOOK_TIMING=1.
+
+    trace = start_trace("pre_tool", tool_name)
+    with trace.span("check_bash_command"):
+        ...
+    trace.finish()
+
+When disabled, start_trace returns a shared no-op tracer whose span()
+hands back one reusable null context manager - no clock reads, no
+allocation, no I/O.
+
+When enabled, finish() appends one line per hook invocation to
+.proof/hook_timings.jsonl:
+
+    {"ts": ..., "hook": "pre_tool", "tool": "Edit", "total_ms": 12.3,
+     "spans": {"check_plan_requirement": 0.4, ...}}
+
+The log is a ring buffer: once it passes MAX_LOG_BYTES it is cut back
+to the newest KEEP_ENTRIES lines.
+
+Report:
+    python3 hook_timing.py report [--last N]
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from lazy_imports import lazy_function
+
+# Only needed once timing is on - a disabled tracer imports nothing more
+atomic_write_text = lazy_function("state_utils", "atomic_write_text")
+file_lock = lazy_function("state_utils", "file_lock")
+get_proof_dir = lazy_function("state_utils", "get_proof_dir")
+append_jsonl = lazy_function("jsonl_utils", "append_jsonl")
+tail_jsonl = lazy_function("jsonl_utils", "tail_jsonl")
+tail_lines = lazy_function("jsonl_utils", "tail_lines")
+
+TIMING_ENV = "EDGE_HOOK_TIMING"
+MAX_LOG_BYTES = 512 * 1024
+KEEP_ENTRIES = 2000
+PERCENTILES = (50, 95, 99)
+
+
+def get_timings_file() -> Path:
+    return get_proof_dir() / "hook_timings.jsonl"
+
+
+def timing_enabled() -> bool:
+    return os.environ.get(TIMING_ENV, "") not in ("", "0")
+
+
+# =============================================================================
+# TRACERS
+# =============================================================================
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _NullTrace:
+    __slots__ = ()
+
+    def span(self, name: str) -> _NullSpan:
+        return _NULL_SPAN
+
+    def finish(self) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+NULL_TRACE = _NullTrace()
+
+
+class _Span:
+    __slots__ = ("trace", "name", "start")
+
+    def __init__(self, trace: "Trace", name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        # Also recorded when the check exits the hook (respond -> SystemExit)
+        elapsed = (time.perf_counter() - self.start) * 1000
+        spans = self.trace.spans
+        spans[self.name] = spans.get(self.name, 0.0) + elapsed
+        return False
+
+
+class Trace:
+    """Timings of one hook invocation."""
+
+    def __init__(self, hook: str, tool: str):
+        self.hook = hook
+        self.tool = tool
+        self.spans: Dict[str, float] = {}
+        self.start = time.perf_counter()
+        self.finished = False
+
+    def span(self, name: str) -> _Span:
+        return _Span(self, name)
+
+    def finish(self) -> None:
+        """Write the invocation to the timings log (once)."""
+        if self.finished:
+            return
+        self.finished = True
+        entry = {
+            "ts": datetime.now().isoformat(),
+            "hook": self.hook,
+            "tool": self.tool,
+            "total_ms": round((time.perf_counter() - self.start) * 1000, 3),
+            "spans": {k: round(v, 3) for k, v in self.spans.items()},
+        }
+        try:
+            path = get_timings_file()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            append_jsonl(path, entry)
+            if path.stat().st_size > MAX_LOG_BYTES:
+                trim_log(path)
+        except Exception:
+            pass  # Timing must never break a hook
+
+
+def start_trace(hook: str, tool: str = ""):
+    """A Trace if timing is enabled, else the shared no-op tracer."""
+    if not timing_enabled():
+        return NULL_TRACE
+    return Trace(hook, tool or "")
+
+
+def trim_log(path: Optional[Path] = None, keep: Optional[int] = None) -> None:
+    """Cut the log back to its newest `keep` lines (default KEEP_ENTRIES)."""
+    path = path or get_timings_file()
+    keep = KEEP_ENTRIES if keep is None else keep
+    with file_lock(path):
+        if path.stat().st_size <= MAX_LOG_BYTES:
+            return  # Another process trimmed it first
+        lines = tail_lines(path, keep)
+        atomic_write_text(path, "".join(line.rstrip("\n") + "\n" for line in lines))
+
+
+# =============================================================================
+# REPORT
+# =============================================================================
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))  # ceil
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(entries: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Latency percentiles per check (span) and per tool_name (total).
+
+    Returns {"checks": {name: stats}, "tools": {name: stats}} where stats
+    has count, p50, p95, p99 and max, all in milliseconds.
+    """
+    checks: Dict[str, List[float]] = {}
+    tools: Dict[str, List[float]] = {}
+    for entry in entries:
+        for name, ms in (entry.get("spans") or {}).items():
+            if isinstance(ms, (int, float)):
+                checks.setdefault(name, []).append(ms)
+        total = entry.get("total_ms")
+        if isinstance(total, (int, float)):
+            tool = f"{entry.get('hook', '?')}:{entry.get('tool') or '-'}"
+            tools.setdefault(tool, []).append(total)
+
+    def stats(values: List[float]) -> Dict[str, float]:
+        values.sort()
+        result = {"count": len(values)}
+        for pct in PERCENTILES:
+            result[f"p{pct}"] = percentile(values, pct)
+        result["max"] = values[-1]
+        return result
+
+    return {
+        "checks": {k: stats(v) for k, v in checks.items()},
+        "tools": {k: stats(v) for k, v in tools.items()},
+    }
+
+
+def format_report(summary: Dict[str, Dict[str, Dict[str, float]]]) -> str:
+    lines = []
+    for title, key in (("Per check", "checks"), ("Per tool", "tools")):
+        rows = summary.get(key) or {}
+        lines.append(f"{title} (ms)")
+        lines.append(f"  {'name':<32} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+        for name, s in sorted(rows.items(), key=lambda kv: -kv[1]["p95"]):
+            lines.append(
+                f"  {name:<32} {s['count']:>6} {s['p50']:>8.2f} {s['p95']:>8.2f} "
+                f"{s['p99']:>8.2f} {s['max']:>8.2f}"
+            )
+        if not rows:
+            lines.append("  (no data)")
+        lines.append("")
+    return "\n".join(lines).rstrip("\n")
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) < 2 or argv[1] != "report":
+        print(f"Usage: hook_timing.py report [--last N]   (enable with {TIMING_ENV}=1)",
+              file=sys.stderr)
+        return 2
+    last = KEEP_ENTRIES
+    if "--last" in argv:
+        try:
+            last = int(argv[argv.index("--last") + 1])
+        except (IndexError, ValueError):
+            print("--last needs a number", file=sys.stderr)
+            return 2
+    entries = tail_jsonl(get_timings_file(), last)
+    print(f"Hook timings: {len(entries)} invocations from {get_timings_file()}")
+    print(format_report(summarize(entries)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
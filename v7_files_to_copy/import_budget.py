@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Operator's Edge - Import Budget
+Measures hook cold-start import cost with `python -X importtime`.
+
+Each hook module is imported in a fresh interpreter. The first run
+warms the bytecode cache (kept in a temporary pycache_prefix, so the
+hooks directory stays clean); the measured runs then see what a real
+hook invocation sees. The cost of a hook is the cumulative import time
+of its module, excluding interpreter startup.
+
+Budgets are per hook (HOOK_BUDGETS_MS, DEFAULT_BUDGET_MS otherwise);
+EDGE_IMPORT_BUDGET_MS overrides all of them. Wall-clock time depends on
+the machine, so budgets are checked here (--check), not in the tests.
+test_import_budget.py instead pins what the per-call hooks import:
+only EAGER_IMPORTS from the hooks directory, and none of HEAVY_MODULES.
+
+Usage:
+    python3 import_budget.py                 # all hooks, top imports each
+    python3 import_budget.py pre_tool --top 25
+    python3 import_budget.py --check         # exit 1 if over budget
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BUDGET_ENV = "EDGE_IMPORT_BUDGET_MS"
+
+# Entry points registered in .claude/settings.json
+HOOK_MODULES = (
+    "pre_tool",
+    "post_tool",
+    "session_start",
+    "stop_gate",
+    "plan_mode",
+    "dispatch_hook",
+    "edge_skill_hook",
+    "prune_skill_hook",
+)
+
+# pre_tool/post_tool run on every tool call, so they get the tight budget
+HOOK_BUDGETS_MS = {
+    "pre_tool": 40.0,
+    "post_tool": 40.0,
+}
+DEFAULT_BUDGET_MS = 100.0
+
+# Hook-directory modules pre_tool/post_tool may load at import time;
+# everything else is deferred (lazy_imports) to the path that needs it
+EAGER_IMPORTS = {
+    "pre_tool": {"pre_tool", "state_utils", "lazy_imports", "hook_timing"},
+    "post_tool": {"post_tool", "state_utils", "lazy_imports"},
+}
+
+# Slow-to-import stdlib packages no per-call hook should load up front
+HEAVY_MODULES = ("sqlite3", "difflib", "multiprocessing", "concurrent", "asyncio",
+                 "unittest", "email", "http", "xml", "dataclasses", "inspect")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+_PYCACHE = os.path.join(tempfile.gettempdir(), "edge-import-budget-pycache")
+
+
+def budget_for(module: str) -> float:
+    override = os.environ.get(BUDGET_ENV)
+    if override:
+        try:
+            return float(override)
+        except ValueError:
+            pass
+    return HOOK_BUDGETS_MS.get(module, DEFAULT_BUDGET_MS)
+
+
+def _python(args: List[str], env_extra: Optional[Dict[str, str]] = None):
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # Measure with a warm cache
+    env.update(env_extra or {})
+    return subprocess.run(
+        [sys.executable, "-X", f"pycache_prefix={_PYCACHE}"] + args,
+        capture_output=True, text=True, cwd=HOOKS_DIR, env=env, timeout=60,
+    )
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self_us, cumulative_us, depth) per line of -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        m = _IMPORTTIME_LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    return rows
+
+
+def measure_import(module: str) -> Dict[str, object]:
+    """
+    Cold-start import cost of one module.
+
+    Returns {"module", "total_ms", "imports": [(name, self_ms, cumulative_ms)]}
+    with imports sorted by self time; total_ms is None if the import failed.
+    """
+    _python(["-c", f"import {module}"])  # Warm the bytecode cache
+    result = _python(["-X", "importtime", "-c", f"import {module}"])
+    rows = parse_importtime(result.stderr)
+    total = next((cum for name, _, cum, depth in rows if name == module and depth == 0), None)
+    return {
+        "module": module,
+        "total_ms": total / 1000 if total is not None and result.returncode == 0 else None,
+        "imports": sorted(((n, s / 1000, c / 1000) for n, s, c, _ in rows),
+                          key=lambda r: -r[1]),
+        "error": result.stderr.strip().splitlines()[-1] if result.returncode else None,
+    }
+
+
+def measure_best_of(module: str, runs: int = 3) -> Dict[str, object]:
+    """Lowest of up to `runs` measurements - stops early once under budget."""
+    best = None
+    for _ in range(runs):
+        m = measure_import(module)
+        if m["total_ms"] is None:
+            return m
+        if best is None or m["total_ms"] < best["total_ms"]:
+            best = m
+        if best["total_ms"] <= budget_for(module):
+            break
+    return best
+
+
+def modules_imported(module: str) -> List[str]:
+    """Modules in sys.modules after importing `module` in a fresh interpreter."""
+    marker = "@@modules@@"
+    code = f"import json, sys\nimport {module}\nprint({marker!r} + json.dumps(sorted(sys.modules)))"
+    result = _python(["-c", code])
+    for line in result.stdout.splitlines():
+        if line.startswith(marker):
+            return json.loads(line[len(marker):])
+    raise RuntimeError(f"{module} failed to import: {result.stderr.strip()[-500:]}")
+
+
+def hook_local_modules() -> set:
+    """Names of the modules that live in the hooks directory."""
+    return {name[:-3] for name in os.listdir(HOOKS_DIR) if name.endswith(".py")}
+
+
+def modules_loaded(hook: str, payload: dict, project_dir: str) -> List[str]:
+    """
+    Modules in sys.modules after a hook's main() handles one payload.
+
+    Used to check that each tool path imports only what it needs.
+    """
+    marker = "@@modules@@"
+    code = (
+        "import io, json, sys\n"
+        f"sys.stdin = io.StringIO({json.dumps(json.dumps(payload))})\n"
+        f"import {hook}\n"
+        "try:\n"
+        f"    {hook}.main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print({marker!r} + json.dumps(sorted(sys.modules)), file=sys.stderr)\n"
+    )
+    result = _python(["-c", code], {"CLAUDE_PROJECT_DIR": project_dir, "EDGE_HOOK_DAEMON": "0"})
+    for line in result.stderr.splitlines():
+        if line.startswith(marker):
+            return json.loads(line[len(marker):])
+    raise RuntimeError(f"{hook} failed: {result.stderr.strip()[-500:]}")
+
+
+def format_measurement(m: Dict[str, object], top: int) -> str:
+    budget = budget_for(m["module"])
+    if m["total_ms"] is None:
+        return f"{m['module']}: import failed ({m['error']})"
+    status = "ok" if m["total_ms"] <= budget else "OVER BUDGET"
+    lines = [f"{m['module']}: {m['total_ms']:.1f}ms (budget {budget:.0f}ms) {status}"]
+    for name, self_ms, cum_ms in m["imports"][:top]:
+        lines.append(f"  {self_ms:>7.2f}ms self {cum_ms:>8.2f}ms cumulative  {name}")
+    return "\n".join(lines)
+
+
+def main(argv: List[str]) -> int:
+    top = 10
+    check = "--check" in argv
+    modules = []
+    args = iter(argv[1:])
+    for arg in args:
+        if arg == "--top":
+            top = int(next(args, "10"))
+        elif arg != "--check":
+            modules.append(arg)
+
+    over = False
+    for module in modules or HOOK_MODULES:
+        m = measure_best_of(module)
+        print(format_measurement(m, 0 if check else top))
+        if m["total_ms"] is None or m["total_ms"] > budget_for(module):
+            over = True
+    return 1 if check and over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Operator's Edge - Background Job Runner
+Runs slow hook work (post-commit tests, the first co-change index build)
+detached from the hook process.
+
+Each job has a status file in .claude/state/jobs/<name>.json:
+
+    {"status": "running" | "passed" | "failed",
+     "pid": ..., "started": ..., "finished": ..., "duration": ...,
+     "summary": "...", "rerun": false, "surfaced": false}
+
+  - start_job launches a detached worker (`job_runner.py run <name>`)
+    and returns at once
+  - If the job is already running, the request is coalesced: the
+    worker runs once more when it finishes, however many requests came
+    in meanwhile
+  - take_finished_result returns a finished result exactly once, so
+    the next hook invocation can show it
+
+All status changes happen under state_utils.file_lock.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from state_utils import atomic_write_text, file_lock, get_project_dir, get_state_dir
+
+# A running job older than this is assumed dead (e.g. machine slept)
+JOB_STALE_SECONDS = 30 * 60
+
+
+def _post_commit_tests() -> Tuple[bool, str]:
+    from post_tool import run_tests_after_commit
+    return run_tests_after_commit()
+
+
+def _cochange_index() -> Tuple[bool, str]:
+    from cochange_index import build_index
+    return build_index(get_project_dir())
+
+
+# Job name -> callable returning (success, summary)
+JOBS: Dict[str, Callable[[], Tuple[bool, str]]] = {
+    "post_commit_tests": _post_commit_tests,
+    "cochange_index": _cochange_index,
+}
+
+
+def get_jobs_dir() -> Path:
+    return get_state_dir() / "jobs"
+
+
+def get_status_file(name: str) -> Path:
+    return get_jobs_dir() / f"{name}.json"
+
+
+def read_status(name: str) -> Optional[Dict[str, Any]]:
+    """Current status record for a job, or None if it never ran."""
+    try:
+        return json.loads(get_status_file(name).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_status(name: str, status: Dict[str, Any]) -> None:
+    atomic_write_text(get_status_file(name), json.dumps(status, indent=2))
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+def _is_running(status: Optional[Dict[str, Any]]) -> bool:
+    if not status or status.get("status") != "running":
+        return False
+    if time.time() - status.get("started_ts", 0) > JOB_STALE_SECONDS:
+        return False
+    return _pid_alive(status.get("pid"))
+
+
+def _spawn_worker(name: str) -> int:
+    """Start `job_runner.py run <name>` detached from this process."""
+    kwargs: Dict[str, Any] = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = (
+            subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        )
+    else:
+        kwargs["start_new_session"] = True
+
+    # The worker runs from the hooks dir; pin the project so its status
+    # lands in the same .claude/state the hooks read
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "run", name],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env={**os.environ, "CLAUDE_PROJECT_DIR": str(get_project_dir())},
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        close_fds=True,
+        **kwargs,
+    )
+    return proc.pid
+
+
+def start_job(name: str) -> str:
+    """
+    Request a background run of a job.
+
+    Returns "started", or "coalesced" if a run is already in progress
+    (it will run again once more when done).
+    """
+    if name not in JOBS:
+        raise ValueError(f"Unknown job: {name}")
+
+    status_file = get_status_file(name)
+    with file_lock(status_file):
+        status = read_status(name)
+        if _is_running(status):
+            status["rerun"] = True
+            _write_status(name, status)
+            return "coalesced"
+
+        now = time.time()
+        status = {
+            "status": "running",
+            "pid": None,
+            "started": datetime.fromtimestamp(now).isoformat(),
+            "started_ts": now,
+            "rerun": False,
+            "surfaced": False,
+        }
+        _write_status(name, status)
+        status["pid"] = _spawn_worker(name)
+        _write_status(name, status)
+    return "started"
+
+
+def run_job(name: str) -> Dict[str, Any]:
+    """Worker body: run the job until no rerun is pending."""
+    job = JOBS[name]
+    while True:
+        start = time.time()
+        try:
+            success, summary = job()
+        except Exception as e:
+            success, summary = False, f"Job crashed: {e}"
+        duration = time.time() - start
+
+        with file_lock(get_status_file(name)):
+            status = read_status(name) or {}
+            if status.get("rerun"):
+                # More commits landed while we ran - go again
+                status.update(rerun=False, started=datetime.now().isoformat(),
+                              started_ts=time.time(), pid=os.getpid())
+                _write_status(name, status)
+                continue
+
+            status.update(
+                status="passed" if success else "failed",
+                pid=None,
+                finished=datetime.now().isoformat(),
+                duration=round(duration, 2),
+                summary=summary,
+                surfaced=False,
+            )
+            _write_status(name, status)
+            return status
+
+
+def take_finished_result(name: str) -> Optional[Dict[str, Any]]:
+    """
+    Return a finished job's result once; later calls return None.
+
+    A job whose worker died without reporting is returned as failed.
+    """
+    status = read_status(name)  # Unlocked peek - the common case is "nothing new"
+    if not status or status.get("surfaced"):
+        return None
+    if status.get("status") == "running" and _is_running(status):
+        return None
+
+    with file_lock(get_status_file(name)):
+        status = read_status(name)
+        if not status or status.get("surfaced"):
+            return None
+        if status.get("status") == "running":
+            if _is_running(status):
+                return None
+            status.update(status="failed", summary="Background run was interrupted", pid=None)
+        status["surfaced"] = True
+        _write_status(name, status)
+    return status
+
+
+def format_result(name: str, status: Dict[str, Any]) -> str:
+    """One-line report of a finished job."""
+    icon = "✅" if status.get("status") == "passed" else "❌"
+    label = name.replace("_", " ")
+    duration = status.get("duration")
+    took = f" ({duration:.1f}s)" if isinstance(duration, (int, float)) else ""
+    return f"{icon} Background {label}{took}: {status.get('summary', '')}"
+
+
+def main(argv) -> int:
+    if len(argv) == 3 and argv[1] == "run" and argv[2] in JOBS:
+        run_job(argv[2])
+        return 0
+    if len(argv) == 2 and argv[1] == "status":
+        for name in JOBS:
+            print(f"{name}: {json.dumps(read_status(name))}")
+        return 0
+    print("Usage: job_runner.py run <job> | status", file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
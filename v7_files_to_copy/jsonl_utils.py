@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Operator's Edge - JSONL Utilities
+Append-only writing and tail reading for the .proof/ and state logs.
+
+Design:
+  - One os.write() per entry on an O_APPEND descriptor, so concurrent
+    hook processes never interleave partial lines
+  - Per-call cost is flat: nothing is read back except the last byte
+  - A torn final line (crash mid-write) is terminated before appending
+  - fsync is a policy, not a given (see FSYNC_POLICY_ENV)
+
+Fsync policies (EDGE_PROOF_FSYNC):
+  entry     fsync after every append (default, matches the old behavior)
+  every:N   fsync every N appends per file, plus on exit
+  exit      fsync once when the process exits
+  never     leave it to the OS
+"""
+import atexit
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+FSYNC_POLICY_ENV = "EDGE_PROOF_FSYNC"
+DEFAULT_FSYNC_POLICY = "entry"
+
+# Read access is only used to peek at the last byte
+_OPEN_FLAGS = os.O_RDWR | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+
+
+def parse_fsync_policy(value: Optional[str]) -> tuple:
+    """
+    Parse a policy string into (mode, every_n).
+
+    Unknown values fall back to the default rather than failing a hook.
+    """
+    value = (value or DEFAULT_FSYNC_POLICY).strip().lower()
+    if value in ("entry", "exit", "never"):
+        return value, 1
+    if value.startswith("every:"):
+        try:
+            n = int(value.split(":", 1)[1])
+            if n > 0:
+                return "every", n
+        except ValueError:
+            pass
+    return DEFAULT_FSYNC_POLICY, 1
+
+
+def _read_byte_at(fd: int, offset: int) -> bytes:
+    """Read one byte without disturbing appends (O_APPEND ignores the offset)."""
+    if hasattr(os, "pread"):
+        return os.pread(fd, 1, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, 1)
+
+
+class AppendWriter:
+    """
+    Keeps one O_APPEND descriptor per log file for the life of the process.
+
+    Descriptors are re-opened if the file was rotated or deleted underneath
+    us (archive_old_sessions, manual cleanup), so a long-lived process such
+    as the hook daemon never writes into an unlinked inode.
+    """
+
+    def __init__(self, fsync_policy: Optional[str] = None):
+        if fsync_policy is None:
+            fsync_policy = os.environ.get(FSYNC_POLICY_ENV)
+        self.mode, self.every_n = parse_fsync_policy(fsync_policy)
+        self._fds: Dict[str, int] = {}
+        self._inodes: Dict[str, tuple] = {}
+        self._pending: Dict[str, int] = {}
+        self._atexit_registered = False
+
+    def _get_fd(self, path: Path) -> int:
+        key = str(path)
+        fd = self._fds.get(key)
+        if fd is not None:
+            try:
+                st = os.stat(key)
+                if (st.st_dev, st.st_ino) == self._inodes[key]:
+                    return fd
+            except FileNotFoundError:
+                pass
+            self._close(key)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(key, _OPEN_FLAGS, 0o644)
+        st = os.fstat(fd)
+        self._fds[key] = fd
+        self._inodes[key] = (st.st_dev, st.st_ino)
+        self._pending[key] = 0
+        return fd
+
+    def _close(self, key: str) -> None:
+        fd = self._fds.pop(key, None)
+        self._inodes.pop(key, None)
+        if fd is None:
+            return
+        try:
+            if self._pending.pop(key, 0) and self.mode != "never":
+                os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def append_line(self, path: Path, line: str) -> None:
+        """Append one line (newline added if missing) with a single write."""
+        path = Path(path)
+        key = str(path)
+        fd = self._get_fd(path)
+
+        data = line if line.endswith("\n") else line + "\n"
+        payload = data.encode("utf-8")
+
+        # Terminate a torn last line so this entry stays parseable
+        size = os.fstat(fd).st_size
+        if size and _read_byte_at(fd, size - 1) != b"\n":
+            payload = b"\n" + payload
+
+        written = os.write(fd, payload)
+        while written < len(payload):
+            written += os.write(fd, payload[written:])
+
+        self._pending[key] = self._pending.get(key, 0) + 1
+        self._after_write(key, fd)
+
+    def _after_write(self, key: str, fd: int) -> None:
+        if self.mode == "entry":
+            os.fsync(fd)
+            self._pending[key] = 0
+        elif self.mode == "every":
+            if self._pending[key] >= self.every_n:
+                os.fsync(fd)
+                self._pending[key] = 0
+            self._register_exit_flush()
+        elif self.mode == "exit":
+            self._register_exit_flush()
+
+    def _register_exit_flush(self) -> None:
+        if not self._atexit_registered:
+            atexit.register(self.close)
+            self._atexit_registered = True
+
+    def flush(self) -> None:
+        """fsync every file with unsynced appends."""
+        for key, fd in list(self._fds.items()):
+            if self._pending.get(key) and self.mode != "never":
+                try:
+                    os.fsync(fd)
+                except OSError:
+                    pass
+                self._pending[key] = 0
+
+    def close(self) -> None:
+        """Flush and close all descriptors."""
+        for key in list(self._fds):
+            self._close(key)
+
+
+_writer: Optional[AppendWriter] = None
+
+
+def get_append_writer() -> AppendWriter:
+    """Get the process-wide writer (policy read from the environment once)."""
+    global _writer
+    if _writer is None:
+        _writer = AppendWriter()
+    return _writer
+
+
+def append_jsonl(path: Path, entry: Dict[str, Any], lock: bool = True) -> None:
+    """
+    Append one JSON entry to a .jsonl file.
+
+    With lock=True the write happens under state_utils.file_lock so it
+    serializes with anything else that holds the same lock. If the lock
+    can't be acquired, the entry is still written - O_APPEND keeps it whole.
+    """
+    line = json.dumps(entry) + "\n"
+    writer = get_append_writer()
+
+    if not lock:
+        writer.append_line(path, line)
+        return
+
+    from state_utils import file_lock, DEFAULT_LOCK_TIMEOUT
+    try:
+        with file_lock(Path(path), timeout_seconds=DEFAULT_LOCK_TIMEOUT):
+            writer.append_line(path, line)
+    except TimeoutError:
+        # Degraded mode - still a single atomic append
+        writer.append_line(path, line)
+
+
+# =============================================================================
+# TAIL READING
+# =============================================================================
+
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def iter_lines_reversed(path: Path, block_size: int = TAIL_BLOCK_SIZE) -> Iterator[bytes]:
+    """
+    Yield the non-empty lines of a file from last to first.
+
+    Reads fixed-size blocks backwards from EOF, so the cost depends on how
+    many lines are consumed, not on the size of the file.
+    """
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        partial = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + partial).split(b"\n")
+            partial = lines[0]  # May continue in the previous block
+            for line in reversed(lines[1:]):
+                if line.strip():
+                    yield line
+        if partial.strip():
+            yield partial
+
+
+def tail_jsonl(
+    path: Path,
+    limit: int,
+    predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    The last `limit` JSON records of a .jsonl file, in file order.
+
+    Lines that don't parse - a torn final line from an interrupted write,
+    or a corrupt entry - are skipped and don't count toward the limit.
+    With a predicate, only matching records are counted and returned.
+    """
+    if limit <= 0:
+        return []
+    records: List[Dict[str, Any]] = []
+    try:
+        for line in iter_lines_reversed(path):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if predicate is not None and not predicate(entry):
+                continue
+            records.append(entry)
+            if len(records) >= limit:
+                break
+    except OSError:
+        pass
+    records.reverse()
+    return records
+
+
+def tail_lines(path: Path, limit: int) -> List[str]:
+    """The last `limit` non-empty lines of a file, in file order."""
+    lines: List[str] = []
+    if limit <= 0:
+        return lines
+    try:
+        for line in iter_lines_reversed(path):
+            lines.append(line.decode("utf-8", errors="replace"))
+            if len(lines) >= limit:
+                break
+    except OSError:
+        pass
+    lines.reverse()
+    return lines
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Operator's Edge - Lazy Imports
+Module-level stand-ins for `from module import name` that defer the import
+to the first call.
+
+Hook processes are short-lived and most tool calls only touch a few code
+paths, so a hook should pay for bash_risk when it sees a Bash command,
+not on every Read:
+
+    classify_command = lazy_function("bash_risk", "classify_command")
+
+The stand-in is an ordinary module attribute, so tests can keep patching
+`pre_tool.classify_command` as before. Once resolved, the real function
+is cached - like a from-import, later patches of the source module do
+not reach it.
+
+See import_budget.py for measuring what a hook imports at startup.
+"""
+import importlib
+from typing import Any, Callable
+
+
+def lazy_function(module: str, name: str) -> Callable[..., Any]:
+    """A callable that imports `module.name` on first use and delegates to it."""
+    target = None
+
+    def call(*args, **kwargs):
+        nonlocal target
+        if target is None:
+            target = getattr(importlib.import_module(module), name)
+        return target(*args, **kwargs)
+
+    call.__name__ = call.__qualname__ = name
+    call.__doc__ = f"Lazily imported {module}.{name}"
+    call.lazy_target = (module, name)
+    return call
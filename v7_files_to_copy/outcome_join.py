@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Operator's Edge - Outcome Join
+Offline recompute of rule_stats from outcome_tracking.jsonl.
+
+Live correlation goes through the pending store: pre_tool logs a surface
+event, post_tool finds it by file and logs the outcome with the surface
+embedded. When that hand-off is lost (store reset, pending entry expired
+or raced) the outcome's rules never reach rule_stats, and the stats
+drift from the log. This streams the log once and joins each outcome to
+its surface event:
+
+  1. by correlation_id, against the surface events seen so far
+  2. by the surface embedded in the outcome (its surface line is gone)
+  3. by file_path: the latest unmatched surface for the same file within
+     WINDOW_SECONDS before the outcome
+
+The log is in time order and a surface precedes its outcome, so this is
+a merge-join over a sliding window: surface events wait at most
+WINDOW_SECONDS (and at most MAX_PENDING of them are kept) before they
+are dropped as unmatched. Memory depends on the window, not the log.
+
+rebuild_rule_stats() then replaces rule_stats.json with the joined
+outcomes, keeping the check costs rules_engine recorded (those are not
+in this log, and may still be in the cost spool), and replaces the
+delta log it supersedes.
+
+Usage:
+    python3 outcome_join.py             # rebuild rule_stats.json
+    python3 outcome_join.py --dry-run   # report the join and the drift only
+"""
+import json
+import os
+import sys
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import outcome_tracker
+from outcome_tracker import PENDING_TTL_SECONDS
+
+# Same horizon as the live pending store
+WINDOW_SECONDS = PENDING_TTL_SECONDS
+MAX_PENDING = 50_000
+
+# rule_stats fields that come from check costs, not outcomes
+COST_FIELDS = ("checks", "total_ms", "max_ms", "overruns")
+
+Match = Tuple[Dict[str, Any], Dict[str, Any], str]
+
+
+def _epoch(timestamp: Any) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_events(path: Path, start: int = 0, end: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Events from byte start up to end, one line at a time."""
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return
+    with f:
+        f.seek(start)
+        while end is None or f.tell() < end:
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                break  # EOF, or a line still being written
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(event, dict):
+                yield event
+
+
+class SurfaceOutcomeJoin:
+    """
+    Streaming join of surface and outcome events.
+
+    feed() events in log order; it returns the (surface, outcome, method)
+    matches each event completes. counts tracks what happened to every
+    event; max_pending is the most surface events held at once.
+    """
+
+    def __init__(self, window_seconds: float = WINDOW_SECONDS, max_pending: int = MAX_PENDING):
+        self.window = window_seconds
+        self.max_pending = max_pending
+        self._pending: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._by_file: Dict[str, Deque[str]] = {}
+        self._clock = 0.0
+        self._serial = 0
+        self.max_pending_seen = 0
+        self.counts = {"surfaces": 0, "outcomes": 0, "by_id": 0, "embedded": 0,
+                       "by_file": 0, "unmatched_outcomes": 0, "unmatched_surfaces": 0,
+                       "skipped": 0}
+
+    def feed(self, event: Dict[str, Any]) -> List[Match]:
+        kind = event.get("type")
+        if kind not in ("surface", "outcome"):
+            self.counts["skipped"] += 1
+            return []
+        ts = _epoch(event.get("timestamp"))
+        if ts is not None:
+            self._clock = max(self._clock, ts)
+        else:
+            ts = self._clock  # Undated lines take the time of their neighbours
+        self._expire(self._clock - self.window)
+
+        if kind == "surface":
+            self.counts["surfaces"] += 1
+            self._add(event, ts)
+            return []
+
+        self.counts["outcomes"] += 1
+        match = self._match(event, ts)
+        if match is None:
+            self.counts["unmatched_outcomes"] += 1
+            return []
+        self.counts[match[2]] += 1
+        return [match]
+
+    def finish(self) -> None:
+        """End of log: the surface events still waiting are unmatched."""
+        self.counts["unmatched_surfaces"] += len(self._pending)
+        self._pending.clear()
+        self._by_file.clear()
+
+    def _add(self, surface: Dict[str, Any], ts: float) -> None:
+        key = surface.get("correlation_id")
+        if not key:
+            self._serial += 1
+            key = f"_anon_{self._serial}"
+        if key in self._pending:
+            self._drop(key)  # Reused id - the older surface can't be matched by it
+            self.counts["unmatched_surfaces"] += 1
+        self._pending[key] = (ts, surface)
+        self._by_file.setdefault(surface.get("file_path", ""), deque()).append(key)
+        if len(self._pending) > self.max_pending:
+            self._drop(next(iter(self._pending)))
+            self.counts["unmatched_surfaces"] += 1
+        self.max_pending_seen = max(self.max_pending_seen, len(self._pending))
+
+    def _drop(self, key: str) -> Dict[str, Any]:
+        _, surface = self._pending.pop(key)
+        file_path = surface.get("file_path", "")
+        keys = self._by_file.get(file_path)
+        if keys is not None:
+            try:
+                keys.remove(key)
+            except ValueError:
+                pass
+            if not keys:
+                del self._by_file[file_path]
+        return surface
+
+    def _expire(self, cutoff: float) -> None:
+        while self._pending:
+            key, (ts, _) = next(iter(self._pending.items()))
+            if ts >= cutoff:
+                break
+            self._drop(key)
+            self.counts["unmatched_surfaces"] += 1
+
+    def _match(self, outcome: Dict[str, Any], ts: float) -> Optional[Match]:
+        key = outcome.get("correlation_id")
+        if key and key in self._pending:
+            return self._drop(key), outcome, "by_id"
+
+        embedded = outcome.get("surface_event")
+        if isinstance(embedded, dict):
+            return embedded, outcome, "embedded"
+
+        file_path = outcome.get("file_path")
+        for key in reversed(self._by_file.get(file_path, ()) if file_path else ()):
+            surface_ts = self._pending[key][0]
+            if ts - self.window <= surface_ts <= ts:
+                return self._drop(key), outcome, "by_file"
+        return None
+
+
+def join_events(events: Iterable[Dict[str, Any]], join: Optional[SurfaceOutcomeJoin] = None
+                ) -> Iterator[Match]:
+    """(surface, outcome, method) for every outcome that finds its surface."""
+    join = join or SurfaceOutcomeJoin()
+    for event in events:
+        yield from join.feed(event)
+    join.finish()
+
+
+def _fold(join: SurfaceOutcomeJoin, stats: Dict[str, Any], events: Iterable[Dict[str, Any]]) -> None:
+    for event in events:
+        for surface, outcome, _ in join.feed(event):
+            rules_fired = surface.get("rules_fired") or []
+            if rules_fired:
+                outcome_tracker._apply_outcome(stats, rules_fired, bool(outcome.get("success")),
+                                               bool(outcome.get("override")))
+
+
+def _drift(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Tuple[int, int]]:
+    """times_fired before/after for the rules whose count changed."""
+    ids = set(before) | set(after)
+    fired = {rule_id: (before.get(rule_id, {}).get("times_fired", 0),
+                       after.get(rule_id, {}).get("times_fired", 0)) for rule_id in ids}
+    return {rule_id: counts for rule_id, counts in sorted(fired.items())
+            if counts[0] != counts[1]}
+
+
+def rebuild_rule_stats(dry_run: bool = False, log_file: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Recompute rule_stats.json from the outcome log.
+
+    The log is streamed without a lock; the tail written meanwhile is read
+    under the delta log lock, so every outcome logged before the new
+    snapshot is in it and the deltas it replaces can be dropped. Returns
+    the join counts, the drift from the current stats, and timing.
+    """
+    from state_utils import file_lock
+
+    start = time.perf_counter()
+    log_file = log_file or outcome_tracker._get_log_file()
+    join = SurfaceOutcomeJoin()
+    stats: Dict[str, Any] = {"rules": {}, "updated": None}
+
+    offset = outcome_tracker._file_size(log_file)
+    _fold(join, stats, iter_events(log_file, 0, offset))
+
+    deltas_file = outcome_tracker._get_deltas_file()
+    with file_lock(deltas_file):
+        _fold(join, stats, iter_events(log_file, offset))
+        join.finish()
+
+        current = outcome_tracker._read_snapshot()
+        delta_position = outcome_tracker._fold_log(current)
+        if dry_run:
+            spooled = outcome_tracker._read_cost_spool(outcome_tracker._get_cost_spool())
+        else:
+            spooled = outcome_tracker._drain_cost_spool()
+        outcome_tracker._apply_costs(current, spooled)
+
+        for rule_id, old in current.get("rules", {}).items():
+            costs = {k: old[k] for k in COST_FIELDS if k in old}
+            if costs:
+                stats["rules"].setdefault(rule_id, outcome_tracker._new_rule_stats()).update(costs)
+
+        if not dry_run:
+            outcome_tracker._save_folded(stats, delta_position)
+            outcome_tracker._discard_drained()
+            outcome_tracker._view = {}
+
+    return {
+        "counts": join.counts,
+        "max_pending": join.max_pending_seen,
+        "drift": _drift(current.get("rules", {}), stats["rules"]),
+        "rules": len(stats["rules"]),
+        "elapsed_s": time.perf_counter() - start,
+        "written": not dry_run,
+    }
+
+
+def format_rebuild_report(report: Dict[str, Any]) -> str:
+    c = report["counts"]
+    matched = c["by_id"] + c["embedded"] + c["by_file"]
+    lines = [
+        f"{c['surfaces']} surface / {c['outcomes']} outcome events in {report['elapsed_s']:.1f}s "
+        f"(at most {report['max_pending']} surfaces held)",
+        f"  matched   {matched}: {c['by_id']} by correlation_id, {c['embedded']} embedded, "
+        f"{c['by_file']} by file within {WINDOW_SECONDS // 60:.0f} minutes",
+        f"  unmatched {c['unmatched_outcomes']} outcomes, {c['unmatched_surfaces']} surfaces",
+    ]
+    if report["drift"]:
+        lines.append("  times_fired changed:")
+        for rule_id, (before, after) in report["drift"].items():
+            lines.append(f"    {rule_id}: {before} -> {after}")
+    else:
+        lines.append("  no drift from the current stats")
+    lines.append(f"rule_stats.json {'rebuilt' if report['written'] else 'unchanged (dry run)'} "
+                 f"({report['rules']} rules)")
+    return "\n".join(lines)
+
+
+def main(argv: List[str]) -> int:
+    dry_run = "--dry-run" in argv[1:]
+    try:
+        report = rebuild_rule_stats(dry_run=dry_run)
+    except TimeoutError:
+        print("rule_stats delta log is locked - try again", file=sys.stderr)
+        return 1
+    print(format_rebuild_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
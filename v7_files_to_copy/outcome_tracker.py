@@ -17,6 +17,7 @@ import json
 import os
 import random
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
@@ -30,8 +31,118 @@ from state_utils import get_proof_dir
 # CORRELATION ID MANAGEMENT
 # =============================================================================
 
-# In-memory store for pending correlations (per-session)
+# Pending correlations live in a small SQLite store so post_tool (a
+# separate process) can find what pre_tool surfaced. This dict is a
+# write-through cache of the current process's entries.
 _pending_correlations: Dict[str, Dict[str, Any]] = {}
+_pending_by_file: Dict[str, str] = {}
+
+# Surface events not matched by an outcome within this window are dropped
+# (e.g. the tool call was denied)
+PENDING_TTL_SECONDS = 30 * 60
+
+_PENDING_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending (
+    correlation_id TEXT PRIMARY KEY,
+    file_path TEXT NOT NULL,
+    created REAL NOT NULL,
+    event TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pending_file ON pending(file_path, created);
+"""
+
+
+def _get_pending_store() -> Path:
+    return get_proof_dir() / "correlations.sqlite"
+
+
+def _connect_pending():
+    from db_utils import connect
+    return connect(_get_pending_store(), _PENDING_SCHEMA)
+
+
+def _store_pending(event: Dict[str, Any]) -> None:
+    """Persist a surface event and evict expired ones."""
+    now = time.time()
+    try:
+        conn = _connect_pending()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO pending (correlation_id, file_path, created, event) "
+                    "VALUES (?, ?, ?, ?)",
+                    (event["correlation_id"], event["file_path"], now, json.dumps(event)),
+                )
+                conn.execute("DELETE FROM pending WHERE created < ?", (now - PENDING_TTL_SECONDS,))
+        finally:
+            conn.close()
+    except Exception:
+        pass  # Correlation is best effort - never fail the hook
+
+
+def _find_pending(file_path: str) -> Optional[str]:
+    """Newest unexpired correlation ID for a file in the shared store."""
+    try:
+        conn = _connect_pending()
+        try:
+            row = conn.execute(
+                "SELECT correlation_id FROM pending WHERE file_path = ? AND created > ? "
+                "ORDER BY created DESC LIMIT 1",
+                (file_path, time.time() - PENDING_TTL_SECONDS),
+            ).fetchone()
+        finally:
+            conn.close()
+    except Exception:
+        return None
+    return row[0] if row else None
+
+
+def _take_pending(correlation_id: str) -> Optional[Dict[str, Any]]:
+    """Remove a correlation from the shared store, returning its event."""
+    try:
+        conn = _connect_pending()
+        try:
+            with conn:
+                row = conn.execute(
+                    "SELECT event FROM pending WHERE correlation_id = ? AND created > ?",
+                    (correlation_id, time.time() - PENDING_TTL_SECONDS),
+                ).fetchone()
+                conn.execute("DELETE FROM pending WHERE correlation_id = ?", (correlation_id,))
+        finally:
+            conn.close()
+    except Exception:
+        return None
+    return json.loads(row[0]) if row else None
+
+
+def _event_time(event: Dict[str, Any]) -> float:
+    try:
+        return datetime.fromisoformat(event["timestamp"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+def _drop_local(correlation_id: str) -> Optional[Dict[str, Any]]:
+    """Remove a correlation from the in-memory cache (both indexes)."""
+    event = _pending_correlations.pop(correlation_id, None)
+    if event is not None and _pending_by_file.get(event.get("file_path")) == correlation_id:
+        del _pending_by_file[event["file_path"]]
+    return event
+
+
+def _expire_local() -> None:
+    """
+    Evict in-memory correlations past PENDING_TTL_SECONDS, as the store does.
+
+    Entries are inserted in time order, so only the oldest are checked; in
+    the long-lived hook daemon this keeps both indexes bounded.
+    """
+    cutoff = time.time() - PENDING_TTL_SECONDS
+    while _pending_correlations:
+        correlation_id, event = next(iter(_pending_correlations.items()))
+        if _event_time(event) > cutoff:
+            break
+        _drop_local(correlation_id)
 
 
 def generate_correlation_id() -> str:
@@ -63,8 +174,11 @@ def log_surface_event(
         "context_shown": context_shown,
     }
 
-    # Store in memory for correlation
+    # Store for correlation - in memory and for other hook processes
+    _expire_local()
     _pending_correlations[correlation_id] = event
+    _pending_by_file[file_path] = correlation_id
+    _store_pending(event)
 
     # Also persist to disk for analysis
     _append_to_log(event)
@@ -74,7 +188,8 @@ def log_outcome_event(
     correlation_id: str,
     success: bool,
     override: bool = False,
-    error_message: str = ""
+    error_message: str = "",
+    file_path: str = ""
 ) -> None:
     """
     Log the outcome of a tool execution.
@@ -86,14 +201,19 @@ def log_outcome_event(
         success: Whether the tool succeeded
         override: Whether the user overrode a rule warning
         error_message: Error details if failed
+        file_path: The file the tool touched (lets outcome_join match the
+            surface event when the correlation was lost)
     """
-    # Get the original surface event
-    surface_event = _pending_correlations.pop(correlation_id, None)
+    # Get the original surface event (store first, so it's always removed)
+    surface_event = _take_pending(correlation_id)
+    _expire_local()
+    surface_event = _drop_local(correlation_id) or surface_event
 
     event = {
         "type": "outcome",
         "correlation_id": correlation_id,
         "timestamp": datetime.now().isoformat(),
+        "file_path": file_path or (surface_event or {}).get("file_path", ""),
         "success": success,
         "override": override,
         "error_message": error_message[:500] if error_message else "",
@@ -113,23 +233,54 @@ def get_pending_correlation(file_path: str) -> Optional[str]:
 
     Used by post_tool to find the correlation ID for the current file.
     """
-    for corr_id, event in _pending_correlations.items():
-        if event.get("file_path") == file_path:
-            return corr_id
-    return None
+    _expire_local()
+    corr_id = _pending_by_file.get(file_path)
+    if corr_id in _pending_correlations:
+        return corr_id
+    return _find_pending(file_path)
 
 
 # =============================================================================
 # RULE EFFECTIVENESS TRACKING
 # =============================================================================
 
+# Outcomes are appended to a delta log (one line each, O(1) to write).
+# Readers share one aggregated view: the rule_stats.json snapshot plus
+# any deltas after its delta_offset. Once the log reaches COMPACT_BYTES
+# it is folded into the snapshot and replaced by an empty one, under the
+# same lock the appends take.
+COMPACT_BYTES = 64 * 1024
+
+# Check costs are recorded on every Edit/Write, so they skip the delta
+# log's lock and fsync: each batch is appended to a spool, which is
+# folded into the next outcome delta, or into a delta of its own once it
+# reaches COST_SPOOL_BYTES. Readers add the spool on top of the view.
+COST_SPOOL_BYTES = 16 * 1024
+
+# Aggregated view for this process, refreshed incrementally
+_view: Dict[str, Any] = {}
+
+# Unsynced appender for the cost spool
+_spool_writer = None
+
+
 def _get_stats_file() -> Path:
-    """Get the path to the rule stats file."""
+    """Get the path to the rule stats snapshot."""
     return get_proof_dir() / "rule_stats.json"
 
 
-def _load_rule_stats() -> Dict[str, Any]:
-    """Load rule effectiveness statistics."""
+def _get_deltas_file() -> Path:
+    """Get the path to the rule stats delta log."""
+    return get_proof_dir() / "rule_stats.deltas.jsonl"
+
+
+def _get_cost_spool() -> Path:
+    """Get the path to the check cost spool."""
+    return get_proof_dir() / "rule_costs.spool.jsonl"
+
+
+def _read_snapshot() -> Dict[str, Any]:
+    """Read the compacted snapshot (legacy files have no delta_offset)."""
     stats_file = _get_stats_file()
     if stats_file.exists():
         try:
@@ -140,35 +291,44 @@ def _load_rule_stats() -> Dict[str, Any]:
 
 
 def _save_rule_stats(stats: Dict[str, Any]) -> None:
-    """Save rule effectiveness statistics."""
-    stats_file = _get_stats_file()
-    stats_file.parent.mkdir(parents=True, exist_ok=True)
+    """Save the rule stats snapshot."""
+    from state_utils import atomic_write_text
     stats["updated"] = datetime.now().isoformat()
-    stats_file.write_text(json.dumps(stats, indent=2))
+    atomic_write_text(_get_stats_file(), json.dumps(stats, indent=2))
 
 
-def _update_rule_stats(
-    surface_event: Dict[str, Any],
-    success: bool,
-    override: bool
-) -> None:
-    """Update effectiveness stats for rules that fired."""
-    rules_fired = surface_event.get("rules_fired", [])
-    if not rules_fired:
-        return
+def _file_key(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
 
-    stats = _load_rule_stats()
 
+def _new_rule_stats() -> Dict[str, Any]:
+    return {
+        "times_fired": 0,
+        "times_success": 0,
+        "times_override": 0,
+        "times_override_success": 0,
+        "times_override_failure": 0,
+        "effectiveness": 0.0,
+    }
+
+
+def _apply_outcome(stats: Dict[str, Any], rules_fired: List[str],
+                   success: bool, override: bool) -> None:
+    """Fold one outcome into the stats for the rules that fired."""
     for rule_id in rules_fired:
         if rule_id not in stats["rules"]:
-            stats["rules"][rule_id] = {
-                "times_fired": 0,
-                "times_success": 0,
-                "times_override": 0,
-                "times_override_success": 0,
-                "times_override_failure": 0,
-                "effectiveness": 0.0,
-            }
+            stats["rules"][rule_id] = _new_rule_stats()
 
         rule_stats = stats["rules"][rule_id]
         rule_stats["times_fired"] += 1
@@ -196,18 +356,287 @@ def _update_rule_stats(
             )
             rule_stats["effectiveness"] = effective_outcomes / rule_stats["times_fired"]
 
+
+def _apply_costs(stats: Dict[str, Any], costs: Dict[str, Dict[str, Any]]) -> None:
+    """Fold check costs (from rules_engine's time budgets) into the stats."""
+    for rule_id, cost in costs.items():
+        rule_stats = stats["rules"].setdefault(rule_id, _new_rule_stats())
+        rule_stats["checks"] = rule_stats.get("checks", 0) + cost.get("checks", 0)
+        rule_stats["total_ms"] = round(rule_stats.get("total_ms", 0.0) + cost.get("ms", 0.0), 3)
+        rule_stats["max_ms"] = round(max(rule_stats.get("max_ms", 0.0), cost.get("max_ms", 0.0)), 3)
+        rule_stats["overruns"] = rule_stats.get("overruns", 0) + cost.get("overruns", 0)
+
+
+def _merge_costs(total: Dict[str, Dict[str, Any]], costs: Dict[str, Dict[str, Any]]) -> None:
+    """Add one batch of check costs to a running total."""
+    for rule_id, cost in costs.items():
+        into = total.setdefault(rule_id, {"checks": 0, "ms": 0.0, "max_ms": 0.0, "overruns": 0})
+        into["checks"] += cost.get("checks", 0)
+        into["ms"] = round(into["ms"] + cost.get("ms", 0.0), 3)
+        into["max_ms"] = max(into["max_ms"], cost.get("max_ms", 0.0))
+        into["overruns"] += cost.get("overruns", 0)
+
+
+def _read_cost_spool(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Total the complete batches in a cost spool."""
+    total: Dict[str, Dict[str, Any]] = {}
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return total
+    for line in data[:data.rfind(b"\n") + 1].splitlines():
+        try:
+            _merge_costs(total, json.loads(line))
+        except (ValueError, AttributeError):
+            continue
+    return total
+
+
+def _drain_cost_spool() -> Dict[str, Dict[str, Any]]:
+    """
+    Take the spooled costs, leaving an empty spool.
+
+    The spool is renamed away first so checks keep appending to a new
+    one; the caller writes the total to the delta log and then calls
+    _discard_drained(). A batch appended in the instant of the rename may
+    be dropped - these are statistics, not outcomes.
+    """
+    spool = _get_cost_spool()
+    draining = spool.with_name(f"{spool.name}.{os.getpid()}.draining")
+    try:
+        os.replace(spool, draining)
+    except OSError:
+        return {}
+    return _read_cost_spool(draining)
+
+
+def _discard_drained() -> None:
+    spool = _get_cost_spool()
+    try:
+        os.unlink(spool.with_name(f"{spool.name}.{os.getpid()}.draining"))
+    except OSError:
+        pass
+
+
+def _apply_deltas(stats: Dict[str, Any], data: bytes) -> int:
+    """Apply the complete delta lines in data; return the bytes consumed."""
+    end = data.rfind(b"\n") + 1  # A torn last line waits for the next read
+    for line in data[:end].splitlines():
+        try:
+            delta = json.loads(line)
+        except ValueError:
+            continue
+        if "costs" in delta:
+            _apply_costs(stats, delta["costs"])
+        _apply_outcome(stats, delta.get("rules", []),
+                       delta.get("success", False), delta.get("override", False))
+    return end
+
+
+def _fold_deltas(stats: Dict[str, Any], offset: int) -> int:
+    """Apply complete delta lines from offset onward; return the new offset."""
+    try:
+        with open(_get_deltas_file(), "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except OSError:
+        return offset
+    return offset + _apply_deltas(stats, data)
+
+
+def _fold_log(stats: Dict[str, Any]) -> Tuple[int, Optional[int]]:
+    """
+    Fold the deltas after the snapshot's log position into stats.
+
+    Pops the position from stats and reads from 0 instead if that log has
+    been replaced since. Returns (offset, inode) of the log actually read,
+    for _save_folded.
+    """
+    offset = stats.pop("delta_offset", 0)
+    inode = stats.pop("delta_inode", None)
+    try:
+        f = open(_get_deltas_file(), "rb")
+    except OSError:
+        return 0, None
+    with f:
+        st = os.fstat(f.fileno())
+        if inode is not None and inode != st.st_ino:
+            offset = 0
+        if offset > st.st_size:
+            offset = 0  # Legacy snapshot: the log was truncated after it was written
+        f.seek(offset)
+        data = f.read()
+    return offset + _apply_deltas(stats, data), st.st_ino
+
+
+def _save_folded(stats: Dict[str, Any], position: Tuple[int, Optional[int]]) -> None:
+    """
+    Save a snapshot holding the delta log up to position, then start a new log.
+
+    The snapshot names the log by inode and the log is replaced by rename,
+    so a crash at any point neither loses folded deltas nor applies them
+    twice: before the rename readers skip to offset, after it they see a
+    different inode and read the new log from the start. Call under the
+    delta log lock, with the position _fold_log returned.
+    """
+    from state_utils import atomic_write_text
+
+    offset, inode = position
+    stats["delta_offset"] = offset
+    stats["delta_inode"] = inode
     _save_rule_stats(stats)
 
+    deltas_file = _get_deltas_file()
+    try:
+        old_log = open(deltas_file, "rb")
+    except OSError:
+        return
+    with old_log:
+        if os.fstat(old_log.fileno()).st_ino != inode:
+            return  # Already replaced - readers start the new log from 0
+        atomic_write_text(deltas_file, "")
+        # A writer whose lock wait timed out may have appended after the fold
+        old_log.seek(offset)
+        tail = old_log.read()
+    tail = tail[:tail.rfind(b"\n") + 1]
+    if tail:
+        with open(deltas_file, "ab") as f:
+            f.write(tail)
+
+
+def _rebuild_view() -> Dict[str, Any]:
+    """Snapshot plus all pending deltas, read under the delta log lock."""
+    from state_utils import file_lock
+
+    def build():
+        stats = _read_snapshot()
+        offset, _ = _fold_log(stats)
+        return {"stats_file": _get_stats_file(), "snapshot": _file_key(_get_stats_file()),
+                "offset": offset, "stats": stats}
+
+    try:
+        with file_lock(_get_deltas_file()):
+            return build()
+    except TimeoutError:
+        return build()
+
+
+def _load_rule_stats() -> Dict[str, Any]:
+    """The aggregated view plus any spooled check costs."""
+    stats = _load_view()
+    spooled = _read_cost_spool(_get_cost_spool())
+    if not spooled:
+        return stats
+    stats = json.loads(json.dumps(stats))
+    _apply_costs(stats, spooled)
+    return stats
+
+
+def _load_view() -> Dict[str, Any]:
+    """Aggregated rule stats, shared by all read APIs (don't mutate)."""
+    global _view
+    stats_file = _get_stats_file()
+
+    if _view.get("stats_file") == stats_file and _view["snapshot"] == _file_key(stats_file):
+        size = _file_size(_get_deltas_file())
+        if size == _view["offset"]:
+            return _view["stats"]
+        if size > _view["offset"]:
+            # Only new deltas - fold them in, unless a compaction raced us
+            stats = json.loads(json.dumps(_view["stats"]))
+            offset = _fold_deltas(stats, _view["offset"])
+            if _view["snapshot"] == _file_key(stats_file):
+                _view = dict(_view, offset=offset, stats=stats)
+                return stats
+
+    _view = _rebuild_view()
+    return _view["stats"]
+
+
+def compact_rule_stats() -> None:
+    """Fold the delta log into the snapshot and start a new log."""
+    from state_utils import file_lock
+    global _view
+
+    with file_lock(_get_deltas_file()):
+        stats = _read_snapshot()
+        position = _fold_log(stats)
+        _apply_costs(stats, _drain_cost_spool())
+        _save_folded(stats, position)
+        _discard_drained()
+    _view = {}
+
+
+def _append_delta(delta: Dict[str, Any]) -> None:
+    """Append one delta, with any spooled costs, and compact when due."""
+    from jsonl_utils import append_jsonl
+
+    costs = _drain_cost_spool()
+    if costs:
+        delta["costs"] = costs
+    deltas_file = _get_deltas_file()
+    append_jsonl(deltas_file, delta)
+    _discard_drained()
+
+    if _file_size(deltas_file) >= COMPACT_BYTES:
+        try:
+            compact_rule_stats()
+        except TimeoutError:
+            pass  # Another process holds the log; compact next time
+
+
+def _update_rule_stats(
+    surface_event: Dict[str, Any],
+    success: bool,
+    override: bool
+) -> None:
+    """Record an outcome for the rules that fired (appends one delta)."""
+    rules_fired = surface_event.get("rules_fired", [])
+    if not rules_fired:
+        return
+
+    _append_delta({
+        "timestamp": datetime.now().isoformat(),
+        "rules": rules_fired,
+        "success": success,
+        "override": override,
+    })
+
+
+def record_rule_costs(costs: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Record what rule checks cost: {rule_id: {"checks", "ms", "max_ms", "overruns"}}.
+
+    Spooled without a lock or fsync and folded into the delta log later
+    (see COST_SPOOL_BYTES); rule_stats accumulates checks, total_ms,
+    max_ms and overruns per rule.
+    """
+    from jsonl_utils import AppendWriter
+    global _spool_writer
+
+    if not costs:
+        return
+
+    if _spool_writer is None:
+        _spool_writer = AppendWriter(fsync_policy="never")
+    spool = _get_cost_spool()
+    _spool_writer.append_line(spool, json.dumps(
+        {rule_id: {k: round(v, 3) if isinstance(v, float) else v for k, v in cost.items()}
+         for rule_id, cost in costs.items()}))
+
+    if _file_size(spool) >= COST_SPOOL_BYTES:
+        _append_delta({"timestamp": datetime.now().isoformat()})
+
 
 def get_rule_effectiveness(rule_id: str) -> Optional[Dict[str, Any]]:
     """Get effectiveness statistics for a specific rule."""
-    stats = _load_rule_stats()
-    return stats["rules"].get(rule_id)
+    rule_stats = _load_rule_stats()["rules"].get(rule_id)
+    return dict(rule_stats) if rule_stats is not None else None
 
 
 def get_all_rule_stats() -> Dict[str, Any]:
     """Get all rule effectiveness statistics."""
-    return _load_rule_stats()
+    return json.loads(json.dumps(_load_rule_stats()))
 
 
 def get_ineffective_rules(threshold: float = 0.3) -> List[Tuple[str, float]]:
@@ -266,20 +695,12 @@ def _append_to_log(event: Dict[str, Any]) -> None:
 
 def load_outcome_log(limit: int = 100) -> List[Dict[str, Any]]:
     """Load recent entries from the outcome tracking log."""
+    from jsonl_utils import tail_jsonl
+
     log_file = _get_log_file()
     if not log_file.exists():
         return []
-
-    events = []
-    try:
-        with open(log_file) as f:
-            for line in f:
-                if line.strip():
-                    events.append(json.loads(line))
-    except (json.JSONDecodeError, IOError):
-        pass
-
-    return events[-limit:]
+    return tail_jsonl(log_file, limit)
 
 
 # =============================================================================
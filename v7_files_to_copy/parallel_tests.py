@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Operator's Edge - Parallel Test Runner
+Runs the hook test modules across a process pool.
+
+Modules are sharded by their last recorded durations
+(.claude/state/test_durations.json) using longest-processing-time-first:
+the slowest module goes to the least loaded shard. Modules without a
+recorded duration count as the median of the known ones.
+
+The merged report ends like `python -m unittest`:
+
+    Ran 1616 tests in 3.102s
+
+    FAILED (failures=1, errors=2)
+
+so post_tool can parse it unchanged. Stdlib only.
+
+Usage:
+    python3 parallel_tests.py [-j N] [-v] [test_module ...]
+"""
+import io
+import json
+import multiprocessing
+import os
+import re
+import statistics
+import sys
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from state_utils import atomic_write_text, file_lock, get_state_dir
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+TEST_PATTERN = re.compile(r"^(test_.*)\.py$")
+DEFAULT_DURATION = 1.0
+
+
+def get_durations_file() -> Path:
+    return get_state_dir() / "test_durations.json"
+
+
+def load_durations() -> Dict[str, float]:
+    """Last measured seconds per test module."""
+    try:
+        data = json.loads(get_durations_file().read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {k: float(v) for k, v in data.items() if isinstance(v, (int, float))}
+
+
+def save_durations(measured: Dict[str, float]) -> None:
+    """Merge new measurements into the durations file."""
+    path = get_durations_file()
+    try:
+        with file_lock(path):
+            durations = load_durations()
+            durations.update({k: round(v, 3) for k, v in measured.items()})
+            atomic_write_text(path, json.dumps(durations, indent=2, sort_keys=True))
+    except (OSError, TimeoutError):
+        pass
+
+
+def discover_modules(test_dir: str = HOOKS_DIR) -> List[str]:
+    """Names of the test_*.py modules in a directory."""
+    try:
+        names = os.listdir(test_dir)
+    except OSError:
+        return []
+    return sorted(m.group(1) for m in map(TEST_PATTERN.match, names) if m)
+
+
+def plan_shards(modules: List[str], durations: Dict[str, float], jobs: int) -> List[List[str]]:
+    """
+    Split modules into at most `jobs` shards of similar total duration.
+
+    Greedy LPT: longest module first, each onto the lightest shard.
+    """
+    if not modules:
+        return []
+    known = [durations[m] for m in modules if m in durations]
+    fallback = statistics.median(known) if known else DEFAULT_DURATION
+    cost = {m: durations.get(m, fallback) for m in modules}
+
+    count = max(1, min(jobs, len(modules)))
+    shards: List[List[str]] = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for module in sorted(modules, key=lambda m: (-cost[m], m)):
+        lightest = loads.index(min(loads))
+        shards[lightest].append(module)
+        loads[lightest] += cost[module]
+    return shards
+
+
+def run_shard(test_dir: str, modules: List[str]) -> List[Dict[str, Any]]:
+    """
+    Worker body: run each module in turn.
+
+    Returns one plain dict per module so results can cross processes.
+    """
+    if test_dir not in sys.path:
+        sys.path.insert(0, test_dir)
+    cwd = os.getcwd()
+    os.chdir(test_dir)
+    try:
+        return [_run_module(module) for module in modules]
+    finally:
+        os.chdir(cwd)
+
+
+def _run_module(module: str) -> Dict[str, Any]:
+    start = time.time()
+    stream = io.StringIO()
+    suite = unittest.defaultTestLoader.loadTestsFromName(module)
+    result = unittest.TextTestRunner(stream=stream, verbosity=0).run(suite)
+    return {
+        "module": module,
+        "duration": time.time() - start,
+        "tests_run": result.testsRun,
+        "skipped": len(result.skipped),
+        "expected_failures": len(result.expectedFailures),
+        "unexpected_successes": len(result.unexpectedSuccesses),
+        "failures": [(str(test), trace) for test, trace in result.failures],
+        "errors": [(str(test), trace) for test, trace in result.errors],
+    }
+
+
+def _crashed(modules: List[str], error: BaseException) -> List[Dict[str, Any]]:
+    """Reports for a shard whose worker died."""
+    return [{
+        "module": m, "duration": 0.0, "tests_run": 0, "skipped": 0,
+        "expected_failures": 0, "unexpected_successes": 0, "failures": [],
+        "errors": [(f"{m} (shard worker)", f"Worker crashed: {error!r}\n")],
+    } for m in modules]
+
+
+def run_parallel(modules: List[str], jobs: Optional[int] = None,
+                 test_dir: str = HOOKS_DIR) -> List[Dict[str, Any]]:
+    """Run modules across a process pool and record their durations."""
+    jobs = jobs or os.cpu_count() or 1
+    shards = plan_shards(modules, load_durations(), jobs)
+
+    reports: List[Dict[str, Any]] = []
+    if len(shards) <= 1:
+        for shard in shards:
+            reports.extend(run_shard(test_dir, shard))
+    else:
+        # spawn: same behaviour on every platform, and no fork of a
+        # parent that may already hold threads or locks
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(shards), mp_context=context) as pool:
+            futures = [(shard, pool.submit(run_shard, test_dir, shard)) for shard in shards]
+            for shard, future in futures:
+                try:
+                    reports.extend(future.result())
+                except Exception as e:
+                    reports.extend(_crashed(shard, e))
+
+    save_durations({r["module"]: r["duration"] for r in reports if r["tests_run"]})
+    return reports
+
+
+def format_report(reports: List[Dict[str, Any]], elapsed: float, verbose: bool = False) -> str:
+    """Merged output in the shape of `python -m unittest`."""
+    lines = []
+    if verbose:
+        for r in sorted(reports, key=lambda r: -r["duration"]):
+            lines.append(f"{r['module']}: {r['tests_run']} tests in {r['duration']:.2f}s")
+        lines.append("")
+
+    for flavour, key in (("ERROR", "errors"), ("FAIL", "failures")):
+        for r in reports:
+            for test, trace in r[key]:
+                lines += ["=" * 70, f"{flavour}: {test}", "-" * 70, trace.rstrip("\n"), ""]
+
+    total = sum(r["tests_run"] for r in reports)
+    failures = sum(len(r["failures"]) for r in reports)
+    errors = sum(len(r["errors"]) for r in reports)
+    lines += ["-" * 70, f"Ran {total} test{'s' if total != 1 else ''} in {elapsed:.3f}s", ""]
+
+    details = []
+    if failures:
+        details.append(f"failures={failures}")
+    if errors:
+        details.append(f"errors={errors}")
+    for label, key in (("skipped", "skipped"), ("expected failures", "expected_failures"),
+                       ("unexpected successes", "unexpected_successes")):
+        count = sum(r[key] for r in reports)
+        if count:
+            details.append(f"{label}={count}")
+    status = "FAILED" if failures or errors or any(r["unexpected_successes"] for r in reports) else "OK"
+    lines.append(f"{status} ({', '.join(details)})" if details else status)
+    return "\n".join(lines)
+
+
+def reports_ok(reports: List[Dict[str, Any]]) -> bool:
+    return not any(r["failures"] or r["errors"] or r["unexpected_successes"] for r in reports)
+
+
+def main(argv: List[str]) -> int:
+    jobs = None
+    verbose = False
+    modules = []
+    args = iter(argv[1:])
+    for arg in args:
+        if arg == "-j":
+            jobs = int(next(args, "0")) or None
+        elif arg.startswith("-j"):
+            jobs = int(arg[2:]) or None
+        elif arg == "-v":
+            verbose = True
+        else:
+            modules.append(arg[:-3] if arg.endswith(".py") else arg)
+
+    start = time.time()
+    reports = run_parallel(modules or discover_modules(), jobs)
+    print(format_report(reports, time.time() - start, verbose), file=sys.stderr)
+    return 0 if reports_ok(reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -11,9 +11,11 @@ Metrics tracked:
 5. Rule effectiveness (fires, outcomes, overrides) [v7.0 NEW]
 6. Outcome correlation (rule → success/failure) [v7.0 NEW]
 """
+from collections import Counter
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Dict, List, Optional
+import hashlib
 import json
 import os
 from pathlib import Path
@@ -139,86 +141,209 @@ def load_metrics() -> List[Dict[str, Any]]:
     return events
 
 
+# =============================================================================
+# STREAMING AGGREGATION
+# =============================================================================
+
+# Bytes at the start of the log, and just before the checkpoint offset,
+# that identify it (detects replaced or rewritten files)
+_HEAD_BYTES = 256
+
+
+@dataclass
+class MetricsAggregate:
+    """Running totals over pattern_metrics.jsonl, up to byte `offset`."""
+    offset: int = 0
+    head: str = ""
+    tail: str = ""
+    total_events: int = 0
+    first_event: Optional[str] = None
+    last_event: Optional[str] = None
+    surfaces: int = 0
+    patterns_surfaced: int = 0
+    confidence: Counter = field(default_factory=Counter)
+    pattern_types: Counter = field(default_factory=Counter)
+    edits: Counter = field(default_factory=Counter)
+
+    def add(self, event: Dict[str, Any]) -> None:
+        """Fold one event into the totals."""
+        if self.total_events == 0:
+            self.first_event = event.get("timestamp")
+        self.last_event = event.get("timestamp")
+        self.total_events += 1
+
+        event_type = event.get("type")
+        if event_type == "surface":
+            self.surfaces += 1
+            self.patterns_surfaced += event.get("patterns_count", 0)
+            self.confidence.update(event.get("confidence_levels", []))
+            self.pattern_types.update(event.get("pattern_types", []))
+        elif event_type == "outcome":
+            group = "with" if event.get("patterns_shown", 0) > 0 else "without"
+            self.edits[group] += 1
+            if event.get("success", False):
+                self.edits[f"{group}_success"] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "offset": self.offset,
+            "head": self.head,
+            "tail": self.tail,
+            "total_events": self.total_events,
+            "first_event": self.first_event,
+            "last_event": self.last_event,
+            "surfaces": self.surfaces,
+            "patterns_surfaced": self.patterns_surfaced,
+            "confidence": dict(self.confidence),
+            "pattern_types": dict(self.pattern_types),
+            "edits": dict(self.edits),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MetricsAggregate":
+        return cls(
+            offset=data["offset"],
+            head=data["head"],
+            tail=data.get("tail", ""),
+            total_events=data["total_events"],
+            first_event=data.get("first_event"),
+            last_event=data.get("last_event"),
+            surfaces=data["surfaces"],
+            patterns_surfaced=data["patterns_surfaced"],
+            confidence=Counter(data["confidence"]),
+            pattern_types=Counter(data["pattern_types"]),
+            edits=Counter(data["edits"]),
+        )
+
+
+def get_checkpoint_file() -> Path:
+    """Get the path to the aggregation checkpoint."""
+    return get_metrics_file().with_name("pattern_metrics.checkpoint.json")
+
+
+def _load_checkpoint() -> Optional[MetricsAggregate]:
+    try:
+        return MetricsAggregate.from_dict(json.loads(get_checkpoint_file().read_text()))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_checkpoint(aggregate: MetricsAggregate) -> None:
+    try:
+        from state_utils import atomic_write_text
+        atomic_write_text(get_checkpoint_file(), json.dumps(aggregate.to_dict()))
+    except Exception:
+        pass  # Next call just re-reads more of the log
+
+
+def _tail_hash(f, offset: int) -> str:
+    """Hash of the _HEAD_BYTES bytes just before offset."""
+    start = max(0, offset - _HEAD_BYTES)
+    f.seek(start)
+    return hashlib.sha1(f.read(offset - start)).hexdigest()
+
+
+def update_metrics_aggregate() -> MetricsAggregate:
+    """
+    Bring the checkpointed totals up to date with the log.
+
+    Only events appended since the last call are read. The checkpoint is
+    discarded if the log was truncated, replaced or rewritten: its start
+    and the bytes just before the checkpoint offset must be unchanged.
+    """
+    metrics_file = get_metrics_file()
+    try:
+        f = open(metrics_file, "rb")
+    except OSError:
+        return MetricsAggregate()
+
+    with f:
+        head = hashlib.sha1(f.read(_HEAD_BYTES)).hexdigest()
+        size = f.seek(0, os.SEEK_END)
+
+        aggregate = _load_checkpoint()
+        if aggregate is None or aggregate.offset > size or (
+            aggregate.offset >= _HEAD_BYTES and aggregate.head != head
+        ) or aggregate.tail != _tail_hash(f, aggregate.offset):
+            aggregate = MetricsAggregate()
+        if aggregate.offset == size:
+            return aggregate
+
+        f.seek(aggregate.offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # Torn or in-progress last line - pick up next time
+            aggregate.offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                aggregate.add(json.loads(line))
+            except ValueError:
+                continue
+        aggregate.tail = _tail_hash(f, aggregate.offset)
+
+    aggregate.head = head
+    _save_checkpoint(aggregate)
+    return aggregate
+
+
 def compute_metrics_summary() -> Dict[str, Any]:
     """Compute summary statistics from metrics."""
-    events = load_metrics()
+    agg = update_metrics_aggregate()
 
-    if not events:
+    if not agg.total_events:
         return {
             "status": "no_data",
             "message": "No metrics collected yet",
         }
 
-    # Separate event types
-    surface_events = [e for e in events if e.get("type") == "surface"]
-    outcome_events = [e for e in events if e.get("type") == "outcome"]
-
     # 1. Pattern Surface Rate
     surface_rate = {
-        "total_surfaces": len(surface_events),
+        "total_surfaces": agg.surfaces,
         "avg_patterns_per_surface": (
-            sum(e.get("patterns_count", 0) for e in surface_events) / len(surface_events)
-            if surface_events else 0
+            agg.patterns_surfaced / agg.surfaces if agg.surfaces else 0
         ),
     }
 
     # 2. Pattern Relevance (confidence distribution)
-    all_confidences = []
-    for e in surface_events:
-        all_confidences.extend(e.get("confidence_levels", []))
-
+    total_confidences = sum(agg.confidence.values())
     relevance = {
-        "total_patterns_surfaced": len(all_confidences),
-        "high_confidence": all_confidences.count("high"),
-        "medium_confidence": all_confidences.count("medium"),
-        "low_confidence": all_confidences.count("low"),
+        "total_patterns_surfaced": total_confidences,
+        "high_confidence": agg.confidence["high"],
+        "medium_confidence": agg.confidence["medium"],
+        "low_confidence": agg.confidence["low"],
         "high_confidence_rate": (
-            all_confidences.count("high") / len(all_confidences)
-            if all_confidences else 0
+            agg.confidence["high"] / total_confidences if total_confidences else 0
         ),
     }
 
     # 3. Edit Success Rate (with vs without patterns)
-    edits_with_patterns = [e for e in outcome_events if e.get("patterns_shown", 0) > 0]
-    edits_without_patterns = [e for e in outcome_events if e.get("patterns_shown", 0) == 0]
-
-    success_with = sum(1 for e in edits_with_patterns if e.get("success", False))
-    success_without = sum(1 for e in edits_without_patterns if e.get("success", False))
-
+    edits_with = agg.edits["with"]
+    edits_without = agg.edits["without"]
     edit_success = {
-        "total_edits": len(outcome_events),
-        "edits_with_patterns": len(edits_with_patterns),
-        "edits_without_patterns": len(edits_without_patterns),
+        "total_edits": edits_with + edits_without,
+        "edits_with_patterns": edits_with,
+        "edits_without_patterns": edits_without,
         "success_rate_with_patterns": (
-            success_with / len(edits_with_patterns)
-            if edits_with_patterns else None
+            agg.edits["with_success"] / edits_with if edits_with else None
         ),
         "success_rate_without_patterns": (
-            success_without / len(edits_without_patterns)
-            if edits_without_patterns else None
+            agg.edits["without_success"] / edits_without if edits_without else None
         ),
     }
 
-    # 4. Pattern Types Distribution
-    all_types = []
-    for e in surface_events:
-        all_types.extend(e.get("pattern_types", []))
-
-    type_distribution = {}
-    for t in set(all_types):
-        type_distribution[t] = all_types.count(t)
-
     return {
         "status": "ok",
         "collection_period": {
-            "first_event": events[0].get("timestamp") if events else None,
-            "last_event": events[-1].get("timestamp") if events else None,
-            "total_events": len(events),
+            "first_event": agg.first_event,
+            "last_event": agg.last_event,
+            "total_events": agg.total_events,
         },
         "surface_rate": surface_rate,
         "relevance": relevance,
         "edit_success": edit_success,
-        "pattern_types": type_distribution,
+        # 4. Pattern Types Distribution
+        "pattern_types": dict(agg.pattern_types),
     }
 
 
@@ -380,10 +505,17 @@ def compute_rule_metrics() -> Dict[str, Any]:
         stats = get_all_rule_stats()
         impact = analyze_rule_impact()
 
+        try:
+            from rules_engine import get_quarantined_rules
+            quarantined = get_quarantined_rules()
+        except Exception:
+            quarantined = {}
+
         return {
             "status": "ok",
             "impact_summary": impact,
             "rule_stats": stats.get("rules", {}),
+            "quarantined": quarantined,
             "updated": stats.get("updated"),
         }
     except ImportError:
@@ -411,20 +543,42 @@ def format_rule_metrics(metrics: Dict[str, Any]) -> str:
 
     # Per-rule stats
     rule_stats = metrics.get("rule_stats", {})
+    quarantined = metrics.get("quarantined", {})
     if rule_stats:
         lines.append("**Per-Rule Stats**:")
         for rule_id, stats in sorted(rule_stats.items()):
             effectiveness = stats.get("effectiveness", 0)
             fires = stats.get("times_fired", 0)
-            if effectiveness >= 0.8:
+            if rule_id in quarantined:
+                icon = "⏸️"
+            elif effectiveness >= 0.8:
                 icon = "✅"
             elif effectiveness >= 0.5:
                 icon = "⚡"
             else:
                 icon = "⚠️"
-            lines.append(f"  {icon} **{rule_id}**: {effectiveness:.0%} effective ({fires} fires)")
+            if fires:
+                line = f"  {icon} **{rule_id}**: {effectiveness:.0%} effective ({fires} fires)"
+            else:
+                line = f"  {icon} **{rule_id}**: not fired yet"
+            checks = stats.get("checks", 0)
+            if checks:
+                line += (f" · {stats.get('total_ms', 0) / checks:.2f}ms avg, "
+                         f"{stats.get('max_ms', 0):.1f}ms max over {checks} checks")
+                if stats.get("overruns"):
+                    line += f", {stats['overruns']} over budget"
+            lines.append(line)
     lines.append("")
 
+    # Rules disabled for exceeding their time budget
+    for rule_id, info in sorted(quarantined.items()):
+        until = (f" until {datetime.fromtimestamp(info['until']).isoformat()[:16]}"
+                 if isinstance(info.get("until"), (int, float)) else "")
+        lines.append(f"⏸️ **{rule_id}** quarantined since {info.get('since', '?')[:16]}{until}: "
+                     f"{info.get('reason', 'over budget')}")
+    if quarantined:
+        lines.append("")
+
     # Recommendations
     ineffective = impact.get("ineffective_rules", 0)
     effective = impact.get("highly_effective_rules", 0)
@@ -436,6 +590,36 @@ def format_rule_metrics(metrics: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
+# =============================================================================
+# SURFACE CACHE METRICS
+# =============================================================================
+
+def compute_surface_cache_metrics() -> Dict[str, Any]:
+    """Hit rate of the pattern surfacing cache (surface_cache.py)."""
+    try:
+        from surface_cache import get_cache_stats
+        stats = get_cache_stats()
+    except ImportError:
+        return {"status": "unavailable", "message": "Surface cache not available"}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    if not stats["lookups"]:
+        return {"status": "no_data", "message": "No cached lookups yet"}
+    return {"status": "ok", **stats}
+
+
+def format_surface_cache_metrics(metrics: Dict[str, Any]) -> str:
+    """Format surface cache metrics as readable report."""
+    if metrics.get("status") != "ok":
+        return f"🗃️ **Surface Cache**: {metrics.get('message', 'No data')}"
+
+    lines = ["### 🗃️ Surface Cache", ""]
+    lines.append(f"  - Hit rate: {metrics['hit_rate']:.0%} "
+                 f"({metrics['hits']} hits / {metrics['lookups']} lookups)")
+    lines.append(f"  - Cached bundles: {metrics['entries']}")
+    return "\n".join(lines)
+
+
 def get_combined_metrics_report() -> str:
     """
     Generate a combined metrics report for both v6.0 (legacy) and v7.0 metrics.
@@ -452,6 +636,9 @@ def get_combined_metrics_report() -> str:
     lines.append(format_metrics_report(pattern_summary))
     lines.append("")
 
+    lines.append(format_surface_cache_metrics(compute_surface_cache_metrics()))
+    lines.append("")
+
     return "\n".join(lines)
 
 
@@ -7,7 +7,7 @@ Captures:
 1. All Bash command outputs (success and failure)
 2. File edit summaries
 3. Failures logged for retry blocking
-4. Post-commit test suggestions
+4. Post-commit runs of the affected tests (in the background)
 5. Pattern learning feedback (v6.0 Generative Layer)
 6. Outcome tracking for rule effectiveness (v7.0)
 """
@@ -16,16 +16,31 @@ import os
 import re
 import subprocess
 import sys
+import time
 from datetime import datetime
 
 # Add hooks directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from edge_utils import (
+
+if __name__ == "__main__":
+    # Opt-in fast path: a running hook daemon answers from warm modules
+    from hook_daemon import relay_to_daemon
+    relay_to_daemon("post_tool")
+
+from state_utils import (
     get_proof_dir,
-    log_failure,
     log_proof,
-    load_yaml_state,
 )
+from lazy_imports import lazy_function
+
+# Imported on first call: a Read only logs proof, Bash parsing and the
+# commit machinery load only when used (budget in test_import_budget.py)
+load_yaml_state = lazy_function("state_cache", "load_yaml_state")
+log_failure = lazy_function("failure_index", "log_failure")
+parse_command = lazy_function("command_segments", "parse_command")
+start_job = lazy_function("job_runner", "start_job")
+record_run = lazy_function("affected_tests", "record_run")
+select_tests = lazy_function("affected_tests", "select_tests")
 
 
 def is_git_commit_command(cmd):
@@ -66,7 +81,8 @@ def record_tool_outcome(tool_name, tool_input, success, error_message=""):
                 correlation_id=corr_id,
                 success=success,
                 override=False,  # TODO: detect when user overrode a warning
-                error_message=error_message
+                error_message=error_message,
+                file_path=file_path
             )
     except ImportError:
         pass  # Outcome tracker not available
@@ -111,18 +127,28 @@ def record_tool_outcome(tool_name, tool_input, success, error_message=""):
 
 
 def run_tests_after_commit():
-    """Run tests and return (success, summary)."""
+    """Run the tests affected by the latest commit and return (success, summary)."""
     hooks_dir = os.path.dirname(os.path.abspath(__file__))
+    selection = select_tests(hooks_dir)
+    if selection.modules == []:
+        return True, f"No tests to run ({selection.describe()})"
+
+    # Sharded across processes; prints the usual "Ran N tests" summary
+    cmd = [sys.executable, os.path.join(hooks_dir, 'parallel_tests.py')]
+    if not selection.full:
+        cmd += selection.modules
 
     try:
-        # Try to run unittest discover on the hooks test files
+        start = time.time()
         result = subprocess.run(
-            [sys.executable, '-m', 'unittest', 'discover', '-s', hooks_dir, '-p', 'test_*.py', '-v'],
+            cmd,
             capture_output=True,
             text=True,
             timeout=120,
             cwd=hooks_dir
         )
+        saved = record_run(selection, result.returncode == 0, time.time() - start)
+        scope = f" ({selection.describe(saved)})"
 
         # Parse output for test count
         output = result.stderr + result.stdout
@@ -130,13 +156,13 @@ def run_tests_after_commit():
         test_count = match.group(1) if match else "?"
 
         if result.returncode == 0:
-            return True, f"{test_count} tests passed"
+            return True, f"{test_count} tests passed{scope}"
         else:
             # Find failure details
             failures = re.findall(r'FAIL: (\w+)', output)
             errors = re.findall(r'ERROR: (\w+)', output)
             issues = failures + errors
-            return False, f"{len(issues)} test(s) failed: {', '.join(issues[:3])}"
+            return False, f"{len(issues)} test(s) failed: {', '.join(issues[:3])}{scope}"
     except subprocess.TimeoutExpired:
         return False, "Tests timed out after 120s"
     except Exception as e:
@@ -162,24 +188,31 @@ def main():
         cmd = tool_input.get("command", "")
         success = (exit_code == 0)
 
-        # Log the command execution
+        # Log the command execution, with the programs it ran
         result_preview = stdout[:500] if stdout else stderr[:500]
-        log_proof(tool_name, tool_input, result_preview, success)
+        logged_input = dict(tool_input)
+        if isinstance(cmd, str) and cmd:
+            logged_input["programs"] = parse_command(cmd.strip()).programs()
+        log_proof(tool_name, logged_input, result_preview, success)
 
         # If failed, log for retry blocking
         if not success:
             error_msg = stderr or stdout or f"Exit code {exit_code}"
             log_failure(cmd, error_msg)
 
-        # Post-commit test runner
+        # Post-commit test runner (background; result shown by pre_tool)
         if success and is_git_commit_command(cmd):
-            print("\n🧪 POST-COMMIT: Running tests...", file=sys.stderr)
-            test_success, test_summary = run_tests_after_commit()
-            if test_success:
-                print(f"✅ {test_summary}", file=sys.stderr)
-            else:
-                print(f"❌ {test_summary}", file=sys.stderr)
-                print("⚠️  Consider amending the commit after fixing tests.", file=sys.stderr)
+            try:
+                started = start_job("post_commit_tests")
+                if started == "coalesced":
+                    print("\n🧪 POST-COMMIT: Tests already running - will re-run when done",
+                          file=sys.stderr)
+                else:
+                    print("\n🧪 POST-COMMIT: Running tests in the background...", file=sys.stderr)
+            except Exception as e:
+                # Never run the suite inline - that is the wait the job runner removes
+                print(f"\n🧪 POST-COMMIT: Could not start background tests ({e}) - skipped",
+                      file=sys.stderr)
 
     # For Edit/Write, log the file change with diff content
     elif tool_name in ("Edit", "Write", "NotebookEdit"):
@@ -196,6 +229,12 @@ def main():
                 "old_string": old_string[:2000] if old_string else "",  # Truncate large diffs
                 "new_string": new_string[:2000] if new_string else ""
             }, f"Modified: {file_path}", success)
+        elif tool_name == "Write":
+            content = tool_input.get("content", "")
+            log_proof(tool_name, {
+                "file": file_path,
+                "content": content[:2000] if content else ""  # Same cap as Edit (rule_replay)
+            }, f"Modified: {file_path}", success)
         else:
             log_proof(tool_name, {"file": file_path}, f"Modified: {file_path}", success)
 
@@ -21,62 +21,39 @@ not by this hook. This hook only enforces safety constraints.
 """
 import json
 import os
-import re
 import sys
 from pathlib import Path
 
 # Add hooks directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from edge_utils import (
-    load_yaml_state,
-    get_recent_failures,
+
+if __name__ == "__main__":
+    # Opt-in fast path: a running hook daemon answers from warm modules
+    from hook_daemon import relay_to_daemon
+    relay_to_daemon("pre_tool")
+
+from state_utils import (
     respond,
     get_state_dir,
 )
+from hook_timing import start_trace
+from lazy_imports import lazy_function
+
+# Imported on first call, so each tool only loads the checks it runs
+# (budget enforced by test_import_budget.py)
+load_yaml_state = lazy_function("state_cache", "load_yaml_state")
+classify_command = lazy_function("bash_risk", "classify_command")
+get_recent_failures = lazy_function("failure_index", "get_recent_failures")
 
 
 def check_bash_command(cmd):
     """
     Gate Bash commands by risk level.
     Returns: (decision, reason) or None to continue checking
-    """
-    cmd_norm = cmd.strip()
-
-    # HARD BLOCK - Never allow these
-    BLOCK_PATTERNS = [
-        (r"(^|\s|&&|\|)rm\s+-rf\s+/", "Blocked: rm -rf on root"),
-        (r"(^|\s|&&|\|)rm\s+-rf\s+~", "Blocked: rm -rf on home"),
-        (r"(^|\s|&&|\|)rm\s+-rf\s+\.\.", "Blocked: rm -rf on parent"),
-        (r"(^|\s|&&|\|)git\s+reset\s+--hard", "Blocked: git reset --hard"),
-        (r"(^|\s|&&|\|)git\s+clean\s+-fdx", "Blocked: git clean -fdx"),
-        (r"(^|\s|&&|\|)git\s+push\s+.*--force", "Blocked: force push"),
-        (r"(^|\s|&&|\|)chmod\s+-R\s+777", "Blocked: chmod 777 recursive"),
-        (r"(^|\s|&&|\|):()\s*{\s*:|:&\s*};:", "Blocked: fork bomb"),
-        (r"(^|\s|&&|\|)mkfs\.", "Blocked: filesystem format"),
-        (r"(^|\s|&&|\|)dd\s+if=.*/dev/", "Blocked: dd from device"),
-    ]
 
-    for pattern, reason in BLOCK_PATTERNS:
-        if re.search(pattern, cmd_norm, re.IGNORECASE):
-            return ("block", reason)
-
-    # ASK CONFIRMATION - Risky but sometimes necessary
-    ASK_PATTERNS = [
-        (r"(^|\s|&&|\|)git\s+push(\s|$)", "Confirm: git push"),
-        (r"(^|\s|&&|\|)rm\s+(-r\s+)?[^|&;]+", "Confirm: file deletion"),
-        (r"(^|\s|&&|\|)kubectl\s+", "Confirm: kubernetes operation"),
-        (r"(^|\s|&&|\|)terraform\s+", "Confirm: terraform operation"),
-        (r"(^|\s|&&|\|)docker\s+push", "Confirm: docker push"),
-        (r"(^|\s|&&|\|)npm\s+publish", "Confirm: npm publish"),
-        (r"(^|\s|&&|\|)aws\s+", "Confirm: AWS operation"),
-        (r"(^|\s|&&|\|)gcloud\s+", "Confirm: GCloud operation"),
-    ]
-
-    for pattern, reason in ASK_PATTERNS:
-        if re.search(pattern, cmd_norm, re.IGNORECASE):
-            return ("ask", f"{reason}: {cmd_norm[:80]}")
-
-    return None
+    Patterns live in bash_risk.py, precompiled into a single-pass matcher.
+    """
+    return classify_command(cmd)
 
 def check_retry_blocking(cmd):
     """
@@ -143,10 +120,16 @@ def check_graduated_rules(tool_name, tool_input):
     rules_fired = []
 
     try:
-        from rules_engine import check_rules, format_violations, get_blocking_violation
+        from rules_engine import (
+            check_rules, format_violations, get_blocking_violation, take_notices,
+        )
 
         violations = check_rules(tool_name, tool_input)
 
+        # Rules quarantined for exceeding their time budget, or back from it
+        for notice in take_notices():
+            print(f"\n{notice}\n", file=sys.stderr)
+
         if not violations:
             return None, None, []
 
@@ -224,10 +207,13 @@ def surface_file_context(tool_name, tool_input):
     context_shown = []
 
     try:
-        from pattern_engine import surface_patterns, PatternType
+        from pattern_engine import PatternType
+        from surface_cache import surface_patterns_cached
 
-        bundle = surface_patterns(
+        # Same file/objective/step/state as a recent Edit reuses its bundle
+        bundle = surface_patterns_cached(
             state=state,
+            file_path=file_path,
             context=context,
             intent_action="file_modify",
             max_patterns=5  # Get more, we'll filter
@@ -264,6 +250,22 @@ def surface_file_context(tool_name, tool_input):
 
     return "", []
 
+def surface_job_results():
+    """Print results of background jobs (e.g. post-commit tests) once."""
+    try:
+        if not (get_state_dir() / "jobs").is_dir():
+            return  # No background job has run in this project yet
+        from job_runner import JOBS, format_result, take_finished_result
+        for name in JOBS:
+            status = take_finished_result(name)
+            if status:
+                print(f"\n{format_result(name, status)}\n", file=sys.stderr)
+                if status.get("status") == "failed" and name == "post_commit_tests":
+                    print("⚠️  Consider amending the commit after fixing tests.", file=sys.stderr)
+    except Exception:
+        pass  # Never fail the hook over a report
+
+
 def main():
     try:
         data = json.load(sys.stdin)
@@ -274,64 +276,78 @@ def main():
     tool_name = data.get("tool_name", "")
     tool_input = data.get("tool_input", {}) or {}
 
-    # Check 1: Bash-specific risk gating
-    if tool_name == "Bash":
-        cmd = tool_input.get("command", "")
-
-        # Check dangerous commands (hard block)
-        result = check_bash_command(cmd)
-        if result and result[0] == "block":
-            respond(*result)
-
-        # Check retry blocking
-        retry_result = check_retry_blocking(cmd)
-        if retry_result:
-            respond(*retry_result)
-
-        # If we had an "ask" from bash check (not hard block), apply it now
-        if result and result[0] == "ask":
+    # Per-check latency (no-op unless EDGE_HOOK_TIMING=1)
+    trace = start_trace("pre_tool", tool_name)
+    try:
+        # Report background jobs that finished since the last tool call
+        with trace.span("surface_job_results"):
+            surface_job_results()
+
+        # Check 1: Bash-specific risk gating
+        if tool_name == "Bash":
+            cmd = tool_input.get("command", "")
+
+            # Check dangerous commands (hard block)
+            with trace.span("check_bash_command"):
+                result = check_bash_command(cmd)
+            if result and result[0] == "block":
+                respond(*result)
+
+            # Check retry blocking
+            with trace.span("check_retry_blocking"):
+                retry_result = check_retry_blocking(cmd)
+            if retry_result:
+                respond(*retry_result)
+
+            # If we had an "ask" from bash check (not hard block), apply it now
+            if result and result[0] == "ask":
+                respond(*result)
+
+        # Check 2: Plan requirement for edits
+        with trace.span("check_plan_requirement"):
+            result = check_plan_requirement(tool_name, tool_input)
+        if result:
             respond(*result)
 
-    # Check 2: Plan requirement for edits
-    result = check_plan_requirement(tool_name, tool_input)
-    if result:
-        respond(*result)
-
-    # Check 3: Graduated rules enforcement (v7.0)
-    # Proven lessons become enforceable rules
-    action, message, rules_fired = check_graduated_rules(tool_name, tool_input)
-
-    # Check 4: Surface file context (v7.0)
-    # Shows CONTEXT (related files, risks) not WISDOM (lessons)
-    # Lessons are handled by rules (Check 3)
-    file_context, context_shown = surface_file_context(tool_name, tool_input)
-    if file_context:
-        print(f"\n{file_context}\n", file=sys.stderr)
-
-    # v7.0: Log surface event for outcome tracking
-    if rules_fired or context_shown:
-        try:
-            from outcome_tracker import generate_correlation_id, log_surface_event
-            file_path = tool_input.get("file_path", "")
-            corr_id = generate_correlation_id()
-            log_surface_event(
-                correlation_id=corr_id,
-                file_path=file_path,
-                rules_fired=rules_fired,
-                context_shown=context_shown,
-                tool_name=tool_name
-            )
-        except ImportError:
-            pass  # Outcome tracker not available
-        except Exception:
-            pass  # Don't fail the hook if tracking fails
-
-    # If rules had a blocking violation, respond now
-    if action:
-        respond(action, message)
-
-    # All checks passed
-    respond("approve", "Passed all pre-tool checks")
+        # Check 3: Graduated rules enforcement (v7.0)
+        # Proven lessons become enforceable rules
+        with trace.span("check_graduated_rules"):
+            action, message, rules_fired = check_graduated_rules(tool_name, tool_input)
+
+        # Check 4: Surface file context (v7.0)
+        # Shows CONTEXT (related files, risks) not WISDOM (lessons)
+        # Lessons are handled by rules (Check 3)
+        with trace.span("surface_file_context"):
+            file_context, context_shown = surface_file_context(tool_name, tool_input)
+        if file_context:
+            print(f"\n{file_context}\n", file=sys.stderr)
+
+        # v7.0: Log surface event for outcome tracking
+        if rules_fired or context_shown:
+            try:
+                from outcome_tracker import generate_correlation_id, log_surface_event
+                file_path = tool_input.get("file_path", "")
+                corr_id = generate_correlation_id()
+                log_surface_event(
+                    correlation_id=corr_id,
+                    file_path=file_path,
+                    rules_fired=rules_fired,
+                    context_shown=context_shown,
+                    tool_name=tool_name
+                )
+            except ImportError:
+                pass  # Outcome tracker not available
+            except Exception:
+                pass  # Don't fail the hook if tracking fails
+
+        # If rules had a blocking violation, respond now
+        if action:
+            respond(action, message)
+
+        # All checks passed
+        respond("approve", "Passed all pre-tool checks")
+    finally:
+        trace.finish()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Operator's Edge - Rule Replay
+Evaluates a candidate rule against recorded history before it graduates.
+
+get_graduation_candidates promotes lessons on reinforcement count alone.
+This replays a candidate Rule over every Edit/Write in the proof logs -
+the live sessions (.proof/sessions/*.jsonl) and the sessions already
+merged into .proof/archive.jsonl - and reports:
+
+  - fire rate: how many recorded calls the rule would have flagged
+  - latency: what its check adds per Edit/Write, measured on the replay
+  - overlap: for each existing rule, how many of those calls it flags too
+
+Logs are split into byte ranges (CHUNK_BYTES, cut at line boundaries)
+and replayed across a process pool; each worker returns small per-chunk
+totals, so memory stays flat however much history there is. Calls are
+checked without the diff stage (check_rules_batch(diff=False)) because
+the files on disk are not the ones they were made against.
+
+Calls are rebuilt from what post_tool logged: an Edit's old_string and
+new_string, a Write's content, each cut to its first 2000 characters.
+Calls logged without their content (Writes, before post_tool recorded
+it) can't be replayed; they are counted as unreplayable instead.
+
+Check functions cross processes by name, so a candidate's check_fn must
+be one of rules_engine.CHECK_FUNCTIONS.
+
+Usage:
+    python3 rule_replay.py --rule python-shebang         # an existing rule
+    python3 rule_replay.py --id no-todo --trigger '\\.py$' --check check_python_shebang
+    python3 rule_replay.py --rule python-shebang -j 8 --json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rules_engine import Rule, RuleIndex, check_rules_batch, load_rules
+
+CHUNK_BYTES = 4 * 1024 * 1024
+MAX_SAMPLES = 5
+
+REPLAYED_TOOLS = ("Edit", "Write")
+_TOOL_MARKERS = tuple(f'"{tool}"'.encode() for tool in REPLAYED_TOOLS)
+
+Chunk = Tuple[str, int, int]
+
+
+def get_log_files(proof_dir: Optional[Path] = None) -> List[Path]:
+    """Session logs, oldest first, then the archive they are merged into."""
+    if proof_dir is None:
+        from state_utils import get_proof_dir
+        proof_dir = get_proof_dir()
+    files = sorted((proof_dir / "sessions").glob("*.jsonl"))
+    archive = proof_dir / "archive.jsonl"
+    if archive.is_file():
+        files.append(archive)
+    return files
+
+
+def plan_chunks(files: List[Path], chunk_bytes: int = CHUNK_BYTES) -> List[Chunk]:
+    """(path, start, end) byte ranges covering every file."""
+    chunks = []
+    for path in files:
+        try:
+            size = path.stat().st_size
+        except OSError:
+            continue
+        for start in range(0, size, chunk_bytes):
+            chunks.append((str(path), start, min(start + chunk_bytes, size)))
+    return chunks
+
+
+def _tool_input(tool_name: str, preview: Any) -> Optional[Dict[str, Any]]:
+    """The tool_input a logged input_preview stands for, or None if it isn't logged."""
+    if not isinstance(preview, dict):
+        return None
+    file_path = preview.get("file") or preview.get("file_path")
+    if not file_path:
+        return None
+    if tool_name == "Edit" and "new_string" in preview:
+        return {"file_path": file_path, "old_string": preview.get("old_string", ""),
+                "new_string": preview["new_string"]}
+    if tool_name == "Write" and "content" in preview:
+        return {"file_path": file_path, "content": preview["content"]}
+    return None
+
+
+def iter_calls(chunk: Chunk) -> Iterator[Tuple[str, Optional[Dict[str, Any]], str]]:
+    """
+    (tool_name, tool_input, timestamp) for the Edits/Writes in a byte range.
+
+    tool_input is None for a call whose content wasn't logged. A range
+    owns the lines that start inside it; the line straddling its start
+    belongs to the previous range.
+    """
+    path, start, end = chunk
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return
+    with f:
+        if start:
+            f.seek(start - 1)
+            f.readline()  # Finish the previous range's line
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            if not any(marker in line for marker in _TOOL_MARKERS):
+                continue  # Most entries are Bash/Read - skip the JSON parse
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(entry, dict) or entry.get("tool") not in REPLAYED_TOOLS:
+                continue
+            tool_input = _tool_input(entry["tool"], entry.get("input_preview"))
+            yield entry["tool"], tool_input, entry.get("timestamp", "")
+
+
+def _empty_result() -> Dict[str, Any]:
+    return {"calls": 0, "unreplayable": 0, "matched": 0, "fires": 0, "redundant": 0,
+            "candidate_ms": 0.0, "max_ms": 0.0, "overlap": {}, "samples": [],
+            "first": None, "last": None}
+
+
+def replay_chunk(chunk: Chunk, candidate: Dict[str, Any],
+                 existing: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Worker body: replay one byte range.
+
+    Rules arrive as to_dict() dicts and results leave as a plain dict so
+    both can cross processes.
+    """
+    candidate_index = RuleIndex([Rule(**candidate)])
+    result = _empty_result()
+    calls = []
+    for call in iter_calls(chunk):
+        if call[1] is None:
+            result["unreplayable"] += 1
+        else:
+            calls.append(call)
+    if not calls:
+        return result
+
+    # Existing rules in one batch - repeated calls are checked once
+    existing_fires = check_rules_batch([(t, i) for t, i, _ in calls],
+                                       RuleIndex([Rule(**r) for r in existing]), diff=False)
+
+    for (tool_name, tool_input, timestamp), others in zip(calls, existing_fires):
+        result["calls"] += 1
+        if timestamp:
+            result["first"] = min(result["first"] or timestamp, timestamp)
+            result["last"] = max(result["last"] or timestamp, timestamp)
+        if not candidate_index.rules_for(tool_input["file_path"]):
+            continue
+
+        # Timed one call at a time, as pre_tool would run it
+        start = time.perf_counter()
+        fired = check_rules_batch([(tool_name, tool_input)], candidate_index, diff=False)[0]
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        result["matched"] += 1
+        result["candidate_ms"] += elapsed_ms
+        result["max_ms"] = max(result["max_ms"], elapsed_ms)
+        if not fired:
+            continue
+
+        result["fires"] += 1
+        if others:
+            result["redundant"] += 1
+        for rule_id in {v.rule_id for v in others}:
+            result["overlap"][rule_id] = result["overlap"].get(rule_id, 0) + 1
+        if len(result["samples"]) < MAX_SAMPLES:
+            result["samples"].append({"timestamp": timestamp, "tool": tool_name,
+                                      "file_path": tool_input["file_path"],
+                                      "context": fired[0].context})
+    return result
+
+
+def merge_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Add up per-chunk results."""
+    total = _empty_result()
+    for r in results:
+        for key in ("calls", "unreplayable", "matched", "fires", "redundant", "candidate_ms"):
+            total[key] += r[key]
+        total["max_ms"] = max(total["max_ms"], r["max_ms"])
+        for rule_id, count in r["overlap"].items():
+            total["overlap"][rule_id] = total["overlap"].get(rule_id, 0) + count
+        total["samples"].extend(r["samples"][:MAX_SAMPLES - len(total["samples"])])
+        for key, pick in (("first", min), ("last", max)):
+            if r[key]:
+                total[key] = pick(total[key] or r[key], r[key])
+    return total
+
+
+def replay_rule(candidate: Rule, existing: Optional[List[Rule]] = None,
+                files: Optional[List[Path]] = None, jobs: Optional[int] = None,
+                chunk_bytes: int = CHUNK_BYTES) -> Dict[str, Any]:
+    """
+    Replay a candidate rule over the proof logs.
+
+    existing defaults to load_rules() without the candidate's id; files to
+    get_log_files(). Returns merged totals plus:
+      fire_rate      fires / replayed Edit+Write calls
+      ms_per_call    candidate check time averaged over all calls
+      ms_per_match   ... over the calls its trigger matched
+      overlap_rate   share of fires an existing rule also flagged
+    """
+    if existing is None:
+        existing = [r for r in load_rules() if r.id != candidate.id]
+    if files is None:
+        files = get_log_files()
+    chunks = plan_chunks(files, chunk_bytes)
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(chunks)))
+    args = (candidate.to_dict(), [r.to_dict() for r in existing])
+
+    start = time.perf_counter()
+    if jobs == 1:
+        results = [replay_chunk(chunk, *args) for chunk in chunks]
+    else:
+        # spawn, as in parallel_tests: no fork of a parent holding locks
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+            futures = [pool.submit(replay_chunk, chunk, *args) for chunk in chunks]
+            results = [future.result() for future in futures]
+
+    report = merge_results(results)
+    calls, matched, fires = report["calls"], report["matched"], report["fires"]
+    report.update({
+        "rule_id": candidate.id,
+        "files": len(files),
+        "chunks": len(chunks),
+        "jobs": jobs,
+        "elapsed_s": time.perf_counter() - start,
+        "fire_rate": fires / calls if calls else 0.0,
+        "ms_per_call": report["candidate_ms"] / calls if calls else 0.0,
+        "ms_per_match": report["candidate_ms"] / matched if matched else 0.0,
+        "overlap_rate": report["redundant"] / fires if fires else 0.0,
+    })
+    return report
+
+
+def format_replay_report(report: Dict[str, Any]) -> str:
+    """Readable summary of replay_rule's result."""
+    lines = [f"### 🔁 Replay: {report['rule_id']}", ""]
+    skipped = (f"- **Unreplayable**: {report['unreplayable']} calls logged "
+               f"without their content")
+    if not report["calls"]:
+        lines.append("No recorded Edit/Write calls to replay.")
+        if report["unreplayable"]:
+            lines.append(skipped)
+        return "\n".join(lines)
+
+    span = f" ({report['first'][:10]} → {report['last'][:10]})" if report["first"] else ""
+    lines.append(f"- **Replayed**: {report['calls']} Edit/Write calls from "
+                 f"{report['files']} logs{span} in {report['elapsed_s']:.1f}s "
+                 f"({report['jobs']} workers)")
+    if report["unreplayable"]:
+        lines.append(skipped)
+    lines.append(f"- **Fire rate**: {report['fire_rate']:.1%} ({report['fires']} fires, "
+                 f"trigger matched {report['matched']} calls)")
+    lines.append(f"- **Latency**: {report['ms_per_call']:.3f}ms per call, "
+                 f"{report['ms_per_match']:.3f}ms per matched call, "
+                 f"{report['max_ms']:.1f}ms max")
+    if report["fires"]:
+        lines.append(f"- **Overlap**: {report['overlap_rate']:.0%} of fires already "
+                     f"flagged by an existing rule")
+        for rule_id, count in sorted(report["overlap"].items(), key=lambda kv: -kv[1]):
+            lines.append(f"  - {rule_id}: {count}/{report['fires']}")
+    for sample in report["samples"]:
+        lines.append(f"- e.g. {sample['timestamp'][:19]} {sample['tool']} "
+                     f"{sample['file_path']}: {sample['context']}")
+    return "\n".join(lines)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Replay a candidate rule over recorded history")
+    parser.add_argument("--rule", help="id of an existing rule to replay against the others")
+    parser.add_argument("--id", help="id of a new candidate rule")
+    parser.add_argument("--trigger", help="trigger_pattern of the new rule")
+    parser.add_argument("--check", help="check_fn of the new rule")
+    parser.add_argument("--message", default="", help="message of the new rule")
+    parser.add_argument("-j", "--jobs", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print the raw report")
+    args = parser.parse_args(argv[1:])
+
+    if args.rule:
+        candidate = next((r for r in load_rules() if r.id == args.rule), None)
+        if candidate is None:
+            parser.error(f"no rule with id {args.rule!r}")
+    elif args.id and args.trigger and args.check:
+        candidate = Rule(id=args.id, trigger_pattern=args.trigger, check_fn=args.check,
+                         message=args.message or args.id)
+    else:
+        parser.error("give --rule, or --id with --trigger and --check")
+
+    if not RuleIndex([candidate]).rules:
+        parser.error(f"{candidate.id}: unknown check_fn or bad trigger_pattern")
+
+    report = replay_rule(candidate, jobs=args.jobs)
+    print(json.dumps(report, indent=2) if args.json else format_replay_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -12,13 +12,16 @@ Graduation Criteria:
 - Evergreen lessons stay as lessons (they should always surface)
 - User can manually promote/demote via /edge rules
 """
+import json
 import os
 import re
 import sys
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 # Add hooks directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -35,6 +38,8 @@ class Rule:
     source_lesson: Dict[str, Any] = field(default_factory=dict)
     enabled: bool = True
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    max_bytes: Optional[int] = None  # Content examined per call (None: DEFAULT_MAX_BYTES)
+    max_ms: Optional[float] = None  # Wall-clock budget per call (None: DEFAULT_MAX_MS)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -46,6 +51,8 @@ class Rule:
             "source_lesson": self.source_lesson,
             "enabled": self.enabled,
             "created_at": self.created_at,
+            "max_bytes": self.max_bytes,
+            "max_ms": self.max_ms,
         }
 
 
@@ -66,6 +73,169 @@ class RuleViolation:
             return ("warn", f"📋 Rule: {self.rule_message}")
 
 
+# =============================================================================
+# CONTENT VIEW
+# =============================================================================
+
+# Content a check examines per call unless its rule sets max_bytes
+DEFAULT_MAX_BYTES = 256 * 1024
+
+
+class ContentView:
+    """
+    The text an Edit/Write adds, read lazily and within a budget.
+
+    Check functions read content through this rather than lowercasing or
+    splitting the whole payload: lines() yields one line at a time so a
+    check can stop at its first hit, first_line() never looks past the
+    first newline, and neither reads beyond max_bytes characters. A
+    multi-megabyte Write then costs each rule at most its budget.
+
+    `regions` - (start, end) offsets of changed lines, from changed_regions()
+    - narrows lines() and first_line() to what the call actually changed;
+    None means all of the text is new. contains() still searches the whole
+    text, for checks that need the surrounding context.
+    """
+
+    def __init__(self, text: str, file_path: str = "",
+                 max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+                 regions: Optional[List[Tuple[int, int]]] = None):
+        self.text = text
+        self.file_path = file_path
+        self.max_bytes = max_bytes
+        self.regions = regions
+
+    @classmethod
+    def from_tool_input(cls, tool_input: Dict[str, Any],
+                        max_bytes: Optional[int] = DEFAULT_MAX_BYTES) -> "ContentView":
+        text = tool_input.get("new_string", "") or tool_input.get("content", "")
+        return cls(text if isinstance(text, str) else "",
+                   tool_input.get("file_path", ""), max_bytes)
+
+    def limited(self, max_bytes: Optional[int]) -> "ContentView":
+        """The same content with a different budget."""
+        return ContentView(self.text, self.file_path, max_bytes, self.regions)
+
+    def _end(self) -> int:
+        if self.max_bytes is None:
+            return len(self.text)
+        return min(len(self.text), self.max_bytes)
+
+    def __bool__(self) -> bool:
+        return bool(self.text) and self.regions != []
+
+    def first_line(self) -> str:
+        """The first line, or "" if the call didn't change it."""
+        if self.regions is not None and (not self.regions or self.regions[0][0] != 0):
+            return ""
+        end = self._end()
+        newline = self.text.find("\n", 0, end)
+        return self.text[:newline if newline >= 0 else end]
+
+    def lines(self) -> Iterator[str]:
+        """Lines in order, stopping at the budget (a cut line is yielded cut)."""
+        text = self.text
+        budget = self._end()
+        for start, stop in self.regions if self.regions is not None else [(0, len(text))]:
+            end = min(stop, start + budget)
+            budget -= end - start
+            while start < end:
+                newline = text.find("\n", start, end)
+                if newline < 0:
+                    yield text[start:end]
+                    break
+                yield text[start:newline]
+                start = newline + 1
+            if budget <= 0:
+                return
+
+    def contains(self, needle: str) -> bool:
+        """Case-insensitive search of the whole text, within the budget."""
+        return re.search(re.escape(needle), self.text[:self._end()], re.IGNORECASE) is not None
+
+
+# =============================================================================
+# DIFF STAGE
+# =============================================================================
+
+# Old + new text beyond this is not diffed; rules see all of the new text
+DIFF_MAX_BYTES = 2 * 1024 * 1024
+
+
+def changed_regions(old: str, new: str) -> Optional[List[Tuple[int, int]]]:
+    """
+    (start, end) offsets in `new` of the lines added or modified since `old`.
+
+    Linear in the input: the common leading and trailing lines are
+    stripped, then a line in between counts as unchanged if `old` still
+    has an unused copy of it (a multiset match, so a duplicated line is
+    still reported once). Lines that only moved are not reported.
+    Offsets cover whole lines, newline included. Returns None when the
+    texts are too large to diff.
+    """
+    if len(old) + len(new) > DIFF_MAX_BYTES:
+        return None
+
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    limit = min(len(old_lines), len(new_lines))
+    head = 0
+    while head < limit and old_lines[head] == new_lines[head]:
+        head += 1
+    tail = 0
+    while tail < limit - head and old_lines[-1 - tail] == new_lines[-1 - tail]:
+        tail += 1
+
+    available: Dict[str, int] = {}
+    for line in old_lines[head:len(old_lines) - tail]:
+        available[line] = available.get(line, 0) + 1
+
+    regions: List[Tuple[int, int]] = []
+    offset = sum(len(line) for line in new_lines[:head])
+    for line in new_lines[head:len(new_lines) - tail]:
+        end = offset + len(line)
+        if available.get(line):
+            available[line] -= 1
+        elif regions and regions[-1][1] == offset:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((offset, end))
+        offset = end
+    return regions
+
+
+def _read_existing(file_path: str) -> Optional[str]:
+    """Current content of the file a Write will replace, if small enough."""
+    try:
+        if os.path.getsize(file_path) > DIFF_MAX_BYTES:
+            return None
+        with open(file_path, encoding="utf-8", errors="replace") as f:
+            return f.read()
+    except (OSError, ValueError):
+        return None
+
+
+def content_view(tool_name: str, tool_input: Dict[str, Any]) -> ContentView:
+    """
+    The content rules should check for a call, narrowed to its changes.
+
+    Edit: new_string against old_string. Write: content against the file
+    it replaces (a new file is all new). Anything else: all of the text.
+    """
+    view = ContentView.from_tool_input(tool_input, max_bytes=None)
+    if not view.text:
+        return view
+    if tool_name == "Edit":
+        old = tool_input.get("old_string", "")
+    elif tool_name == "Write":
+        old = _read_existing(view.file_path)
+    else:
+        old = None
+    if isinstance(old, str) and old:
+        view.regions = changed_regions(old, view.text)
+    return view
+
+
 # =============================================================================
 # GRADUATED RULES
 # These are lessons that have been reinforced enough to become enforcement
@@ -86,10 +256,11 @@ def _is_policy_file(file_path: str) -> bool:
     return any(re.search(p, file_path, re.IGNORECASE) for p in policy_patterns)
 
 
-def _has_should_must_without_hook_ref(content: str) -> bool:
+def _has_should_must_without_hook_ref(content: Union[str, Iterable[str]]) -> bool:
     """Check if content has 'should' or 'must' without mentioning hooks."""
-    lines = content.lower().split('\n')
+    lines = ContentView(content, max_bytes=None).lines() if isinstance(content, str) else content
     for line in lines:
+        line = line.lower()
         # Skip lines that mention hooks, enforcement, or are code
         if 'hook' in line or 'enforce' in line or line.strip().startswith('#'):
             continue
@@ -98,7 +269,8 @@ def _has_should_must_without_hook_ref(content: str) -> bool:
     return False
 
 
-def check_policy_has_enforcement(tool_input: Dict[str, Any]) -> Optional[RuleViolation]:
+def check_policy_has_enforcement(tool_input: Dict[str, Any],
+                                 view: Optional[ContentView] = None) -> Optional[RuleViolation]:
     """
     Rule: Policy is not enforcement - hooks are enforcement.
 
@@ -111,11 +283,12 @@ def check_policy_has_enforcement(tool_input: Dict[str, Any]) -> Optional[RuleVio
         return None
 
     # Get the new content being written
-    new_content = tool_input.get("new_string", "") or tool_input.get("content", "")
-    if not new_content:
+    if view is None:
+        view = ContentView.from_tool_input(tool_input)
+    if not view:
         return None
 
-    if _has_should_must_without_hook_ref(new_content):
+    if _has_should_must_without_hook_ref(view.lines()):
         return RuleViolation(
             rule_id="policy-enforcement",
             rule_message="Policy is not enforcement - hooks are enforcement",
@@ -127,7 +300,8 @@ def check_policy_has_enforcement(tool_input: Dict[str, Any]) -> Optional[RuleVio
     return None
 
 
-def check_python_shebang(tool_input: Dict[str, Any]) -> Optional[RuleViolation]:
+def check_python_shebang(tool_input: Dict[str, Any],
+                         view: Optional[ContentView] = None) -> Optional[RuleViolation]:
     """
     Rule: Use 'python3' not 'python' for cross-platform compatibility.
 
@@ -138,12 +312,13 @@ def check_python_shebang(tool_input: Dict[str, Any]) -> Optional[RuleViolation]:
     if not file_path.endswith(".py"):
         return None
 
-    new_content = tool_input.get("new_string", "") or tool_input.get("content", "")
-    if not new_content:
+    if view is None:
+        view = ContentView.from_tool_input(tool_input)
+    if not view:
         return None
 
     # Check first line for shebang
-    first_line = new_content.split('\n')[0] if new_content else ""
+    first_line = view.first_line()
 
     # Bad: #!/usr/bin/env python or #!/usr/bin/python
     # Good: #!/usr/bin/env python3 or no shebang
@@ -159,7 +334,8 @@ def check_python_shebang(tool_input: Dict[str, Any]) -> Optional[RuleViolation]:
     return None
 
 
-def check_resolved_archived(tool_input: Dict[str, Any]) -> Optional[RuleViolation]:
+def check_resolved_archived(tool_input: Dict[str, Any],
+                            view: Optional[ContentView] = None) -> Optional[RuleViolation]:
     """
     Rule: Resolved = archived; only living context stays in active state.
 
@@ -171,23 +347,30 @@ def check_resolved_archived(tool_input: Dict[str, Any]) -> Optional[RuleViolatio
     if "active_context.yaml" not in file_path:
         return None
 
-    new_content = tool_input.get("new_string", "") or tool_input.get("content", "")
-    if not new_content:
+    if view is None:
+        view = ContentView.from_tool_input(tool_input)
+    if not view:
         return None
 
     # Check if adding resolved mismatches or completed items to active state
     # (This is a simplified check - could be more sophisticated)
-    content_lower = new_content.lower()
-
-    if 'status: "resolved"' in content_lower or 'status: resolved' in content_lower:
-        if 'mismatches:' in content_lower:
-            return RuleViolation(
-                rule_id="resolved-archived",
-                rule_message="Resolved = archived; only living context stays in active state",
-                action="warn",
-                context="Adding resolved mismatch to active_context.yaml.\n"
-                        "Consider archiving resolved items to .proof/archive.jsonl instead."
-            )
+    # The resolved status must be a changed line; `mismatches:` is usually
+    # unchanged context around it.
+    for line in view.lines():
+        line = line.lower()
+        if 'status: "resolved"' in line or 'status: resolved' in line:
+            break
+    else:
+        return None
+
+    if view.contains('mismatches:'):
+        return RuleViolation(
+            rule_id="resolved-archived",
+            rule_message="Resolved = archived; only living context stays in active state",
+            action="warn",
+            context="Adding resolved mismatch to active_context.yaml.\n"
+                    "Consider archiving resolved items to .proof/archive.jsonl instead."
+        )
 
     return None
 
@@ -236,47 +419,496 @@ DEFAULT_RULES: List[Rule] = [
 # RULE ENGINE
 # =============================================================================
 
+RULES_FILE = "rules.yaml"
+
+# Fields a rules.yaml entry may set (anything else is ignored)
+RULE_FIELDS = ("trigger_pattern", "check_fn", "message", "action", "enabled", "created_at",
+               "max_bytes", "max_ms")
+
+# (key, enabled rules, index) for the last load; key is rules.yaml's
+# (path, mtime_ns, size), or None when there is no rules.yaml
+_loaded: Optional[Tuple[Any, List[Rule], "RuleIndex"]] = None
+
+
+def get_rules_file(project_dir: Optional[Path] = None) -> Path:
+    if project_dir is None:
+        from state_utils import get_project_dir
+        project_dir = get_project_dir()
+    return Path(project_dir) / ".claude" / RULES_FILE
+
+
+def _rule_from_entry(entry: Dict[str, Any], base: Optional[Rule]) -> Optional[Rule]:
+    """A rules.yaml entry as a Rule - overriding `base` if it has its id."""
+    fields = {k: entry[k] for k in RULE_FIELDS if k in entry}
+    if "action" in fields and fields["action"] not in ("warn", "block"):
+        del fields["action"]
+    if "max_bytes" in fields and not (type(fields["max_bytes"]) is int
+                                      and fields["max_bytes"] > 0):
+        del fields["max_bytes"]
+    if "max_ms" in fields and not (type(fields["max_ms"]) in (int, float)
+                                   and fields["max_ms"] > 0):
+        del fields["max_ms"]
+    if base is not None:
+        data = base.to_dict()
+        data.update(fields)
+        return Rule(**data)
+    if not fields.get("trigger_pattern") or not fields.get("check_fn"):
+        return None
+    fields.setdefault("message", entry["id"])
+    return Rule(id=entry["id"], **fields)
+
+
+def parse_rules_file(content: str) -> List[Rule]:
+    """
+    DEFAULT_RULES with a rules.yaml applied.
+
+    rules.yaml holds a `rules:` list. An entry whose id matches a default
+    rule overrides the fields it sets (e.g. `enabled: false`, `action:
+    block`); any other entry adds a rule and needs trigger_pattern and
+    check_fn. check_fn must name a function in CHECK_FUNCTIONS.
+    """
+    from state_utils import parse_simple_yaml
+
+    rules = {r.id: r for r in DEFAULT_RULES}
+    data = parse_simple_yaml(content) or {}
+    entries = data.get("rules") if isinstance(data, dict) else None
+    for entry in entries or []:
+        if not isinstance(entry, dict) or not entry.get("id"):
+            continue
+        entry_id = str(entry["id"])
+        rule = _rule_from_entry(dict(entry, id=entry_id), rules.get(entry_id))
+        if rule is not None:
+            rules[entry_id] = rule
+    return list(rules.values())
+
+
+def _load_cached(project_dir: Optional[Path]) -> Tuple[List[Rule], "RuleIndex"]:
+    """Enabled rules and their index, rebuilt when rules.yaml changes."""
+    global _loaded
+    rules_file = get_rules_file(project_dir)
+    try:
+        st = os.stat(rules_file)
+        key = (str(rules_file), st.st_mtime_ns, st.st_size)
+    except OSError:
+        key = None  # No rules.yaml - defaults only
+
+    if _loaded is not None and _loaded[0] == key:
+        return _loaded[1], _loaded[2]
+
+    rules = list(DEFAULT_RULES)
+    if key is not None:
+        try:
+            rules = parse_rules_file(rules_file.read_text())
+        except Exception:
+            pass  # A broken rules.yaml must not break every Edit
+    rules = [r for r in rules if r.enabled]
+    _loaded = (key, rules, RuleIndex(rules))
+    return rules, _loaded[2]
+
+
 def load_rules(project_dir: Optional[Path] = None) -> List[Rule]:
     """
-    Load rules from rules.yaml if it exists, otherwise use defaults.
+    Load rules from .claude/rules.yaml if it exists, otherwise use defaults.
+
+    The result is cached until rules.yaml's mtime or size changes.
     """
-    # For now, just return default rules
-    # TODO: Load from .claude/rules.yaml for user customization
-    return [r for r in DEFAULT_RULES if r.enabled]
+    return list(_load_cached(project_dir)[0])
+
+
+def get_rule_index(project_dir: Optional[Path] = None) -> "RuleIndex":
+    """The RuleIndex for load_rules(), cached the same way."""
+    return _load_cached(project_dir)[1]
+
+
+# Trigger shapes the index can bucket without running the regex:
+#   \.py$   \.(md|txt)$          -> by extension
+#   (^|/)Makefile$   /setup\.py$  -> by basename
+#   active_context\.yaml$         -> by the literal's extension
+_LITERAL = r"(?:[\w-]|\\\.)+"
+_EXT_TRIGGER = re.compile(r"\\\.(?:([\w-]+)|\(([\w-]+(?:\|[\w-]+)*)\))\$")
+_NAME_TRIGGER = re.compile(rf"(?:\^|/|\(\^\|/\))({_LITERAL})\$")
+_SUFFIX_TRIGGER = re.compile(rf"({_LITERAL})\$")
+
+# Per-path memo size before it is reset (bounds a long-lived daemon)
+MAX_MEMO_PATHS = 4096
+
+
+def _dispatch_keys(pattern: str) -> Optional[Tuple[str, List[str]]]:
+    """("ext", [".py", ...]) or ("name", [basename]), or None to always check."""
+    m = _EXT_TRIGGER.fullmatch(pattern)
+    if m:
+        return "ext", ["." + ext for ext in (m.group(1) or m.group(2)).split("|")]
+    m = _NAME_TRIGGER.fullmatch(pattern)
+    if m:
+        return "name", [m.group(1).replace("\\.", ".")]
+    m = _SUFFIX_TRIGGER.fullmatch(pattern)
+    if m:
+        literal = m.group(1).replace("\\.", ".")
+        if "." in literal:
+            return "ext", [literal[literal.rindex("."):]]
+    return None
 
 
-def check_rules(tool_name: str, tool_input: Dict[str, Any]) -> List[RuleViolation]:
+def _split_path(file_path: str) -> Tuple[str, str]:
+    """(basename, extension) as the triggers see them; '' when absent."""
+    name = re.split(r"[/\\]", file_path)[-1]
+    dot = name.rfind(".")
+    return name, name[dot:] if dot >= 0 else ""
+
+
+class RuleIndex:
     """
-    Check all applicable rules for the given tool invocation.
+    Rules prepared for evaluating many tool calls.
 
-    Returns list of violations (may be empty).
+    Trigger patterns are compiled and check functions resolved once.
+    Rules whose trigger pins an extension or a basename are bucketed by
+    it, so a path is only regex-tested against its bucket plus the rules
+    that can't be bucketed; the result is remembered per file path.
     """
-    if tool_name not in ("Edit", "Write", "NotebookEdit"):
-        return []
 
-    file_path = tool_input.get("file_path", "")
-    if not file_path:
-        return []
+    def __init__(self, rules: List[Rule]):
+        self.rules: List[Tuple[Rule, "re.Pattern", Callable]] = []
+        self._by_ext: Dict[str, List[int]] = {}
+        self._by_name: Dict[str, List[int]] = {}
+        self._always: List[int] = []
+        for rule in rules:
+            check_fn = CHECK_FUNCTIONS.get(rule.check_fn)
+            if not check_fn:
+                continue
+            try:
+                trigger = re.compile(rule.trigger_pattern)
+            except re.error:
+                continue  # A bad trigger disables its rule, not the engine
+            position = len(self.rules)
+            self.rules.append((rule, trigger, check_fn))
+            keys = _dispatch_keys(rule.trigger_pattern)
+            if keys is None:
+                self._always.append(position)
+            else:
+                bucket = self._by_ext if keys[0] == "ext" else self._by_name
+                for key in keys[1]:
+                    bucket.setdefault(key, []).append(position)
+        self._by_path: Dict[str, List[Tuple[Rule, Callable]]] = {}
+
+    def candidates(self, file_path: str) -> List[int]:
+        """Positions of the rules that could match file_path, in rule order."""
+        name, ext = _split_path(file_path)
+        found = set(self._always)
+        found.update(self._by_ext.get(ext, ()))
+        found.update(self._by_name.get(name, ()))
+        return sorted(found)
+
+    def rules_for(self, file_path: str) -> List[Tuple[Rule, Callable]]:
+        """(rule, check function) pairs whose trigger matches file_path."""
+        matched = self._by_path.get(file_path)
+        if matched is None:
+            matched = []
+            for position in self.candidates(file_path):
+                rule, trigger, check_fn = self.rules[position]
+                if trigger.search(file_path):
+                    matched.append((rule, check_fn))
+            if len(self._by_path) >= MAX_MEMO_PATHS:
+                self._by_path.clear()
+            self._by_path[file_path] = matched
+        return matched
 
-    violations = []
-    rules = load_rules()
 
-    for rule in rules:
-        # Check if rule applies to this file
-        if not re.search(rule.trigger_pattern, file_path):
-            continue
+# =============================================================================
+# TIME BUDGETS
+# =============================================================================
+
+# Wall-clock budget per check call unless its rule sets max_ms
+DEFAULT_MAX_MS = 25.0
+
+# A check still running at this multiple of its budget is interrupted
+# (SIGALRM - Unix main thread only; elsewhere overruns are only counted)
+ABORT_FACTOR = 4
+
+# This many overruns within the window quarantine (disable) a rule for
+# QUARANTINE_SECONDS; a rule that is still slow afterwards goes back in
+QUARANTINE_OVERRUNS = 3
+QUARANTINE_WINDOW_SECONDS = 3600
+QUARANTINE_SECONDS = 3600
+
+QUARANTINE_FILE = "rule_quarantine.json"
+
+# (key, data) for the quarantine file last read; key is (mtime_ns, size)
+_quarantine: Optional[Tuple[Any, Dict[str, Any]]] = None
+
+# Messages for the hook to show (rules quarantined or released here)
+_notices: List[str] = []
+
 
-        # Get the check function
-        check_fn = CHECK_FUNCTIONS.get(rule.check_fn)
-        if not check_fn:
+class RuleTimeout(Exception):
+    """A check function ran past ABORT_FACTOR times its budget."""
+
+
+@contextmanager
+def _time_limit(seconds: float):
+    """Raise RuleTimeout in the block after `seconds`, where signals allow."""
+    import signal
+    import threading
+
+    if (not hasattr(signal, "setitimer")
+            or threading.current_thread() is not threading.main_thread()
+            or signal.getsignal(signal.SIGALRM) is not signal.SIG_DFL
+            or signal.getitimer(signal.ITIMER_REAL)[0]):
+        yield  # Someone else owns the alarm - measure only
+        return
+
+    def on_alarm(signum, frame):
+        raise RuleTimeout()
+
+    signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, signal.SIG_DFL)
+
+
+def get_quarantine_file() -> Path:
+    from state_utils import get_state_dir
+    return get_state_dir() / QUARANTINE_FILE
+
+
+def _read_quarantine() -> Dict[str, Any]:
+    try:
+        data = json.loads(get_quarantine_file().read_text())
+    except (OSError, ValueError):
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    data.setdefault("quarantined", {})
+    data.setdefault("overruns", {})
+    return data
+
+
+def _expired(entry: Dict[str, Any], now: float) -> bool:
+    until = entry.get("until")
+    if until is None:  # Written before quarantines expired
+        try:
+            until = datetime.fromisoformat(entry["since"]).timestamp() + QUARANTINE_SECONDS
+        except (KeyError, TypeError, ValueError):
+            return True
+    return now >= until
+
+
+def _lift_expired(now: float) -> None:
+    """Drop expired quarantines from the file, with a notice for each."""
+    from state_utils import file_lock
+
+    with file_lock(get_quarantine_file()):
+        data = _read_quarantine()
+        expired = [rule_id for rule_id, entry in data["quarantined"].items()
+                   if _expired(entry, now)]
+        if not expired:
+            return
+        for rule_id in expired:
+            del data["quarantined"][rule_id]
+            data["overruns"].pop(rule_id, None)
+            _notices.append(f"▶️ Rule '{rule_id}' is checked again: its quarantine expired.")
+        _save_quarantine(data)
+
+
+def get_quarantined_rules() -> Dict[str, Dict[str, Any]]:
+    """Quarantined rule ids -> {"since", "until", "reason"}; cached by file mtime."""
+    global _quarantine
+    quarantine_file = get_quarantine_file()
+    try:
+        st = os.stat(quarantine_file)
+        key = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return {}
+    if _quarantine is None or _quarantine[0] != key:
+        _quarantine = (key, _read_quarantine())
+    quarantined = _quarantine[1]["quarantined"]
+
+    now = time.time()
+    if any(_expired(entry, now) for entry in quarantined.values()):
+        try:
+            _lift_expired(now)
+        except (OSError, TimeoutError):
+            pass  # Another process is lifting them
+        quarantined = {rule_id: entry for rule_id, entry in quarantined.items()
+                       if not _expired(entry, now)}
+    return quarantined
+
+
+def _save_quarantine(data: Dict[str, Any]) -> None:
+    from state_utils import atomic_write_text
+    atomic_write_text(get_quarantine_file(), json.dumps(data, indent=2))
+
+
+def release_rule(rule_id: str) -> bool:
+    """Lift a quarantine (and forget its overruns). False if it wasn't quarantined."""
+    from state_utils import file_lock
+
+    with file_lock(get_quarantine_file()):
+        data = _read_quarantine()
+        released = data["quarantined"].pop(rule_id, None) is not None
+        data["overruns"].pop(rule_id, None)
+        _save_quarantine(data)
+    return released
+
+
+def _record_overruns(overruns: Dict[str, float], budgets: Dict[str, float]) -> None:
+    """Remember overruns and quarantine rules that keep exceeding their budget."""
+    from state_utils import file_lock
+
+    now = time.time()
+    with file_lock(get_quarantine_file()):
+        data = _read_quarantine()
+        for rule_id, elapsed_ms in overruns.items():
+            recent = [t for t in data["overruns"].get(rule_id, [])
+                      if now - t < QUARANTINE_WINDOW_SECONDS]
+            recent.append(now)
+            data["overruns"][rule_id] = recent[-QUARANTINE_OVERRUNS:]
+            if len(recent) >= QUARANTINE_OVERRUNS and rule_id not in data["quarantined"]:
+                reason = (f"exceeded its {budgets[rule_id]:g}ms budget {len(recent)} times "
+                          f"within {QUARANTINE_WINDOW_SECONDS // 60} minutes "
+                          f"(last: {elapsed_ms:.0f}ms)")
+                data["quarantined"][rule_id] = {"since": datetime.now().isoformat(),
+                                                "until": now + QUARANTINE_SECONDS,
+                                                "reason": reason}
+                _notices.append(
+                    f"⏸️ Rule '{rule_id}' quarantined: {reason}. It is skipped for "
+                    f"{QUARANTINE_SECONDS // 60} minutes, or until released "
+                    f"(rules_engine.release_rule)."
+                )
+        _save_quarantine(data)
+
+
+def _account(costs: Dict[str, Dict[str, Any]], budgets: Dict[str, float]) -> None:
+    """Write check costs to rule_stats and handle overruns. Never raises."""
+    overruns = {rule_id: cost["last_overrun_ms"] for rule_id, cost in costs.items()
+                if cost["overruns"]}
+    try:
+        if overruns:
+            _record_overruns(overruns, budgets)
+    except Exception:
+        pass  # Quarantine is best effort; the costs still get recorded
+    try:
+        from outcome_tracker import record_rule_costs
+        record_rule_costs({rule_id: {k: v for k, v in cost.items() if k != "last_overrun_ms"}
+                           for rule_id, cost in costs.items()})
+    except Exception:
+        pass
+
+
+def take_notices() -> List[str]:
+    """Notices raised since the last call (e.g. a rule was quarantined)."""
+    notices = list(_notices)
+    _notices.clear()
+    return notices
+
+
+def _build_view(tool_name: str, tool_input: Dict[str, Any], diff: bool) -> ContentView:
+    """content_view with diff, else all of the text (the fallback if a diff stalls)."""
+    if diff:
+        return content_view(tool_name, tool_input)
+    return ContentView.from_tool_input(tool_input, max_bytes=None)
+
+
+def check_rules_batch(
+    calls: Iterable[Tuple[str, Dict[str, Any]]],
+    index: Optional[RuleIndex] = None,
+    diff: bool = True,
+    budgets: bool = False,
+) -> List[List[RuleViolation]]:
+    """
+    Check many (tool_name, tool_input) pairs against the rules.
+
+    Rules come from the cached get_rule_index() (or `index`), and
+    identical calls - repeated edits, replays, eval banks - are checked
+    once. Returns one violation list per call, in order; each list is what
+    check_rules would return for that call.
+
+    With diff, rules only see the lines each call changes (content_view).
+    Pass diff=False when the files on disk aren't the ones the calls were
+    made against, e.g. when replaying history.
+
+    With budgets (the hook path), quarantined rules are skipped, each
+    check is timed against its rule's max_ms and interrupted past
+    ABORT_FACTOR times that, and the costs are written to rule_stats.
+    Building the view (the diff) counts against the first rule that
+    needs it; if that is interrupted, rules see all of the text.
+    """
+    if index is None:
+        index = get_rule_index()
+
+    results: List[List[RuleViolation]] = []
+    seen: Dict[Tuple[Any, ...], List[RuleViolation]] = {}
+    quarantined = get_quarantined_rules() if budgets else {}
+    costs: Dict[str, Dict[str, Any]] = {}
+    limits: Dict[str, float] = {}
+
+    for tool_name, tool_input in calls:
+        file_path = tool_input.get("file_path", "") if tool_input else ""
+        if tool_name not in ("Edit", "Write", "NotebookEdit") or not file_path:
+            results.append([])
             continue
 
-        # Run the check
-        violation = check_fn(tool_input)
-        if violation:
-            violations.append(violation)
+        try:
+            key = tuple(sorted(tool_input.items()))
+            violations = seen.get(key)
+        except TypeError:
+            key, violations = None, None  # Unhashable input - just check it
+        if violations is None:
+            violations = []
+            view = None
+            for rule, check_fn in index.rules_for(file_path):
+                if rule.id in quarantined:
+                    continue
+                if not budgets:
+                    if view is None:
+                        view = _build_view(tool_name, tool_input, diff)
+                    violation = check_fn(tool_input, view.limited(rule.max_bytes or DEFAULT_MAX_BYTES))
+                else:
+                    # The first rule to need the view pays for building it
+                    max_ms = limits[rule.id] = rule.max_ms or DEFAULT_MAX_MS
+                    start = time.perf_counter()
+                    if view is None:
+                        try:
+                            with _time_limit(max_ms * ABORT_FACTOR / 1000):
+                                view = _build_view(tool_name, tool_input, diff)
+                        except RuleTimeout:
+                            view = _build_view(tool_name, tool_input, False)
+                    try:
+                        with _time_limit(max_ms * ABORT_FACTOR / 1000):
+                            violation = check_fn(tool_input,
+                                                 view.limited(rule.max_bytes or DEFAULT_MAX_BYTES))
+                    except RuleTimeout:
+                        violation = None
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    cost = costs.setdefault(rule.id, {"checks": 0, "ms": 0.0, "max_ms": 0.0,
+                                                      "overruns": 0, "last_overrun_ms": 0.0})
+                    cost["checks"] += 1
+                    cost["ms"] += elapsed_ms
+                    cost["max_ms"] = max(cost["max_ms"], elapsed_ms)
+                    if elapsed_ms > max_ms:
+                        cost["overruns"] += 1
+                        cost["last_overrun_ms"] = elapsed_ms
+                if violation:
+                    violations.append(violation)
+            if key is not None:
+                seen[key] = violations
+        results.append(list(violations))
+
+    if costs:
+        _account(costs, limits)
+    return results
+
 
-    return violations
+def check_rules(tool_name: str, tool_input: Dict[str, Any]) -> List[RuleViolation]:
+    """
+    Check all applicable rules for the given tool invocation.
+
+    Returns list of violations (may be empty). Checks run within their
+    time budgets; see take_notices() for rules quarantined on the way.
+    """
+    return check_rules_batch([(tool_name, tool_input)], budgets=True)[0]
 
 
 def format_violations(violations: List[RuleViolation]) -> str:
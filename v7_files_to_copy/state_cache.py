@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Operator's Edge - State Cache
+Snapshot cache for active_context.yaml.
+
+state_utils.load_yaml_state re-reads the file and runs parse_simple_yaml
+on every call, and a single Edit goes through it several times (plan
+check and file context in pre_tool, outcome tracking in post_tool). This
+module parses once per change of the file:
+
+  - In-process memo: the marshalled state from the last load, reused
+    while the file's (mtime_ns, size) is unchanged
+  - On-disk snapshot (.claude/state/active_context.snapshot): the same
+    marshal bytes plus the key they were built from, shared across
+    hook processes
+
+A snapshot is keyed by (path, mtime_ns, size, sha1 of content). When
+mtime and size match the file isn't read at all, unless it was modified
+within RACY_SECONDS of now - then a same-size rewrite in the same
+timestamp tick is possible and the content hash decides. Every caller
+gets a fresh copy, so mutating the returned dict can't leak into the
+cache.
+"""
+import hashlib
+import marshal
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from state_utils import get_project_dir, get_state_dir, parse_simple_yaml
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_NAME = "active_context.snapshot"
+
+# Files modified this recently are verified by content hash
+RACY_SECONDS = 2.0
+
+# (path, mtime_ns, size, sha1) -> marshalled state, for this process
+_memo: Optional[Tuple[tuple, bytes]] = None
+
+
+def _get_state_file() -> Path:
+    return get_project_dir() / "active_context.yaml"
+
+
+def _get_snapshot_file() -> Path:
+    return get_state_dir() / SNAPSHOT_NAME
+
+
+def _is_racy(st: os.stat_result) -> bool:
+    return time.time() - st.st_mtime < RACY_SECONDS
+
+
+def _read_snapshot(path: str) -> Optional[Tuple[tuple, bytes]]:
+    try:
+        with open(_get_snapshot_file(), "rb") as f:
+            version, key, payload = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != SNAPSHOT_VERSION or key[0] != path:
+        return None
+    return key, payload
+
+
+def _write_snapshot(key: tuple, payload: bytes) -> None:
+    """Best effort - a missing snapshot only costs a parse."""
+    snapshot = _get_snapshot_file()
+    tmp = snapshot.with_name(f"{snapshot.name}.tmp-{os.getpid()}")
+    try:
+        snapshot.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as f:
+            marshal.dump((SNAPSHOT_VERSION, key, payload), f)
+        os.replace(tmp, snapshot)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+def _lookup(path: str, st: os.stat_result) -> Optional[bytes]:
+    """Cached payload for the file as it is now, or None."""
+    global _memo
+    racy = _is_racy(st)
+    content_hash = None
+
+    for entry in (_memo, "snapshot"):
+        if entry == "snapshot":
+            entry = _read_snapshot(path)  # Only when the memo missed
+        if entry is None or entry[0][0] != path:
+            continue
+        key, payload = entry
+        if key[1:3] == (st.st_mtime_ns, st.st_size) and not racy:
+            _memo = entry
+            return payload
+        if key[2] == st.st_size:
+            # Same size but touched, or too recent to trust mtime
+            if content_hash is None:
+                content_hash = hashlib.sha1(Path(path).read_bytes()).hexdigest()
+            if key[3] == content_hash:
+                _memo = ((path, st.st_mtime_ns, st.st_size, content_hash), payload)
+                return payload
+    return None
+
+
+def load_yaml_state() -> Optional[dict]:
+    """Load active_context.yaml, return dict or None if missing/invalid."""
+    global _memo
+    state_file = _get_state_file()
+    path = str(state_file)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    try:
+        payload = _lookup(path, st)
+        if payload is not None:
+            return marshal.loads(payload)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    try:
+        raw = state_file.read_bytes()
+        state = parse_simple_yaml(raw.decode())
+    except Exception:
+        return None
+
+    try:
+        payload = marshal.dumps(state)
+    except ValueError:
+        return state  # Not marshallable - serve uncached
+    key = (path, st.st_mtime_ns, st.st_size, hashlib.sha1(raw).hexdigest())
+    _memo = (key, payload)
+    _write_snapshot(key, payload)
+    return marshal.loads(payload)
+
+
+def clear_cache() -> None:
+    """Drop the in-process memo and the on-disk snapshot."""
+    global _memo
+    _memo = None
+    try:
+        _get_snapshot_file().unlink()
+    except OSError:
+        pass
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Operator's Edge - Surface Cache
+Memoized pattern surfacing for file context.
+
+pre_tool.surface_file_context calls pattern_engine.surface_patterns on
+every Edit, which runs lesson, co-change, risk and rhythm extraction even
+when the same file was surfaced under the same objective and step a few
+seconds earlier. This module keeps the resulting PatternBundles in
+.claude/state/surface_cache.json, shared across hook processes:
+
+  - Keyed by (file_path, objective, in-progress step, state hash), plus
+    the inputs surface_patterns reads outside the state: the git HEAD
+    (co-change history) and the current hour (rhythm patterns)
+  - LRU: at most MAX_ENTRIES bundles, least recently used dropped first
+  - TTL: entries older than TTL_SECONDS are recomputed
+
+Hits and misses are counted in the same file; pattern_metrics reports
+the hit rate. The cache is best effort - a lost or corrupt file only
+costs a recompute, and concurrent hooks may drop each other's counts.
+"""
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from state_utils import get_state_dir
+
+CACHE_VERSION = 1
+CACHE_NAME = "surface_cache.json"
+
+MAX_ENTRIES = 32
+TTL_SECONDS = 300.0
+
+
+def get_cache_file() -> Path:
+    return get_state_dir() / CACHE_NAME
+
+
+def _empty() -> Dict[str, Any]:
+    return {"version": CACHE_VERSION, "entries": {}, "hits": 0, "misses": 0}
+
+
+def _load() -> Dict[str, Any]:
+    try:
+        data = json.loads(get_cache_file().read_text())
+    except (OSError, ValueError):
+        return _empty()
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return _empty()
+    return data
+
+
+def _save(data: Dict[str, Any]) -> None:
+    """Best effort - a missing cache only costs a recompute."""
+    cache_file = get_cache_file()
+    tmp = cache_file.with_name(f"{cache_file.name}.tmp-{os.getpid()}")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, cache_file)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+def _state_hash(state: Dict[str, Any]) -> str:
+    return hashlib.sha1(
+        json.dumps(state, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def _git_head(project_dir: Path) -> Optional[str]:
+    try:
+        from cochange_index import find_repo, read_head
+    except ImportError:
+        return None
+    repo = find_repo(project_dir)
+    return read_head(repo[1]) if repo else None
+
+
+def _in_progress_step(state: Dict[str, Any]) -> str:
+    for step in state.get("plan", []) or []:
+        if isinstance(step, dict) and step.get("status") == "in_progress":
+            return step.get("description", "")
+    return ""
+
+
+def cache_key(state: Dict[str, Any], file_path: str, intent_action: str,
+              max_patterns: int, project_dir: Path) -> str:
+    """Everything surface_patterns' result depends on, hashed."""
+    parts = [
+        file_path,
+        state.get("objective", ""),
+        _in_progress_step(state),
+        _state_hash(state),
+        intent_action,
+        max_patterns,
+        _git_head(project_dir),
+        datetime.now().strftime("%Y-%m-%d %H"),
+    ]
+    return hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+def surface_patterns_cached(state: Dict[str, Any], file_path: str, context: str,
+                            intent_action: str, max_patterns: int = 5):
+    """
+    pattern_engine.surface_patterns, served from the cache when possible.
+
+    context must be derived from file_path and the state (objective, step)
+    as in pre_tool - it is not part of the key.
+    """
+    from pattern_engine import PatternBundle, surface_patterns
+
+    project_dir = Path.cwd()  # Where surface_patterns looks for git history
+    key = cache_key(state, file_path, intent_action, max_patterns, project_dir)
+    now = time.time()
+    data = _load()
+    entries = data["entries"]
+
+    entry = entries.get(key)
+    if entry and now - entry.get("created", 0) < TTL_SECONDS:
+        try:
+            bundle = PatternBundle.from_dict(entry["bundle"])
+        except (KeyError, ValueError, TypeError):
+            bundle = None
+        if bundle is not None:
+            entry["used"] = now
+            data["hits"] += 1
+            _save(data)
+            return bundle
+
+    bundle = surface_patterns(
+        state=state,
+        context=context,
+        intent_action=intent_action,
+        max_patterns=max_patterns,
+    )
+    data["misses"] += 1
+    entries[key] = {"created": now, "used": now, "file": file_path,
+                    "bundle": bundle.to_dict()}
+
+    # Drop expired entries, then least recently used beyond MAX_ENTRIES
+    for k in [k for k, e in entries.items() if now - e.get("created", 0) >= TTL_SECONDS]:
+        del entries[k]
+    if len(entries) > MAX_ENTRIES:
+        by_use = sorted(entries, key=lambda k: entries[k].get("used", 0))
+        for k in by_use[:len(entries) - MAX_ENTRIES]:
+            del entries[k]
+
+    _save(data)
+    return bundle
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counts and current size of the cache."""
+    data = _load()
+    lookups = data["hits"] + data["misses"]
+    return {
+        "hits": data["hits"],
+        "misses": data["misses"],
+        "lookups": lookups,
+        "hit_rate": data["hits"] / lookups if lookups else None,
+        "entries": len(data["entries"]),
+    }
+
+
+def clear_cache() -> None:
+    """Drop all cached bundles and counts."""
+    try:
+        get_cache_file().unlink()
+    except OSError:
+        pass
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Tests for affected_tests.py - import-graph-driven test selection.
+"""
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import affected_tests
+from affected_tests import (
+    Selection,
+    load_import_graph,
+    record_run,
+    reverse_closure,
+    select_tests,
+)
+
+# util <- core <- test_core, core <- test_api; test_util imports util
+GRAPH = {
+    "nodes": [{"id": n} for n in
+              ("util.py", "core.py", "api.py", "test_util.py", "test_core.py", "test_api.py")],
+    "edges": [
+        {"source": "core.py", "target": "util.py"},
+        {"source": "api.py", "target": "core.py"},
+        {"source": "test_util.py", "target": "util.py"},
+        {"source": "test_core.py", "target": "core.py"},
+        {"source": "test_api.py", "target": "api.py"},
+    ],
+}
+
+FAKE_ANALYZER = '''
+def parse_imports(file_path):
+    return [{"module": line.split()[1], "names": []}
+            for line in file_path.read_text().splitlines() if line.startswith("import ")]
+
+def analyze_project(project_root, exclude_patterns=None):
+    print("Found lots of files")
+    edges = [{"source": p.name, "target": imp["module"] + ".py", "module": imp["module"]}
+             for p in sorted(project_root.glob("*.py")) for imp in parse_imports(p)
+             if (project_root / (imp["module"] + ".py")).exists()]
+    # Substring fallback: "os" matched test_core.py
+    edges.append({"source": "api.py", "target": "test_core.py", "module": "os"})
+    return {
+        "nodes": [{"id": p.name} for p in sorted(project_root.glob("*.py"))],
+        "edges": edges,
+    }
+'''
+
+
+def git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+class TestReverseClosure(unittest.TestCase):
+    """Test the importer walk."""
+
+    def test_transitive_importers(self):
+        reached = reverse_closure(GRAPH, ["util.py"])
+        self.assertEqual(reached, {"util.py", "core.py", "api.py",
+                                   "test_util.py", "test_core.py", "test_api.py"})
+
+    def test_leaf_change(self):
+        self.assertEqual(reverse_closure(GRAPH, ["api.py"]), {"api.py", "test_api.py"})
+
+    def test_cycles_terminate(self):
+        graph = {"edges": [{"source": "a.py", "target": "b.py"},
+                           {"source": "b.py", "target": "a.py"}]}
+        self.assertEqual(reverse_closure(graph, ["a.py"]), {"a.py", "b.py"})
+
+
+class SelectionTestCase(unittest.TestCase):
+    """Base class with a git repo whose hooks dir matches GRAPH."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo = Path(self.temp_dir) / "repo"
+        self.hooks = self.repo / ".claude" / "hooks"
+        self.hooks.mkdir(parents=True)
+        self.state = Path(self.temp_dir) / "state"
+        self.patchers = [
+            patch("affected_tests.get_state_dir", return_value=self.state),
+            patch("affected_tests.get_project_dir", return_value=self.repo),
+        ]
+        for p in self.patchers:
+            p.start()
+
+        git(self.repo, "init", "-q")
+        git(self.repo, "config", "user.email", "t@example.com")
+        git(self.repo, "config", "user.name", "t")
+        for node in GRAPH["nodes"]:
+            (self.hooks / node["id"]).write_text("# v1\n")
+        (self.repo / "README.md").write_text("hi\n")
+        self.commit("initial")
+
+    def tearDown(self):
+        for p in self.patchers:
+            p.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def commit(self, message, **files):
+        for name, content in files.items():
+            path = self.repo / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        git(self.repo, "add", "-A")
+        git(self.repo, "commit", "-q", "-m", message)
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=self.repo,
+                              capture_output=True, text=True).stdout.strip()
+
+    def select(self):
+        with patch("affected_tests._build_graph", return_value=GRAPH):
+            return select_tests(str(self.hooks))
+
+
+class TestSelectTests(SelectionTestCase):
+    """Test choosing modules for a commit."""
+
+    def test_selects_reverse_closure(self):
+        head = self.commit("core", **{".claude/hooks/core.py": "# v2\n"})
+        selection = self.select()
+        self.assertEqual(selection.modules, ["test_api", "test_core"])
+        self.assertEqual(selection.total, 3)
+        self.assertEqual(selection.commit, head)
+
+    def test_changed_test_selects_itself(self):
+        self.commit("t", **{".claude/hooks/test_util.py": "# v2\n"})
+        self.assertEqual(self.select().modules, ["test_util"])
+
+    def test_non_hook_change_selects_nothing(self):
+        self.commit("docs", **{"README.md": "changed\n"})
+        selection = self.select()
+        self.assertEqual(selection.modules, [])
+        self.assertFalse(selection.full)
+
+    def test_file_outside_graph_forces_full_run(self):
+        self.commit("rules", **{".claude/hooks/rules.yaml": "rules: []\n"})
+        selection = self.select()
+        self.assertTrue(selection.full)
+        self.assertIn("rules.yaml", selection.reason)
+
+    def test_stale_graph_without_analyzer_forces_full_run(self):
+        self.commit("core", **{".claude/hooks/core.py": "# v2\n"})
+        with patch("affected_tests._find_analyzer", return_value=None):
+            selection = select_tests(str(self.hooks))
+        self.assertTrue(selection.full)
+        self.assertIn("stale", selection.reason)
+
+    def test_no_git_forces_full_run(self):
+        with patch("affected_tests._git", return_value=None):
+            selection = self.select()
+        self.assertTrue(selection.full)
+        self.assertIsNone(selection.commit)
+
+    def test_changes_accumulate_until_a_pass(self):
+        initial = subprocess.run(["git", "rev-parse", "HEAD"], cwd=self.repo,
+                                 capture_output=True, text=True).stdout.strip()
+        record_run(Selection([], 3, commit=initial), success=True, duration=1)
+        base = self.commit("api", **{".claude/hooks/api.py": "# v2\n"})
+        record_run(Selection(["test_api"], 3, commit=base), success=False, duration=1)
+        self.commit("util test", **{".claude/hooks/test_util.py": "# v2\n"})
+        selection = self.select()
+        # api.py from the failing commit is still covered
+        self.assertEqual(selection.modules, ["test_api", "test_util"])
+
+        record_run(selection, success=True, duration=1)
+        self.commit("core", **{".claude/hooks/core.py": "# v3\n"})
+        self.assertEqual(self.select().modules, ["test_api", "test_core"])
+
+
+class TestImportGraphCache(SelectionTestCase):
+    """Test building and reusing the graph."""
+
+    def setUp(self):
+        super().setUp()
+        tools = self.repo / "tools"
+        tools.mkdir()
+        (tools / "import_analyzer.py").write_text(FAKE_ANALYZER)
+        (self.hooks / "core.py").write_text("import util\n")
+        (self.hooks / "api.py").write_text("import os\n")
+
+    def test_built_with_analyzer_quietly(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            graph = load_import_graph(str(self.hooks))
+        self.assertEqual(out.getvalue(), "")
+        self.assertIn({"id": "core.py"}, graph["nodes"])
+        self.assertTrue(affected_tests.get_graph_file().exists())
+
+    def test_fuzzy_edges_pruned(self):
+        graph = load_import_graph(str(self.hooks))
+        self.assertEqual([(e["source"], e["target"]) for e in graph["edges"]],
+                         [("core.py", "util.py")])
+
+    def test_lazy_function_counts_as_import(self):
+        self.commit("hooks", **{
+            ".claude/hooks/bash_risk.py": "# v1\n",
+            ".claude/hooks/pre_tool.py": 'from lazy_imports import lazy_function\n'
+                                         'classify = lazy_function("bash_risk", "classify")\n',
+            ".claude/hooks/test_pre_tool.py": "import pre_tool\n",
+            ".claude/hooks/test_bash_risk.py": "import bash_risk\n",
+        })
+        graph = load_import_graph(str(self.hooks))
+        self.assertIn(("pre_tool.py", "bash_risk.py"),
+                      [(e["source"], e["target"]) for e in graph["edges"]])
+
+        self.commit("risk", **{".claude/hooks/bash_risk.py": "# v2\n"})
+        self.assertEqual(select_tests(str(self.hooks)).modules,
+                         ["test_bash_risk", "test_pre_tool"])
+
+    def test_cached_until_a_hook_changes(self):
+        load_import_graph(str(self.hooks))
+        with patch("affected_tests._build_graph") as build:
+            load_import_graph(str(self.hooks))
+            build.assert_not_called()
+
+            (self.hooks / "new.py").write_text("")
+            build.return_value = GRAPH
+            self.assertEqual(load_import_graph(str(self.hooks)), GRAPH)
+            build.assert_called_once()
+
+
+class TestRecordRun(SelectionTestCase):
+    """Test the saved-time bookkeeping."""
+
+    def test_saved_time_against_last_full_run(self):
+        self.assertIsNone(record_run(Selection(None, 3, commit="a"), True, 40.0))
+        saved = record_run(Selection(["test_api"], 3, commit="b"), True, 5.0)
+        self.assertAlmostEqual(saved, 35.0)
+        self.assertEqual(Selection(["test_api"], 3).describe(saved),
+                         "1/3 test modules affected, ~35s saved")
+
+    def test_unknown_commit_not_recorded(self):
+        record_run(Selection(None, 3, "git history unavailable"), True, 40.0)
+        self.assertFalse(affected_tests.get_selection_state_file().exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
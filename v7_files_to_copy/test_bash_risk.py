@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests for bash_risk.py - precompiled single-pass risk matcher.
+"""
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bash_risk import (
+    ASK_PATTERNS,
+    BLOCK_PATTERNS,
+    MAX_SCAN_CHARS,
+    MAX_TOTAL_SCAN_CHARS,
+    RiskMatcher,
+    classify_command,
+)
+
+
+def reference_classify(cmd):
+    """Pattern-by-pattern scan, the behavior the matcher must preserve."""
+    cmd_norm = cmd.strip()
+    for pattern, reason in BLOCK_PATTERNS:
+        if re.search(pattern, cmd_norm, re.IGNORECASE):
+            return ("block", reason)
+    for pattern, reason in ASK_PATTERNS:
+        if re.search(pattern, cmd_norm, re.IGNORECASE):
+            return ("ask", f"{reason}: {cmd_norm[:80]}")
+    return None
+
+
+CORPUS = [
+    "ls -la",
+    "git status",
+    "echo hello",
+    "rm -rf /",
+    "rm -rf ~/projects",
+    "rm -rf ../other",
+    "RM -RF /tmp",
+    "git reset --hard HEAD~1",
+    "git clean -fdx",
+    "git push origin main --force",
+    "git push",
+    "git push origin feature",
+    "chmod -R 777 .",
+    ":(){ :|:& };:",
+    "mkfs.ext4 /dev/sdb1",
+    "dd if=/dev/zero of=disk.img",
+    "rm file.txt",
+    "git rm old.py",
+    "kubectl apply -f deploy.yaml",
+    "terraform plan",
+    "docker push image:latest",
+    "npm publish",
+    "aws s3 ls",
+    "gcloud compute instances list",
+    # Multiple rules - list order must win, not leftmost position
+    "git reset --hard && rm -rf /",
+    "aws s3 ls && git push --force",
+    "kubectl get pods; rm -rf ~",
+    "rm build.log && git clean -fdx",
+    "echo test | rm -rf /home",
+    "ls && rm -rf /",
+    "  git push  ",
+]
+
+
+class TestMatchesReference(unittest.TestCase):
+    """The matcher must give identical decisions and reasons."""
+
+    def test_corpus_matches_reference(self):
+        for cmd in CORPUS:
+            with self.subTest(cmd=cmd):
+                self.assertEqual(classify_command(cmd), reference_classify(cmd))
+
+    def test_block_beats_earlier_ask(self):
+        """An ask rule matching further left must not hide a block rule."""
+        result = classify_command("aws s3 ls && git reset --hard")
+        self.assertEqual(result, ("block", "Blocked: git reset --hard"))
+
+    def test_list_order_breaks_ties(self):
+        result = classify_command("git reset --hard && rm -rf /")
+        self.assertEqual(result, ("block", "Blocked: rm -rf on root"))
+
+
+class TestScanCap(unittest.TestCase):
+    """Long commands are scanned in windows and fail closed."""
+
+    def test_danger_inside_cap_is_found(self):
+        cmd = "rm -rf / " + "x" * (MAX_SCAN_CHARS * 2)
+        self.assertEqual(classify_command(cmd)[0], "block")
+
+    def test_danger_past_first_window_is_found(self):
+        self.assertEqual(classify_command("echo " + "x" * 20000 + " ; rm -rf /"),
+                         ("block", "Blocked: rm -rf on root"))
+        self.assertEqual(classify_command("ls; " + "true; " * 4000 + "git reset --hard"),
+                         ("block", "Blocked: git reset --hard"))
+
+    def test_long_command_fails_closed(self):
+        result = classify_command("x" * MAX_SCAN_CHARS + " ls")
+        self.assertEqual(result[0], "ask")
+        self.assertIn("too long to check fully", result[1])
+
+    def test_beyond_total_cap_fails_closed(self):
+        cmd = "echo " + "x" * (MAX_TOTAL_SCAN_CHARS + MAX_SCAN_CHARS) + " ; rm -rf /"
+        self.assertEqual(classify_command(cmd)[0], "ask")
+
+    def test_tail_ask_beyond_first_window(self):
+        cmd = "x" * MAX_SCAN_CHARS + " kubectl delete ns x"
+        self.assertTrue(classify_command(cmd)[1].startswith("Confirm: kubernetes operation"))
+
+    def test_heredoc_body_does_not_use_up_cap(self):
+        cmd = "cat <<'EOF'\n" + "a" * MAX_SCAN_CHARS + "\nEOF\nkubectl delete ns x"
+        self.assertEqual(classify_command(cmd)[0], "ask")
+
+
+class TestSegmentedMatching(unittest.TestCase):
+    """Rules apply to what the shell runs, not to quoted text."""
+
+    def test_quoted_text_does_not_match(self):
+        self.assertIsNone(classify_command('git commit -m "Stop rm -rf ~/cache"'))
+        self.assertIsNone(classify_command("echo 'git push --force' # rm -rf /"))
+
+    def test_quoted_arguments_still_match(self):
+        self.assertEqual(classify_command('rm -rf "/"'), ("block", "Blocked: rm -rf on root"))
+
+    def test_nested_commands_match(self):
+        self.assertEqual(classify_command('bash -c "git reset --hard"')[0], "block")
+        self.assertEqual(classify_command("echo $(rm -rf ~)")[0], "block")
+        self.assertEqual(classify_command("cat <<EOF | sh\nrm -rf /\nEOF")[0], "block")
+
+    def test_each_segment_is_a_command_start(self):
+        for cmd in ("cd x;rm -rf /", "a&rm -rf /", "(rm -rf /)", "make||rm -rf ~"):
+            self.assertEqual(classify_command(cmd)[0], "block", cmd)
+
+    def test_herestring_fed_to_shell(self):
+        self.assertEqual(classify_command("bash <<< 'rm -rf /'"),
+                         ("block", "Blocked: rm -rf on root"))
+        self.assertIsNone(classify_command("cat <<< 'rm -rf /'"))
+
+
+class TestRiskMatcher(unittest.TestCase):
+    """Test the generic matcher."""
+
+    def test_custom_rules(self):
+        matcher = RiskMatcher([
+            ("block", r"\bshutdown\b", "Blocked: shutdown"),
+            ("ask", r"\bsudo\b", "Confirm: sudo"),
+        ])
+        self.assertEqual(matcher.classify("sudo shutdown now"), ("block", "Blocked: shutdown"))
+        self.assertEqual(matcher.classify("sudo ls"), ("ask", "Confirm: sudo: sudo ls"))
+        self.assertIsNone(matcher.classify("ls"))
+
+
+if __name__ == "__main__":
+    unittest.main()
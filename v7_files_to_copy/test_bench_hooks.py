@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for bench_hooks.py - session replay benchmark.
+"""
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_hooks import compare, entry_to_payloads, replay, synthetic_session
+
+BASELINE = {
+    "calls": 100,
+    "pre_tool": {"p50": 1.0, "p95": 2.0, "drift": 1.0},
+    "post_tool": {"p50": 2.0, "p95": 4.0, "drift": 1.1},
+    "bytes_per_call": 500.0,
+}
+
+
+class TestPayloads(unittest.TestCase):
+    """Test turning log entries into hook payloads."""
+
+    def test_bash_failure(self):
+        pre, post = entry_to_payloads({
+            "tool": "Bash", "input_preview": {"command": "make"},
+            "success": False, "output_preview": "boom",
+        }, Path("/scratch"))
+        self.assertEqual(pre, {"hook_event_name": "PreToolUse", "tool_name": "Bash",
+                               "tool_input": {"command": "make"}})
+        self.assertEqual(post["tool_result"], {"exit_code": 1, "stdout": "", "stderr": "boom"})
+
+    def test_edit_path_moved_into_scratch(self):
+        pre, post = entry_to_payloads({
+            "tool": "Edit", "success": True,
+            "input_preview": {"file": "/home/me/app.py", "old_string": "a", "new_string": "b"},
+        }, Path("/scratch"))
+        self.assertEqual(Path(pre["tool_input"]["file_path"]), Path("/scratch/src/home/me/app.py"))
+        self.assertEqual(pre["tool_input"]["new_string"], "b")
+        self.assertEqual(post["tool_result"], {"success": True})
+
+    def test_non_tool_entries_skipped(self):
+        self.assertIsNone(entry_to_payloads({"tool": "cleanup_orphaned_eval"}, Path("/s")))
+        self.assertIsNone(entry_to_payloads({"type": "note"}, Path("/s")))
+
+
+class TestCompare(unittest.TestCase):
+    """Test regression detection against a baseline."""
+
+    def results(self, **changes):
+        results = {
+            "calls": 100,
+            "pre_tool": dict(BASELINE["pre_tool"]),
+            "post_tool": dict(BASELINE["post_tool"]),
+            "bytes_per_call": 500.0,
+        }
+        for key, value in changes.items():
+            hook, _, metric = key.partition("__")
+            if metric:
+                results[hook][metric] = value
+            else:
+                results[hook] = value
+        return results
+
+    def test_same_numbers_pass(self):
+        self.assertEqual(compare(self.results(), BASELINE, 0.5), [])
+
+    def test_slower_p95_fails(self):
+        problems = compare(self.results(post_tool__p95=7.0), BASELINE, 0.5)
+        self.assertEqual(len(problems), 1)
+        self.assertIn("post_tool p95", problems[0])
+
+    def test_small_absolute_change_is_noise(self):
+        baseline = dict(BASELINE, pre_tool={"p50": 0.2, "p95": 2.0, "drift": 1.0})
+        # 3x slower, but only 0.4ms
+        self.assertEqual(compare(self.results(pre_tool__p50=0.6), baseline, 0.5), [])
+
+    def test_growing_cost_fails_on_drift(self):
+        problems = compare(self.results(post_tool__drift=3.0), BASELINE, 0.5)
+        self.assertIn("grows with session length", problems[0])
+
+    def test_file_growth_fails(self):
+        problems = compare(self.results(bytes_per_call=1200.0), BASELINE, 0.5)
+        self.assertIn("bytes/call", problems[0])
+
+
+class TestReplay(unittest.TestCase):
+    """Test an end-to-end replay in a scratch project."""
+
+    def test_replay_restores_environment(self):
+        before = os.environ.get("CLAUDE_PROJECT_DIR")
+        with patch("post_tool.start_job") as start_job:
+            results = replay(synthetic_session(16))
+            start_job.assert_not_called()  # Commits don't launch test runs
+        self.assertEqual(os.environ.get("CLAUDE_PROJECT_DIR"), before)
+        self.assertEqual(results["calls"], 16)
+        self.assertGreater(results["growth_bytes"], 0)
+        self.assertIn(".proof/sessions/replay.jsonl",
+                      [name.replace(os.sep, "/") for name in results["growth_by_file"]])
+        for hook in ("pre_tool", "post_tool"):
+            self.assertLessEqual(results[hook]["p50"], results[hook]["max"])
+
+    def test_nothing_to_replay(self):
+        with self.assertRaises(ValueError):
+            replay([{"tool": "cleanup_orphaned_eval"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
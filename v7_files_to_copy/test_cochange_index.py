@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Tests for cochange_index.py - persistent git co-change index.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cochange_index
+from cochange_index import find_cochanged_files, find_repo, read_head
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "Test", "GIT_AUTHOR_EMAIL": "test@example.com",
+    "GIT_COMMITTER_NAME": "Test", "GIT_COMMITTER_EMAIL": "test@example.com",
+}
+
+
+@unittest.skipIf(shutil.which("git") is None, "git not installed")
+class CochangeTestCase(unittest.TestCase):
+    """Base class with a throwaway git repo."""
+
+    def setUp(self):
+        self.repo = Path(tempfile.mkdtemp()).resolve()
+        self.git("init", "-q")
+        # Builds go to the job runner; tests run them with build()
+        self.request_build = patch("cochange_index._request_build").start()
+
+    def tearDown(self):
+        patch.stopall()
+        shutil.rmtree(self.repo, ignore_errors=True)
+
+    def build(self):
+        return cochange_index.build_index(self.repo)
+
+    def git(self, *args):
+        return subprocess.run(
+            ["git", *args], cwd=self.repo, check=True, capture_output=True, text=True,
+            env={**os.environ, **GIT_ENV},
+        ).stdout.strip()
+
+    def commit(self, *paths, message="change"):
+        for path in paths:
+            target = self.repo / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(target, "a") as f:
+                f.write(message + "\n")
+        self.git("add", *paths)
+        self.git("commit", "-q", "-m", message)
+
+
+class TestLookup(CochangeTestCase):
+    """Test partner counts."""
+
+    def test_counts_partners(self):
+        self.commit("src/a.py", "src/b.py")
+        self.commit("src/a.py", "src/b.py", "src/c.py")
+        self.commit("src/a.py", "docs/a.md")
+        self.commit("src/c.py")
+        self.build()
+
+        self.assertEqual(find_cochanged_files("src/a.py", self.repo),
+                         [("src/b.py", 2), ("docs/a.md", 1), ("src/c.py", 1)])
+        self.assertEqual(find_cochanged_files("src/a.py", self.repo, limit=1), [("src/b.py", 2)])
+
+    def test_absolute_path_normalized(self):
+        self.commit("a.py", "b.py")
+        self.build()
+        self.assertEqual(find_cochanged_files(str(self.repo / "a.py"), self.repo), [("b.py", 1)])
+
+    def test_dotfiles_excluded(self):
+        self.commit("a.py", ".gitignore")
+        self.build()
+        self.assertEqual(find_cochanged_files("a.py", self.repo), [])
+
+    def test_not_a_repo(self):
+        shutil.rmtree(self.repo / ".git")
+        self.assertEqual(find_cochanged_files("a.py", self.repo), [])
+
+    def test_no_commits(self):
+        self.assertEqual(find_cochanged_files("a.py", self.repo), [])
+        self.request_build.assert_not_called()
+
+
+class TestMaintenance(CochangeTestCase):
+    """Test incremental updates and rebuilds."""
+
+    def test_first_build_in_background(self):
+        self.commit("a.py", "b.py")
+        with patch("cochange_index.subprocess.Popen") as popen:
+            self.assertEqual(find_cochanged_files("a.py", self.repo), [])
+        popen.assert_not_called()
+        self.request_build.assert_called_once()
+
+        self.assertEqual(self.build(), (True, "co-change index covers 1 commits"))
+        self.assertEqual(find_cochanged_files("a.py", self.repo), [("b.py", 1)])
+
+    def test_build_is_a_job(self):
+        import job_runner
+        with patch("job_runner.get_project_dir", return_value=self.repo):
+            self.commit("a.py", "b.py")
+            self.assertEqual(job_runner.JOBS["cochange_index"]()[0], True)
+        self.assertEqual(find_cochanged_files("a.py", self.repo), [("b.py", 1)])
+
+    def test_incremental_update(self):
+        self.commit("a.py", "b.py")
+        self.build()
+        self.commit("a.py", "c.py")
+        self.assertEqual(find_cochanged_files("a.py", self.repo), [("b.py", 1), ("c.py", 1)])
+        self.request_build.assert_not_called()
+
+    def test_unchanged_head_runs_no_git_and_takes_no_lock(self):
+        self.commit("a.py", "b.py")
+        self.build()
+        with patch("cochange_index.subprocess.Popen") as popen, \
+             patch("cochange_index.subprocess.run") as run, \
+             patch("cochange_index.update_index") as update:
+            self.assertEqual(find_cochanged_files("a.py", self.repo), [("b.py", 1)])
+        popen.assert_not_called()
+        run.assert_not_called()
+        update.assert_not_called()
+
+    def test_rewritten_history_rebuilds_in_background(self):
+        self.commit("a.py", "b.py")
+        self.build()
+        self.git("commit", "-q", "--amend", "-m", "amended")
+        self.commit("a.py", "c.py")
+        self.assertEqual(find_cochanged_files("a.py", self.repo), [])
+        self.request_build.assert_called_once()
+        self.build()
+        self.assertEqual(find_cochanged_files("a.py", self.repo), [("b.py", 1), ("c.py", 1)])
+
+    def test_index_failure_returns_none(self):
+        self.commit("a.py", "b.py")
+        self.build()
+        self.commit("a.py", "c.py")
+        with patch("cochange_index.update_index", side_effect=RuntimeError("boom")):
+            self.assertIsNone(find_cochanged_files("a.py", self.repo))
+
+
+class TestGitDiscovery(CochangeTestCase):
+    """Test reading HEAD without git."""
+
+    def test_read_head_matches_rev_parse(self):
+        self.commit("a.py")
+        _, git_dir = find_repo(self.repo / "sub" / "dir")
+        self.assertEqual(read_head(git_dir), self.git("rev-parse", "HEAD"))
+
+    def test_read_head_packed_refs(self):
+        self.commit("a.py")
+        self.git("pack-refs", "--all")
+        _, git_dir = find_repo(self.repo)
+        self.assertEqual(read_head(git_dir), self.git("rev-parse", "HEAD"))
+
+
+class TestPatternEngineFallback(CochangeTestCase):
+    """pattern_engine uses the index, or git when it's unavailable."""
+
+    def test_falls_back_to_git(self):
+        import pattern_engine
+        self.commit("a.py", "b.py")
+        with patch("cochange_index.find_cochanged_files", return_value=None):
+            self.assertEqual(pattern_engine._find_cochanged_files("a.py", self.repo), [("b.py", 1)])
+
+    def test_cochange_patterns_from_context(self):
+        import pattern_engine
+        self.commit("src/a.py", "src/b.py")
+        self.build()
+        patterns = pattern_engine.extract_cochange_patterns("edit src/a.py", self.repo)
+        self.assertEqual([p.metadata["cochanged_file"] for p in patterns], ["src/b.py"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for command_segments.py - shell-aware command parsing.
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from command_segments import parse_command
+
+
+class TestSegmentation(unittest.TestCase):
+    """Test splitting into list and pipeline segments."""
+
+    def test_operators_split_segments(self):
+        parsed = parse_command("a x && b | c; d || e & f")
+        self.assertEqual([s.argv for s in parsed.segments],
+                         [("a", "x"), ("b",), ("c",), ("d",), ("e",), ("f",)])
+        self.assertEqual([s.operator for s in parsed.segments],
+                         ["&&", "|", ";", "||", "&", ""])
+
+    def test_newlines_split_segments(self):
+        self.assertEqual(parse_command("make\nmake test").programs(), ["make", "make"])
+
+    def test_quotes_removed_from_argv(self):
+        parsed = parse_command("""git commit -m "fix: a && b" --author='Me <m@x>'""")
+        self.assertEqual(parsed.segments[0].argv,
+                         ("git", "commit", "-m", "fix: a && b", "--author=Me <m@x>"))
+        self.assertEqual(len(parsed.segments), 1)
+
+    def test_redirections_not_in_argv(self):
+        parsed = parse_command("pytest -q 2>&1 > out.txt | tail -5")
+        self.assertEqual(parsed.segments[0].argv, ("pytest", "-q"))
+        self.assertEqual(parsed.segments[1].argv, ("tail", "-5"))
+
+    def test_program_is_basename(self):
+        self.assertEqual(parse_command("/usr/bin/python3 x.py").programs(), ["python3"])
+
+
+class TestMasking(unittest.TestCase):
+    """Test the masked form used for risk matching."""
+
+    def test_quoted_text_collapsed(self):
+        self.assertEqual(parse_command('echo "rm -rf /"').masked, "echo rm_-rf_/")
+
+    def test_comments_dropped(self):
+        self.assertNotIn("rm", parse_command("ls # rm -rf /").masked)
+
+    def test_heredoc_body_removed(self):
+        parsed = parse_command("cat > f.txt <<'EOF'\nrm -rf /\nEOF\nls")
+        self.assertNotIn("rm", parsed.scan_text())
+        self.assertEqual(parsed.programs(), ["cat", "ls"])
+
+    def test_unquoted_command_unchanged(self):
+        cmd = ":(){ :|:& };: && ls -la 2>&1"
+        self.assertEqual(parse_command(cmd).masked, cmd)
+
+    def test_segmented_puts_each_command_on_a_line(self):
+        parsed = parse_command("cd x;rm -rf / && ls|wc")
+        self.assertEqual(parsed.segmented, "cd x;\nrm -rf / &&\n ls|\nwc")
+        self.assertEqual(parsed.masked, "cd x;rm -rf / && ls|wc")
+
+    def test_unbalanced_quote_kept_verbatim(self):
+        self.assertEqual(parse_command('echo "oops rm -rf /').masked, 'echo "oops rm -rf /')
+
+
+class TestNestedCommands(unittest.TestCase):
+    """Test commands run from inside strings."""
+
+    def test_shell_dash_c(self):
+        self.assertIn("rm -rf /", parse_command('bash -c "rm -rf /"').scan_text())
+        self.assertEqual(parse_command("sudo sh -ec 'make install'").programs(),
+                         ["sudo", "make"])
+
+    def test_eval(self):
+        self.assertEqual(parse_command("eval git push").programs(), ["eval", "git"])
+
+    def test_command_substitution(self):
+        self.assertEqual(parse_command('echo "$(whoami)" `date`').programs(),
+                         ["echo", "whoami", "date"])
+
+    def test_heredoc_fed_to_shell(self):
+        parsed = parse_command("cat <<EOF | bash\nkubectl delete ns x\nEOF")
+        self.assertIn("kubectl", parsed.programs())
+
+    def test_herestring_fed_to_shell(self):
+        self.assertEqual(parse_command("bash <<< 'git push'").programs(), ["bash", "git"])
+        self.assertEqual(parse_command("grep x <<< 'git push'").programs(), ["grep"])
+
+
+class TestFingerprint(unittest.TestCase):
+    """Test the retry-matching fingerprint."""
+
+    def test_quote_and_space_insensitive(self):
+        self.assertEqual(parse_command('pytest   "tests/a b.py"').fingerprint(),
+                         parse_command("pytest 'tests/a b.py'").fingerprint())
+
+    def test_heredoc_body_included(self):
+        a = parse_command("python3 - <<EOF\nprint(1)\nEOF").fingerprint()
+        b = parse_command("python3 - <<EOF\nprint(2)\nEOF").fingerprint()
+        self.assertNotEqual(a, b)
+
+
+class TestCache(unittest.TestCase):
+
+    def test_parse_is_cached(self):
+        self.assertIs(parse_command("ls -la"), parse_command("ls -la"))
+
+
+if __name__ == "__main__":
+    unittest.main()
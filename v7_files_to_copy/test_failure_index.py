@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for failure_index.py - time-indexed retry blocking store.
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import failure_index
+from failure_index import log_failure, get_recent_failures, normalize_command
+
+
+class FailureIndexTestCase(unittest.TestCase):
+    """Base class with an isolated state dir."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.state_dir = Path(self.temp_dir) / ".claude" / "state"
+        self.patcher = patch("failure_index.get_state_dir", return_value=self.state_dir)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+class TestRecentFailures(FailureIndexTestCase):
+    """Test logging and windowed lookup."""
+
+    def test_no_log_means_no_failures(self):
+        self.assertEqual(get_recent_failures("pytest"), 0)
+
+    def test_counts_matching_failures(self):
+        log_failure("pytest tests/", "boom")
+        log_failure("pytest tests/", "boom again")
+        log_failure("npm run build", "nope")
+
+        self.assertEqual(get_recent_failures("pytest tests/"), 2)
+        self.assertEqual(get_recent_failures("npm run build"), 1)
+        self.assertEqual(get_recent_failures("ls"), 0)
+
+    def test_prefix_and_case_match(self):
+        """Same fuzzy rule as the JSONL scan: prefix match, case-insensitive."""
+        log_failure("PYTEST tests/test_a.py", "boom")
+        self.assertEqual(get_recent_failures("pytest tests/test_a.py -x"), 1)
+
+    def test_window_excludes_old_failures(self):
+        log_failure("make", "err")
+        with patch("failure_index.time.time", return_value=time.time() + 20 * 60):
+            self.assertEqual(get_recent_failures("make", window_minutes=15), 0)
+            self.assertEqual(get_recent_failures("make", window_minutes=30), 1)
+
+    def test_writes_audit_log(self):
+        """failure_log.jsonl keeps its format for other readers."""
+        log_failure("make", "err")
+        entry = json.loads((self.state_dir / "failure_log.jsonl").read_text())
+        self.assertEqual(entry["command"], "make")
+        self.assertIn("timestamp", entry)
+
+    def test_session_reset_clears_index(self):
+        """Deleting the log (session_start) resets retry counts."""
+        log_failure("make", "err")
+        log_failure("make", "err")
+        (self.state_dir / "failure_log.jsonl").unlink()
+
+        self.assertEqual(get_recent_failures("make"), 0)
+        log_failure("make", "err")
+        self.assertEqual(get_recent_failures("make"), 1)
+
+    def test_expires_old_rows(self):
+        log_failure("old", "err")
+        with patch("failure_index.time.time",
+                   return_value=time.time() + failure_index.RETENTION_SECONDS + 60):
+            log_failure("new", "err")
+
+        conn = failure_index._connect()
+        count = conn.execute("SELECT COUNT(*) FROM failures").fetchone()[0]
+        conn.close()
+        self.assertEqual(count, 1)
+
+
+class TestSeedingAndFallback(FailureIndexTestCase):
+    """Test upgrade path and degraded mode."""
+
+    def test_seeds_from_existing_log_without_double_count(self):
+        self.state_dir.mkdir(parents=True)
+        entry = {"timestamp": datetime.now().isoformat(), "command": "make", "error_preview": "x"}
+        (self.state_dir / "failure_log.jsonl").write_text(json.dumps(entry) + "\n")
+
+        log_failure("make", "again")
+        self.assertEqual(get_recent_failures("make"), 2)
+
+    def test_concurrent_first_connects_seed_once(self):
+        self.state_dir.mkdir(parents=True)
+        entry = {"timestamp": datetime.now().isoformat(), "command": "make", "error_preview": "x"}
+        (self.state_dir / "failure_log.jsonl").write_text(json.dumps(entry) + "\n")
+
+        # Both hooks saw no index file before either one seeded
+        first = failure_index._connect()
+        second = failure_index._connect()
+        first.close()
+        second.close()
+        self.assertEqual(get_recent_failures("make"), 1)
+
+    def test_index_without_seed_marker_not_reseeded(self):
+        log_failure("make", "err")
+        conn = failure_index._connect()
+        with conn:
+            conn.execute("DELETE FROM meta")  # Index from an older version
+        conn.close()
+
+        self.assertEqual(get_recent_failures("make"), 1)
+
+    def test_falls_back_to_log_scan(self):
+        log_failure("make", "err")
+        with patch("failure_index._connect", side_effect=RuntimeError("db gone")), \
+             patch("state_utils.get_state_dir", return_value=self.state_dir):
+            self.assertEqual(get_recent_failures("make"), 1)
+
+
+class TestNormalize(unittest.TestCase):
+
+    def test_normalize_command(self):
+        self.assertEqual(normalize_command("  LS -LA  "), "ls -la")
+        self.assertEqual(len(normalize_command("x" * 500)), 100)
+        self.assertEqual(normalize_command(None), "")
+
+    def test_quoting_and_spacing_ignored(self):
+        self.assertEqual(normalize_command('pytest  "tests/"'), normalize_command("pytest tests/"))
+        self.assertEqual(normalize_command("make &&  make test"), "make && make test")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Tests for hook_daemon.py - warm hook process with in-process fallback.
+"""
+import io
+import json
+import os
+import shutil
+import socket
+import stat
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from hook_daemon import (
+    HookDaemon,
+    relay_to_daemon,
+    run_hook_in_process,
+    daemon_available,
+    get_socket_path,
+)
+
+
+def _make_echo_hook():
+    """A stand-in hook that answers like respond() does."""
+    module = types.ModuleType("echo_hook")
+
+    def main():
+        data = json.load(sys.stdin)
+        print("note", file=sys.stderr)
+        print(json.dumps({
+            "decision": "approve",
+            "reason": data.get("tool_name", ""),
+            "project": os.environ.get("CLAUDE_PROJECT_DIR", ""),
+        }))
+        sys.exit(0)
+
+    module.main = main
+    return module
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets required")
+class TestHookDaemonRoundTrip(unittest.TestCase):
+    """Test forwarding a hook call through a live daemon."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.temp_dir, "hooks.sock")
+        self.env_patcher = patch.dict(os.environ, {
+            "EDGE_HOOK_SOCKET": self.socket_path,
+            "EDGE_HOOK_DAEMON": "1",
+            "CLAUDE_PROJECT_DIR": "/project/a",
+        })
+        self.env_patcher.start()
+
+        self.daemon = HookDaemon(
+            socket_path=self.socket_path,
+            hooks={"echo_hook": _make_echo_hook()},
+            hooks_dir=self.temp_dir,
+        )
+        self.thread = threading.Thread(
+            target=self.daemon.serve, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self.thread.start()
+        for _ in range(100):
+            if os.path.exists(self.socket_path):
+                break
+            time.sleep(0.01)
+
+    def tearDown(self):
+        self.daemon.stop_requested = True
+        self.thread.join(timeout=2)
+        self.env_patcher.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _relay(self, payload):
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with patch("sys.stdin", io.StringIO(json.dumps(payload))), \
+             patch("sys.stdout", stdout), patch("sys.stderr", stderr):
+            with self.assertRaises(SystemExit) as ctx:
+                relay_to_daemon("echo_hook")
+        return ctx.exception.code, stdout.getvalue(), stderr.getvalue()
+
+    def test_relays_decision_and_exit_code(self):
+        """Daemon output should be replayed by the client."""
+        code, out, err = self._relay({"tool_name": "Bash"})
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out)["reason"], "Bash")
+        self.assertIn("note", err)
+
+    def test_forwards_project_dir(self):
+        """Each call should see the caller's project dir."""
+        _, out, _ = self._relay({"tool_name": "Edit"})
+        self.assertEqual(json.loads(out)["project"], "/project/a")
+
+    def test_counts_calls(self):
+        """The daemon should count served calls."""
+        self._relay({"tool_name": "Read"})
+        self._relay({"tool_name": "Read"})
+        self.assertEqual(self.daemon.calls_served, 2)
+
+    def test_stale_sources_fall_back(self):
+        """Editing a hook source should force the in-process path."""
+        with open(os.path.join(self.temp_dir, "pre_tool.py"), "w") as f:
+            f.write("# changed\n")
+
+        payload = json.dumps({"tool_name": "Bash"})
+        with patch("sys.stdin", io.StringIO(payload)):
+            handled = relay_to_daemon("echo_hook")
+            # stdin must still be readable for the fallback
+            self.assertEqual(sys.stdin.read(), payload)
+        self.assertFalse(handled)
+        self.assertTrue(self.daemon.stop_requested)
+
+    def test_socket_is_private(self):
+        """The socket should be 0600 from the moment it exists."""
+        self.assertEqual(stat.S_IMODE(os.lstat(self.socket_path).st_mode), 0o600)
+        self.assertTrue(daemon_available())
+
+    def test_socket_owned_by_another_user_falls_back(self):
+        """A socket someone else created must never get the payload."""
+        with patch("os.getuid", return_value=os.getuid() + 1):
+            self.assertFalse(daemon_available())
+            with patch("sys.stdin", io.StringIO("{}")):
+                self.assertFalse(relay_to_daemon("echo_hook"))
+        self.assertEqual(self.daemon.calls_served, 0)
+
+    def test_open_socket_dir_falls_back(self):
+        """A socket in a directory others can write to is not trusted."""
+        os.chmod(self.temp_dir, 0o777)
+        with patch("sys.stdin", io.StringIO("{}")):
+            self.assertFalse(relay_to_daemon("echo_hook"))
+        self.assertEqual(self.daemon.calls_served, 0)
+
+
+class TestFallback(unittest.TestCase):
+    """Test behavior when no daemon is running."""
+
+    def test_no_socket_returns_false(self):
+        """Without a socket the hook should run in-process."""
+        with patch.dict(os.environ, {"EDGE_HOOK_SOCKET": "/nonexistent/edge.sock"}):
+            self.assertFalse(daemon_available())
+            with patch("sys.stdin", io.StringIO("{}")):
+                self.assertFalse(relay_to_daemon("pre_tool"))
+                self.assertEqual(sys.stdin.read(), "{}")
+
+    def test_default_socket_in_per_user_dir(self):
+        """The default socket lives in a directory named for this user."""
+        with patch.dict(os.environ, {"TMPDIR": "/tmp"}):
+            os.environ.pop("EDGE_HOOK_SOCKET", None)
+            self.assertEqual(os.path.dirname(get_socket_path()),
+                             f"/tmp/operators-edge-{os.getuid()}")
+
+    def test_disabled_by_env(self):
+        """EDGE_HOOK_DAEMON=0 should bypass the daemon."""
+        with patch.dict(os.environ, {"EDGE_HOOK_DAEMON": "0"}):
+            self.assertFalse(daemon_available())
+
+
+class TestRunHookInProcess(unittest.TestCase):
+    """Test the per-call isolation used by the daemon."""
+
+    def test_uncaught_exception_is_exit_1(self):
+        """Crashing hooks should look like a crashed interpreter."""
+        module = types.ModuleType("broken")
+
+        def main():
+            raise RuntimeError("boom")
+
+        module.main = main
+        result = run_hook_in_process(module, "", {}, "")
+        self.assertEqual(result["exit_code"], 1)
+        self.assertIn("boom", result["stderr"])
+
+    def test_restores_environment(self):
+        """Forwarded env must not leak into the daemon."""
+        with patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": "/daemon/own"}):
+            run_hook_in_process(_make_echo_hook(), "{}", {"CLAUDE_PROJECT_DIR": "/x"}, "")
+            self.assertEqual(os.environ["CLAUDE_PROJECT_DIR"], "/daemon/own")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for hook_timing.py - span tracing and latency report.
+"""
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import hook_timing
+from hook_timing import (
+    NULL_TRACE,
+    get_timings_file,
+    percentile,
+    start_trace,
+    summarize,
+)
+
+
+class TimingTestCase(unittest.TestCase):
+    """Base class with an isolated proof dir."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.patcher = patch("hook_timing.get_proof_dir", return_value=Path(self.temp_dir))
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def entries(self):
+        return [json.loads(line) for line in get_timings_file().read_text().splitlines()]
+
+
+class TestTracing(TimingTestCase):
+    """Test span recording."""
+
+    def test_disabled_is_shared_noop(self):
+        with patch.dict(os.environ, {"EDGE_HOOK_TIMING": "0"}):
+            trace = start_trace("pre_tool", "Bash")
+        self.assertIs(trace, NULL_TRACE)
+        self.assertIs(trace.span("a"), trace.span("b"))
+        with trace.span("a"):
+            pass
+        trace.finish()
+        self.assertFalse(get_timings_file().exists())
+
+    def test_enabled_writes_one_line_per_invocation(self):
+        with patch.dict(os.environ, {"EDGE_HOOK_TIMING": "1"}):
+            trace = start_trace("pre_tool", "Edit")
+        with trace.span("check_plan_requirement"):
+            pass
+        with trace.span("check_plan_requirement"):
+            pass
+        trace.finish()
+        trace.finish()
+
+        entries = self.entries()
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]["hook"], "pre_tool")
+        self.assertEqual(entries[0]["tool"], "Edit")
+        self.assertEqual(list(entries[0]["spans"]), ["check_plan_requirement"])
+        self.assertGreaterEqual(entries[0]["total_ms"], entries[0]["spans"]["check_plan_requirement"])
+
+    def test_span_recorded_when_check_exits(self):
+        with patch.dict(os.environ, {"EDGE_HOOK_TIMING": "1"}):
+            trace = start_trace("pre_tool", "Bash")
+        with self.assertRaises(SystemExit):
+            try:
+                with trace.span("check_bash_command"):
+                    sys.exit(0)
+            finally:
+                trace.finish()
+        self.assertIn("check_bash_command", self.entries()[0]["spans"])
+
+    def test_ring_buffer_keeps_newest(self):
+        with patch.dict(os.environ, {"EDGE_HOOK_TIMING": "1"}), \
+                patch.object(hook_timing, "MAX_LOG_BYTES", 2000), \
+                patch.object(hook_timing, "KEEP_ENTRIES", 5):
+            for i in range(40):
+                start_trace("pre_tool", f"Tool{i}").finish()
+        entries = self.entries()
+        self.assertLess(len(entries), 40)
+        self.assertLessEqual(get_timings_file().stat().st_size, 2000)
+        self.assertEqual(entries[-1]["tool"], "Tool39")
+
+
+class TestReport(TimingTestCase):
+    """Test percentile summaries."""
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7.0], 99), 7.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_summary_per_check_and_tool(self):
+        entries = [
+            {"hook": "pre_tool", "tool": "Bash", "total_ms": float(i),
+             "spans": {"check_bash_command": i / 10}}
+            for i in range(1, 21)
+        ] + [{"hook": "pre_tool", "tool": "Edit", "total_ms": 3.0,
+              "spans": {"check_graduated_rules": 2.0}}]
+        summary = summarize(entries)
+
+        bash = summary["tools"]["pre_tool:Bash"]
+        self.assertEqual(bash["count"], 20)
+        self.assertEqual((bash["p50"], bash["p95"], bash["max"]), (10.0, 19.0, 20.0))
+        self.assertEqual(summary["checks"]["check_graduated_rules"]["p99"], 2.0)
+
+    def test_report_command(self):
+        with patch.dict(os.environ, {"EDGE_HOOK_TIMING": "1"}):
+            trace = start_trace("pre_tool", "Read")
+            with trace.span("surface_file_context"):
+                pass
+            trace.finish()
+        out = io.StringIO()
+        with patch("sys.stdout", out):
+            self.assertEqual(hook_timing.main(["hook_timing.py", "report"]), 0)
+        self.assertIn("surface_file_context", out.getvalue())
+        self.assertIn("pre_tool:Read", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for hook cold-start cost - what each hook and tool path imports.
+
+Timing budgets are machine-dependent and checked by
+`python3 import_budget.py --check`, not here.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import import_budget
+from import_budget import (
+    EAGER_IMPORTS,
+    HEAVY_MODULES,
+    budget_for,
+    hook_local_modules,
+    modules_imported,
+    modules_loaded,
+    parse_importtime,
+)
+from lazy_imports import lazy_function
+
+# Loaded by a path only when that path needs it
+BASH_ONLY = {"bash_risk", "command_segments", "failure_index"}
+COMMIT_ONLY = {"job_runner", "affected_tests"}
+
+
+class TestImportBudget(unittest.TestCase):
+    """The per-call hooks import only what every call needs."""
+
+    def test_hot_hooks_defer_imports(self):
+        local = hook_local_modules()
+        for hook, allowed in EAGER_IMPORTS.items():
+            with self.subTest(hook=hook):
+                loaded = set(modules_imported(hook))
+                self.assertEqual(loaded & local, allowed)
+                heavy = {m for m in loaded if m.split(".")[0] in HEAVY_MODULES}
+                self.assertEqual(heavy, set())
+
+    def test_budget_override(self):
+        with patch.dict(os.environ, {"EDGE_IMPORT_BUDGET_MS": "5"}):
+            self.assertEqual(budget_for("pre_tool"), 5.0)
+        with patch.dict(os.environ, {"EDGE_IMPORT_BUDGET_MS": ""}):
+            self.assertEqual(budget_for("pre_tool"), import_budget.HOOK_BUDGETS_MS["pre_tool"])
+
+    def test_parse_importtime(self):
+        rows = parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   json.decoder\n"
+            "import time:      3000 |       3120 | pre_tool\n"
+        )
+        self.assertEqual(rows, [("json.decoder", 120, 120, 1), ("pre_tool", 3000, 3120, 0)])
+
+
+class TestToolPaths(unittest.TestCase):
+    """Each tool path imports only what it needs."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.temp_dir, ".claude", "state"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def loaded(self, hook, tool, tool_input, **extra):
+        payload = dict({"tool_name": tool, "tool_input": tool_input}, **extra)
+        return set(modules_loaded(hook, payload, self.temp_dir))
+
+    def test_post_tool_read_skips_bash_and_commit_code(self):
+        loaded = self.loaded("post_tool", "Read", {"file_path": "/tmp/x.py"}, tool_result={})
+        self.assertFalse(loaded & (BASH_ONLY | COMMIT_ONLY | {"edge_utils"}), loaded & BASH_ONLY)
+
+    def test_post_tool_bash_skips_commit_code(self):
+        loaded = self.loaded("post_tool", "Bash", {"command": "ls -la"},
+                             tool_result={"exit_code": 0, "stdout": "x"})
+        self.assertIn("command_segments", loaded)
+        self.assertFalse(loaded & COMMIT_ONLY)
+
+    def test_pre_tool_edit_skips_bash_checks(self):
+        loaded = self.loaded("pre_tool", "Edit", {"file_path": "/tmp/x.py"})
+        self.assertFalse(loaded & (BASH_ONLY | {"edge_utils"}))
+
+    def test_pre_tool_bash_loads_risk_checks(self):
+        loaded = self.loaded("pre_tool", "Bash", {"command": "ls"})
+        self.assertIn("bash_risk", loaded)
+
+
+class TestLazyFunction(unittest.TestCase):
+    """Test the import-on-first-call stand-in."""
+
+    def test_resolves_on_first_call(self):
+        dumps = lazy_function("json", "dumps")
+        self.assertEqual(dumps.__name__, "dumps")
+        self.assertEqual(dumps([1]), "[1]")
+
+    def test_missing_module_raises_on_call(self):
+        missing = lazy_function("no_such_module_xyz", "f")
+        with self.assertRaises(ImportError):
+            missing()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for job_runner.py - detached background jobs.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import job_runner
+from job_runner import read_status, run_job, start_job, take_finished_result
+
+
+class JobRunnerTestCase(unittest.TestCase):
+    """Base class with an isolated state dir and a fake job."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.job = MagicMock(return_value=(True, "12 tests passed"))
+        self.patchers = [
+            patch("job_runner.get_state_dir", return_value=Path(self.temp_dir)),
+            patch.dict("job_runner.JOBS", {"fake": self.job}),
+            # The "worker" is this process, so it counts as alive
+            patch("job_runner._spawn_worker", return_value=os.getpid()),
+        ]
+        for p in self.patchers:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patchers:
+            p.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+class TestStartJob(JobRunnerTestCase):
+    """Test launching and coalescing."""
+
+    def test_start_records_running(self):
+        self.assertEqual(start_job("fake"), "started")
+        status = read_status("fake")
+        self.assertEqual(status["status"], "running")
+        self.assertEqual(status["pid"], os.getpid())
+        job_runner._spawn_worker.assert_called_once_with("fake")
+
+    def test_concurrent_requests_coalesce(self):
+        start_job("fake")
+        self.assertEqual(start_job("fake"), "coalesced")
+        self.assertEqual(start_job("fake"), "coalesced")
+        job_runner._spawn_worker.assert_called_once()
+        self.assertTrue(read_status("fake")["rerun"])
+
+    def test_dead_worker_does_not_block_new_run(self):
+        start_job("fake")
+        with patch("job_runner._pid_alive", return_value=False):
+            self.assertEqual(start_job("fake"), "started")
+        self.assertEqual(job_runner._spawn_worker.call_count, 2)
+
+    def test_unknown_job(self):
+        with self.assertRaises(ValueError):
+            start_job("nope")
+
+
+class TestRunJob(JobRunnerTestCase):
+    """Test the worker body."""
+
+    def test_records_result(self):
+        start_job("fake")
+        status = run_job("fake")
+        self.assertEqual(status["status"], "passed")
+        self.assertEqual(status["summary"], "12 tests passed")
+        self.assertIn("duration", status)
+        self.assertEqual(read_status("fake"), status)
+
+    def test_coalesced_requests_run_once_more(self):
+        start_job("fake")
+        start_job("fake")
+        start_job("fake")
+        run_job("fake")
+        self.assertEqual(self.job.call_count, 2)
+        self.assertFalse(read_status("fake")["rerun"])
+
+    def test_crash_recorded_as_failure(self):
+        self.job.side_effect = RuntimeError("boom")
+        start_job("fake")
+        status = run_job("fake")
+        self.assertEqual(status["status"], "failed")
+        self.assertIn("boom", status["summary"])
+
+
+class TestTakeFinishedResult(JobRunnerTestCase):
+    """Test surfacing results exactly once."""
+
+    def test_nothing_before_first_run(self):
+        self.assertIsNone(take_finished_result("fake"))
+
+    def test_running_job_not_reported(self):
+        start_job("fake")
+        self.assertIsNone(take_finished_result("fake"))
+
+    def test_finished_result_reported_once(self):
+        start_job("fake")
+        run_job("fake")
+        self.assertEqual(take_finished_result("fake")["summary"], "12 tests passed")
+        self.assertIsNone(take_finished_result("fake"))
+
+    def test_interrupted_worker_reported_as_failed(self):
+        start_job("fake")
+        with patch("job_runner._pid_alive", return_value=False):
+            status = take_finished_result("fake")
+        self.assertEqual(status["status"], "failed")
+        self.assertIn("interrupted", status["summary"])
+
+    def test_format_result(self):
+        start_job("fake")
+        line = job_runner.format_result("fake", run_job("fake"))
+        self.assertIn("✅", line)
+        self.assertIn("12 tests passed", line)
+
+
+
+class TestSpawnWorker(unittest.TestCase):
+
+    def test_worker_gets_the_project_dir(self):
+        with patch.dict(os.environ, {}, clear=False), \
+             patch("job_runner.get_project_dir", return_value=Path("/proj")), \
+             patch("job_runner.subprocess.Popen") as popen:
+            os.environ.pop("CLAUDE_PROJECT_DIR", None)
+            job_runner._spawn_worker("fake")
+        self.assertEqual(popen.call_args[1]["env"]["CLAUDE_PROJECT_DIR"], "/proj")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Tests for jsonl_utils.py - append-only JSONL writing and tail reading.
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from jsonl_utils import (
+    AppendWriter,
+    append_jsonl,
+    iter_lines_reversed,
+    parse_fsync_policy,
+    tail_jsonl,
+    tail_lines,
+)
+
+
+def _read_entries(path):
+    return [json.loads(l) for l in Path(path).read_text().splitlines() if l.strip()]
+
+
+class TestFsyncPolicy(unittest.TestCase):
+    """Test fsync policy parsing."""
+
+    def test_known_policies(self):
+        self.assertEqual(parse_fsync_policy("entry"), ("entry", 1))
+        self.assertEqual(parse_fsync_policy("exit"), ("exit", 1))
+        self.assertEqual(parse_fsync_policy("never"), ("never", 1))
+        self.assertEqual(parse_fsync_policy("every:25"), ("every", 25))
+
+    def test_invalid_falls_back_to_default(self):
+        self.assertEqual(parse_fsync_policy("every:zero"), ("entry", 1))
+        self.assertEqual(parse_fsync_policy("bogus"), ("entry", 1))
+        self.assertEqual(parse_fsync_policy(None), ("entry", 1))
+
+
+class TestAppendWriter(unittest.TestCase):
+    """Test single-write appends."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = Path(self.temp_dir) / "logs" / "session.jsonl"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_appends_lines_and_creates_parent(self):
+        """Each append should add exactly one line."""
+        writer = AppendWriter("never")
+        for i in range(3):
+            writer.append_line(self.log_path, json.dumps({"i": i}))
+        writer.close()
+
+        self.assertEqual([e["i"] for e in _read_entries(self.log_path)], [0, 1, 2])
+
+    def test_repairs_torn_last_line(self):
+        """A partial last line must not swallow the next entry."""
+        self.log_path.parent.mkdir(parents=True)
+        self.log_path.write_text('{"ok": 1}\n{"torn": ')
+
+        writer = AppendWriter("never")
+        writer.append_line(self.log_path, json.dumps({"ok": 2}))
+        writer.close()
+
+        lines = self.log_path.read_text().splitlines()
+        self.assertEqual(lines[-1], '{"ok": 2}')
+        self.assertEqual(len(lines), 3)
+
+    def test_reopens_after_rotation(self):
+        """Writes after the file is moved away go to the new file."""
+        writer = AppendWriter("never")
+        writer.append_line(self.log_path, "{}")
+        os.rename(self.log_path, str(self.log_path) + ".old")
+
+        writer.append_line(self.log_path, '{"after": true}')
+        writer.close()
+
+        self.assertEqual(_read_entries(self.log_path), [{"after": True}])
+
+    def test_entry_policy_fsyncs_every_append(self):
+        writer = AppendWriter("entry")
+        with patch("jsonl_utils.os.fsync") as mock_fsync:
+            for _ in range(3):
+                writer.append_line(self.log_path, "{}")
+        writer.close()
+        self.assertEqual(mock_fsync.call_count, 3)
+
+    def test_every_n_policy_batches_fsync(self):
+        writer = AppendWriter("every:5")
+        with patch("jsonl_utils.os.fsync") as mock_fsync:
+            for _ in range(12):
+                writer.append_line(self.log_path, "{}")
+            self.assertEqual(mock_fsync.call_count, 2)
+            writer.close()  # Flushes the remaining 2
+            self.assertEqual(mock_fsync.call_count, 3)
+
+
+class TestAppendJsonl(unittest.TestCase):
+    """Test the locked entry point."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = Path(self.temp_dir) / "events.jsonl"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_appends_entry_and_releases_lock(self):
+        append_jsonl(self.log_path, {"type": "surface"})
+        append_jsonl(self.log_path, {"type": "outcome"})
+
+        self.assertEqual([e["type"] for e in _read_entries(self.log_path)],
+                         ["surface", "outcome"])
+        self.assertFalse(Path(str(self.log_path) + ".lock").exists())
+
+    def test_lock_timeout_still_writes(self):
+        """Failing to get the lock degrades to an unlocked append."""
+        with patch("state_utils.file_lock", side_effect=TimeoutError):
+            append_jsonl(self.log_path, {"degraded": True})
+
+        self.assertEqual(_read_entries(self.log_path), [{"degraded": True}])
+
+
+class TestTailReading(unittest.TestCase):
+    """Test reverse-block tail reading."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = Path(self.temp_dir) / "events.jsonl"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write(self, text):
+        self.log_path.write_bytes(text.encode())
+
+    def test_last_records_in_file_order(self):
+        self.write("".join(json.dumps({"n": i}) + "\n" for i in range(50)))
+        self.assertEqual([e["n"] for e in tail_jsonl(self.log_path, 3)], [47, 48, 49])
+        self.assertEqual(len(tail_jsonl(self.log_path, 500)), 50)
+
+    def test_lines_spanning_blocks(self):
+        lines = [("x" * (i * 7 % 23)) + str(i) for i in range(40)]
+        self.write("\n".join(lines) + "\n\n")
+        for block_size in (1, 5, 16, 4096):
+            with self.subTest(block_size=block_size):
+                got = list(iter_lines_reversed(self.log_path, block_size))
+                self.assertEqual([l.decode() for l in got], lines[::-1])
+
+    def test_torn_final_line_skipped(self):
+        self.write('{"n": 1}\n{"n": 2}\n{"n": 3, "tr')
+        self.assertEqual(tail_jsonl(self.log_path, 2), [{"n": 1}, {"n": 2}])
+
+    def test_final_line_without_newline_kept(self):
+        self.write('{"n": 1}\n{"n": 2}')
+        self.assertEqual(tail_jsonl(self.log_path, 1), [{"n": 2}])
+
+    def test_predicate_counts_matches_only(self):
+        self.write("".join(json.dumps({"n": i, "even": i % 2 == 0}) + "\n" for i in range(10)))
+        result = tail_jsonl(self.log_path, 2, predicate=lambda e: e["even"])
+        self.assertEqual([e["n"] for e in result], [6, 8])
+
+    def test_missing_and_empty_files(self):
+        self.assertEqual(tail_jsonl(self.log_path, 5), [])
+        self.write("")
+        self.assertEqual(tail_jsonl(self.log_path, 5), [])
+        self.assertEqual(tail_lines(self.log_path, 5), [])
+
+    def test_reads_only_the_tail(self):
+        """Cost depends on records requested, not file size."""
+        self.write(("y" * 1000 + "\n") * 2000 + '{"last": true}\n')
+        reads = []
+        real_open = open
+
+        def tracking_open(*args, **kwargs):
+            f = real_open(*args, **kwargs)
+            real_read = f.read
+            f.read = lambda n=-1: reads.append(n) or real_read(n)
+            return f
+
+        with patch("builtins.open", tracking_open):
+            self.assertEqual(tail_jsonl(self.log_path, 1), [{"last": True}])
+        self.assertEqual(len(reads), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for outcome_join.py - offline surface/outcome join and rule_stats rebuild.
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import outcome_tracker
+from outcome_join import SurfaceOutcomeJoin, format_rebuild_report, join_events, rebuild_rule_stats
+from outcome_tracker import get_all_rule_stats, log_outcome_event, log_surface_event
+
+T0 = datetime.now()  # After the events logged live in TestRebuild
+
+
+def ts(seconds):
+    return (T0 + timedelta(seconds=seconds)).isoformat()
+
+
+def surface(corr, file_path, at, rules=("r1",)):
+    return {"type": "surface", "correlation_id": corr, "timestamp": ts(at),
+            "file_path": file_path, "tool_name": "Edit", "rules_fired": list(rules),
+            "context_shown": []}
+
+
+def outcome(corr, at, success=True, file_path="", embedded=None):
+    return {"type": "outcome", "correlation_id": corr, "timestamp": ts(at),
+            "file_path": file_path, "success": success, "override": False,
+            "error_message": "", "surface_event": embedded}
+
+
+class TestJoin(unittest.TestCase):
+    """Test the three ways an outcome finds its surface."""
+
+    def methods(self, events, **kwargs):
+        join = SurfaceOutcomeJoin(**kwargs)
+        return [(s["correlation_id"], o["correlation_id"], m)
+                for s, o, m in join_events(events, join)], join.counts
+
+    def test_by_correlation_id(self):
+        matches, counts = self.methods([surface("a", "/x.py", 0), surface("b", "/x.py", 1),
+                                        outcome("a", 2)])
+        self.assertEqual(matches, [("a", "a", "by_id")])
+        self.assertEqual(counts["unmatched_surfaces"], 1)
+
+    def test_embedded_surface_when_its_line_is_gone(self):
+        matches, _ = self.methods([outcome("a", 5, embedded=surface("a", "/x.py", 0))])
+        self.assertEqual(matches, [("a", "a", "embedded")])
+
+    def test_by_file_within_window(self):
+        events = [surface("a", "/x.py", 0), surface("b", "/x.py", 10), surface("c", "/y.py", 20),
+                  outcome("lost1", 30, file_path="/x.py"), outcome("lost2", 40, file_path="/x.py")]
+        matches, counts = self.methods(events)
+        self.assertEqual(matches, [("b", "lost1", "by_file"), ("a", "lost2", "by_file")])
+        self.assertEqual(counts["unmatched_surfaces"], 1)
+
+    def test_stale_surface_not_matched_by_file(self):
+        events = [surface("a", "/x.py", 0), outcome("lost", 100, file_path="/x.py")]
+        matches, counts = self.methods(events, window_seconds=60)
+        self.assertEqual(matches, [])
+        self.assertEqual((counts["unmatched_outcomes"], counts["unmatched_surfaces"]), (1, 1))
+
+    def test_pending_bounded_by_window(self):
+        def events():
+            for i in range(20000):
+                yield surface(f"s{i}", f"/f{i % 100}.py", i)
+                if i % 2:
+                    yield outcome(f"s{i}", i + 1)
+        join = SurfaceOutcomeJoin(window_seconds=60)
+        matched = sum(1 for _ in join_events(events(), join))
+        self.assertEqual(matched, 10000)
+        self.assertLessEqual(join.max_pending_seen, 31)
+        self.assertEqual(join.counts["unmatched_surfaces"], 10000)
+
+    def test_pending_capped(self):
+        join = SurfaceOutcomeJoin(max_pending=10)
+        list(join_events((surface(f"s{i}", "/x.py", 0) for i in range(100)), join))
+        self.assertEqual(join.max_pending_seen, 10)
+
+
+class TestRebuild(unittest.TestCase):
+    """Test rebuilding rule_stats.json from the outcome log."""
+
+    def setUp(self):
+        self.proof_dir = Path(tempfile.mkdtemp())
+        self.patcher = patch("outcome_tracker.get_proof_dir", return_value=self.proof_dir)
+        self.patcher.start()
+        outcome_tracker._pending_correlations.clear()
+        outcome_tracker._view = {}
+
+    def tearDown(self):
+        self.patcher.stop()
+        outcome_tracker._view = {}
+        shutil.rmtree(self.proof_dir, ignore_errors=True)
+
+    def log(self, *events):
+        with open(self.proof_dir / "outcome_tracking.jsonl", "a") as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+
+    def test_rebuild_recovers_lost_outcomes(self):
+        for i in range(3):
+            log_surface_event(f"c{i}", f"/f{i}.py", ["r1"], [], "Edit")
+            log_outcome_event(f"c{i}", success=i != 2, file_path=f"/f{i}.py")
+        # Correlation lost live: the outcome never reached rule_stats
+        self.log(surface("lost", "/g.py", 0, rules=("r1", "r2")),
+                 outcome("other", 1, success=False, file_path="/g.py"))
+        outcome_tracker.record_rule_costs({"r1": {"checks": 5, "ms": 2.0, "max_ms": 1.0,
+                                                  "overruns": 0}})
+        self.assertEqual(get_all_rule_stats()["rules"]["r1"]["times_fired"], 3)
+
+        report = rebuild_rule_stats()
+        rules = get_all_rule_stats()["rules"]
+        self.assertEqual((rules["r1"]["times_fired"], rules["r1"]["times_success"]), (4, 2))
+        self.assertEqual(rules["r2"]["times_fired"], 1)
+        self.assertEqual((rules["r1"]["checks"], rules["r1"]["total_ms"]), (5, 2.0))
+        self.assertEqual(report["counts"]["by_file"], 1)
+        self.assertEqual(report["drift"], {"r1": (3, 4), "r2": (0, 1)})
+        self.assertEqual((self.proof_dir / "rule_stats.deltas.jsonl").stat().st_size, 0)
+        self.assertIn("r1: 3 -> 4", format_rebuild_report(report))
+
+        # Rebuilding again changes nothing
+        self.assertEqual(rebuild_rule_stats()["drift"], {})
+
+    def test_dry_run_leaves_stats(self):
+        self.log(surface("a", "/x.py", 0), outcome("a", 1))
+        report = rebuild_rule_stats(dry_run=True)
+        self.assertEqual(report["drift"], {"r1": (0, 1)})
+        self.assertFalse((self.proof_dir / "rule_stats.json").exists())
+        self.assertEqual(get_all_rule_stats()["rules"], {})
+
+    def test_torn_and_foreign_lines_skipped(self):
+        self.log(surface("a", "/x.py", 0), {"type": "note"})
+        with open(self.proof_dir / "outcome_tracking.jsonl", "a") as f:
+            f.write("{not json\n" + json.dumps(outcome("a", 1))[:20])
+        report = rebuild_rule_stats()
+        self.assertEqual(report["counts"]["skipped"], 1)
+        self.assertEqual(report["counts"]["outcomes"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,12 +6,14 @@ import json
 import os
 import sys
 import tempfile
+import time
 import unittest
 from pathlib import Path
 from unittest.mock import patch
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import outcome_tracker
 from outcome_tracker import (
     generate_correlation_id,
     log_surface_event,
@@ -24,6 +26,7 @@ from outcome_tracker import (
     analyze_rule_impact,
     load_outcome_log,
     _pending_correlations,
+    _pending_by_file,
 )
 
 
@@ -121,6 +124,64 @@ class TestGetPendingCorrelation(unittest.TestCase):
         self.assertIsNone(found)
 
 
+class TestCrossProcessCorrelation(unittest.TestCase):
+    """post_tool runs in a different process from pre_tool."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.patcher = patch('outcome_tracker.get_proof_dir', return_value=Path(self.temp_dir))
+        self.patcher.start()
+        _pending_correlations.clear()
+
+    def tearDown(self):
+        self.patcher.stop()
+        _pending_correlations.clear()
+        _pending_by_file.clear()
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def new_process(self):
+        """Forget in-memory state, as a fresh hook process would."""
+        _pending_correlations.clear()
+        _pending_by_file.clear()
+
+    def test_outcome_in_other_process_updates_stats(self):
+        log_surface_event("xproc_1", "/src/app.py", ["rule-x"], [], "Edit")
+        self.new_process()
+
+        corr_id = get_pending_correlation("/src/app.py")
+        self.assertEqual(corr_id, "xproc_1")
+        log_outcome_event(corr_id, success=True)
+
+        self.assertEqual(get_rule_effectiveness("rule-x")["times_fired"], 1)
+        self.assertIsNone(get_pending_correlation("/src/app.py"))
+
+    def test_newest_surface_event_wins(self):
+        with patch('outcome_tracker.time.time', return_value=1000.0):
+            log_surface_event("older", "/src/app.py", ["r"], [], "Edit")
+        with patch('outcome_tracker.time.time', return_value=1001.0):
+            log_surface_event("newer", "/src/app.py", ["r"], [], "Edit")
+            self.new_process()
+            self.assertEqual(get_pending_correlation("/src/app.py"), "newer")
+
+    def test_expired_events_not_matched(self):
+        log_surface_event("stale", "/src/app.py", ["r"], [], "Edit")
+        self.new_process()
+        later = time.time() + outcome_tracker.PENDING_TTL_SECONDS + 1
+        with patch('outcome_tracker.time.time', return_value=later):
+            self.assertIsNone(get_pending_correlation("/src/app.py"))
+
+    def test_expired_events_evicted_from_memory(self):
+        """A long-lived process (the hook daemon) must not match stale surfaces either."""
+        log_surface_event("stale", "/src/app.py", ["r"], [], "Edit")
+        later = time.time() + outcome_tracker.PENDING_TTL_SECONDS + 1
+        with patch('outcome_tracker.time.time', return_value=later):
+            self.assertIsNone(get_pending_correlation("/src/app.py"))
+            log_outcome_event("stale", success=True)
+        self.assertEqual((_pending_correlations, _pending_by_file), ({}, {}))
+        self.assertIsNone(get_rule_effectiveness("r"))
+
+
 class TestRuleEffectivenessTracking(unittest.TestCase):
     """Test rule effectiveness statistics."""
 
@@ -213,6 +274,130 @@ class TestRuleEffectivenessTracking(unittest.TestCase):
         self.assertAlmostEqual(stats["effectiveness"], 0.8, places=2)
 
 
+class TestRuleStatsDeltaLog(unittest.TestCase):
+    """Outcomes append deltas; a compactor folds them into the snapshot."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.proof_dir = Path(self.temp_dir)
+        self.patcher = patch('outcome_tracker.get_proof_dir', return_value=self.proof_dir)
+        self.patcher.start()
+        _pending_correlations.clear()
+
+    def tearDown(self):
+        self.patcher.stop()
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def record(self, rule, success=True, override=False, n=1):
+        for i in range(n):
+            corr = generate_correlation_id() + f"_{i}"
+            log_surface_event(corr, f"/f{i}.py", [rule], [], "Edit")
+            log_outcome_event(corr, success=success, override=override)
+
+    def test_outcome_appends_delta_without_rewriting_snapshot(self):
+        self.record("r1", n=3)
+        self.assertFalse((self.proof_dir / "rule_stats.json").exists())
+        deltas = (self.proof_dir / "rule_stats.deltas.jsonl").read_text().splitlines()
+        self.assertEqual(len(deltas), 3)
+        self.assertEqual(get_rule_effectiveness("r1")["times_fired"], 3)
+
+    def test_compaction_preserves_totals(self):
+        self.record("r1", n=4)
+        self.record("r1", success=False, override=True, n=2)
+        before = get_all_rule_stats()["rules"]
+
+        outcome_tracker.compact_rule_stats()
+
+        self.assertEqual(outcome_tracker._file_size(self.proof_dir / "rule_stats.deltas.jsonl"), 0)
+        self.assertEqual(get_all_rule_stats()["rules"], before)
+        self.record("r1")
+        self.assertEqual(get_rule_effectiveness("r1")["times_fired"], 7)
+
+    def test_crash_during_compaction_does_not_double_count(self):
+        import state_utils
+        real_write = state_utils.atomic_write_text
+
+        def crash_on_new_log(path, content):
+            if Path(path).name == "rule_stats.deltas.jsonl":
+                raise KeyboardInterrupt  # Killed between snapshot and log rotation
+            real_write(path, content)
+
+        self.record("r1", n=3)
+        with patch("state_utils.atomic_write_text", side_effect=crash_on_new_log):
+            with self.assertRaises(KeyboardInterrupt):
+                outcome_tracker.compact_rule_stats()
+        outcome_tracker._view = {}  # As a fresh process would read it
+        self.assertEqual(get_rule_effectiveness("r1")["times_fired"], 3)
+
+        self.record("r1")
+        outcome_tracker.compact_rule_stats()
+        outcome_tracker._view = {}
+        self.assertEqual(get_rule_effectiveness("r1")["times_fired"], 4)
+        self.record("r1")
+        self.assertEqual(get_rule_effectiveness("r1")["times_fired"], 5)
+
+    def test_auto_compacts_past_threshold(self):
+        with patch('outcome_tracker.COMPACT_BYTES', 500):
+            self.record("r1", n=10)
+        snapshot = json.loads((self.proof_dir / "rule_stats.json").read_text())
+        self.assertGreater(snapshot["rules"]["r1"]["times_fired"], 0)
+        self.assertEqual(get_rule_effectiveness("r1")["times_fired"], 10)
+
+    def test_legacy_snapshot_still_counted(self):
+        legacy = {"rules": {"r1": {
+            "times_fired": 5, "times_success": 5, "times_override": 0,
+            "times_override_success": 0, "times_override_failure": 0, "effectiveness": 1.0,
+        }}, "updated": None}
+        (self.proof_dir / "rule_stats.json").write_text(json.dumps(legacy))
+        self.record("r1", success=False)
+        self.assertEqual(get_rule_effectiveness("r1")["times_fired"], 6)
+
+    def test_check_costs_accumulate(self):
+        outcome_tracker.record_rule_costs(
+            {"r1": {"checks": 2, "ms": 3.0, "max_ms": 2.5, "overruns": 1}})
+        self.record("r1")
+        outcome_tracker.compact_rule_stats()
+        outcome_tracker.record_rule_costs(
+            {"r1": {"checks": 1, "ms": 0.5, "max_ms": 0.5, "overruns": 0}})
+        stats = get_rule_effectiveness("r1")
+        self.assertEqual((stats["checks"], stats["total_ms"], stats["max_ms"], stats["overruns"]),
+                         (3, 3.5, 2.5, 1))
+        self.assertEqual(stats["times_fired"], 1)
+
+    def test_readers_share_one_view(self):
+        self.record("r1", n=5)
+        get_all_rule_stats()
+        with patch('outcome_tracker._read_snapshot') as read_snapshot:
+            analyze_rule_impact()
+        read_snapshot.assert_not_called()
+
+    def test_returned_stats_are_copies(self):
+        self.record("r1")
+        get_all_rule_stats()["rules"]["r1"]["times_fired"] = 99
+        get_rule_effectiveness("r1")["times_fired"] = 99
+        self.assertEqual(get_rule_effectiveness("r1")["times_fired"], 1)
+
+    def test_concurrent_writers_lose_nothing(self):
+        """Several hook processes recording while compaction runs."""
+        import subprocess
+        hooks_dir = os.path.dirname(os.path.abspath(__file__))
+        script = (
+            "import sys; sys.path.insert(0, %r)\n"
+            "import outcome_tracker as ot\n"
+            "ot.COMPACT_BYTES = 2000\n"
+            "for i in range(40):\n"
+            "    ot._update_rule_stats({'rules_fired': ['shared']}, True, False)\n"
+        ) % hooks_dir
+        env = dict(os.environ, CLAUDE_PROJECT_DIR=self.temp_dir)
+        procs = [subprocess.Popen([sys.executable, "-c", script], env=env) for _ in range(4)]
+        for proc in procs:
+            self.assertEqual(proc.wait(timeout=60), 0)
+
+        with patch('outcome_tracker.get_proof_dir', return_value=self.proof_dir / ".proof"):
+            self.assertEqual(get_rule_effectiveness("shared")["times_fired"], 160)
+
+
 class TestRuleAnalysis(unittest.TestCase):
     """Test rule analysis functions."""
 
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for parallel_tests.py - sharded test runner.
+"""
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from parallel_tests import (
+    discover_modules,
+    format_report,
+    get_durations_file,
+    plan_shards,
+    reports_ok,
+    run_parallel,
+)
+
+PASSING = '''
+import unittest
+class T(unittest.TestCase):
+    def test_one(self): pass
+    def test_two(self): pass
+    @unittest.skip("later")
+    def test_skipped(self): pass
+'''
+
+FAILING = '''
+import unittest
+class T(unittest.TestCase):
+    def test_ok(self): pass
+    def test_broken(self): self.assertEqual(1, 2)
+    def test_crash(self): raise RuntimeError("boom")
+'''
+
+
+class TestPlanShards(unittest.TestCase):
+    """Test duration-balanced sharding."""
+
+    def test_longest_first_onto_lightest(self):
+        durations = {"a": 5, "b": 4, "c": 3, "d": 3, "e": 2, "f": 1}
+        shards = plan_shards(list(durations), durations, 2)
+        loads = sorted(sum(durations[m] for m in shard) for shard in shards)
+        self.assertEqual(loads, [9, 9])
+        self.assertEqual(sorted(sum(shards, [])), sorted(durations))
+
+    def test_unknown_modules_cost_the_median(self):
+        durations = {"a": 1, "b": 2, "c": 9}
+        shards = plan_shards(["a", "b", "c", "new1", "new2"], durations, 2)
+        # c alone (9) vs a+b+new1+new2 (1+2+2+2)
+        self.assertIn(["c"], shards)
+
+    def test_no_more_shards_than_modules(self):
+        self.assertEqual(len(plan_shards(["a", "b"], {}, 8)), 2)
+        self.assertEqual(plan_shards([], {}, 4), [])
+
+
+class RunnerTestCase(unittest.TestCase):
+    """Base class with a directory of small test modules."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.test_dir = os.path.join(self.temp_dir, "hooks")
+        os.makedirs(self.test_dir)
+        self.state = Path(self.temp_dir) / "state"
+        self.patcher = patch("parallel_tests.get_state_dir", return_value=self.state)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write(self, name, source):
+        Path(self.test_dir, f"{name}.py").write_text(source)
+
+
+class TestRunParallel(RunnerTestCase):
+    """Test running shards in worker processes."""
+
+    def test_merged_report(self):
+        self.write("test_pt_pass_a", PASSING)
+        self.write("test_pt_pass_b", PASSING)
+        self.write("test_pt_fail", FAILING)
+        modules = discover_modules(self.test_dir)
+        self.assertEqual(modules, ["test_pt_fail", "test_pt_pass_a", "test_pt_pass_b"])
+
+        reports = run_parallel(modules, jobs=2, test_dir=self.test_dir)
+        self.assertFalse(reports_ok(reports))
+
+        output = format_report(reports, 1.5)
+        self.assertIn("Ran 9 tests in 1.500s", output)
+        self.assertIn("FAILED (failures=1, errors=1, skipped=2)", output)
+        # The same lines post_tool scrapes from unittest output
+        self.assertEqual(re.findall(r"FAIL: (\w+)", output), ["test_broken"])
+        self.assertEqual(re.findall(r"ERROR: (\w+)", output), ["test_crash"])
+
+    def test_durations_recorded(self):
+        self.write("test_pt_dur", PASSING)
+        run_parallel(["test_pt_dur"], jobs=1, test_dir=self.test_dir)
+        durations = json.loads(get_durations_file().read_text())
+        self.assertIn("test_pt_dur", durations)
+
+    def test_all_passing(self):
+        self.write("test_pt_green_a", PASSING)
+        self.write("test_pt_green_b", PASSING)
+        reports = run_parallel(["test_pt_green_a", "test_pt_green_b"], jobs=2,
+                               test_dir=self.test_dir)
+        self.assertTrue(reports_ok(reports))
+        self.assertTrue(format_report(reports, 0.1).endswith("OK (skipped=2)"))
+
+    def test_missing_module_is_an_error(self):
+        reports = run_parallel(["test_pt_missing"], jobs=1, test_dir=self.test_dir)
+        self.assertFalse(reports_ok(reports))
+        self.assertIn("errors=1", format_report(reports, 0.1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Tests for pattern_metrics.py - streaming, checkpointed aggregation.
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pattern_metrics
+from pattern_metrics import (
+    compute_metrics_summary,
+    compute_rule_metrics,
+    format_rule_metrics,
+    get_checkpoint_file,
+    get_metrics_file,
+    update_metrics_aggregate,
+)
+
+
+def surface(confidences, types, ts="2026-01-01T10:00:00"):
+    return {"type": "surface", "timestamp": ts, "patterns_count": len(confidences),
+            "confidence_levels": confidences, "pattern_types": types}
+
+
+def outcome(shown, success, ts="2026-01-01T10:01:00"):
+    return {"type": "outcome", "timestamp": ts, "patterns_shown": shown, "success": success}
+
+
+class MetricsTestCase(unittest.TestCase):
+    """Base class with an isolated project dir."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.env = patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": self.temp_dir})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def append(self, *events, raw=""):
+        with open(get_metrics_file(), "a") as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+            f.write(raw)
+
+
+class TestSummary(MetricsTestCase):
+    """Test the summary figures."""
+
+    def test_no_data(self):
+        self.assertEqual(compute_metrics_summary()["status"], "no_data")
+
+    def test_summary_values(self):
+        self.append(
+            surface(["high", "low"], ["cochange", "risk"], ts="2026-01-01T09:00:00"),
+            surface(["high"], ["cochange"]),
+            outcome(2, True),
+            outcome(0, False),
+            outcome(1, False, ts="2026-01-02T08:00:00"),
+        )
+        summary = compute_metrics_summary()
+
+        self.assertEqual(summary["collection_period"], {
+            "first_event": "2026-01-01T09:00:00",
+            "last_event": "2026-01-02T08:00:00",
+            "total_events": 5,
+        })
+        self.assertEqual(summary["surface_rate"]["total_surfaces"], 2)
+        self.assertAlmostEqual(summary["surface_rate"]["avg_patterns_per_surface"], 1.5)
+        self.assertEqual(summary["relevance"]["high_confidence"], 2)
+        self.assertEqual(summary["relevance"]["medium_confidence"], 0)
+        self.assertAlmostEqual(summary["relevance"]["high_confidence_rate"], 2 / 3)
+        self.assertEqual(summary["edit_success"]["edits_with_patterns"], 2)
+        self.assertEqual(summary["edit_success"]["success_rate_with_patterns"], 0.5)
+        self.assertEqual(summary["edit_success"]["success_rate_without_patterns"], 0.0)
+        self.assertEqual(summary["pattern_types"], {"cochange": 2, "risk": 1})
+
+
+class TestCheckpoint(MetricsTestCase):
+    """Test incremental processing."""
+
+    def test_only_new_events_are_read(self):
+        self.append(surface(["high"], ["risk"]), outcome(1, True))
+        update_metrics_aggregate()
+
+        self.append(outcome(0, True))
+        with patch.object(pattern_metrics.MetricsAggregate, "add",
+                          autospec=True, side_effect=pattern_metrics.MetricsAggregate.add) as add:
+            agg = update_metrics_aggregate()
+        self.assertEqual(add.call_count, 1)
+        self.assertEqual(agg.total_events, 3)
+
+    def test_checkpoint_persisted(self):
+        self.append(outcome(1, True))
+        update_metrics_aggregate()
+        checkpoint = json.loads(get_checkpoint_file().read_text())
+        self.assertEqual(checkpoint["offset"], get_metrics_file().stat().st_size)
+        self.assertEqual(checkpoint["edits"], {"with": 1, "with_success": 1})
+
+    def test_torn_line_waits_for_completion(self):
+        self.append(outcome(1, True), raw='{"type": "outcome", "patterns_')
+        self.assertEqual(update_metrics_aggregate().total_events, 1)
+
+        with open(get_metrics_file(), "a") as f:
+            f.write('shown": 0, "success": true}\n')
+        self.assertEqual(update_metrics_aggregate().edits["without_success"], 1)
+
+    def test_truncated_log_resets(self):
+        self.append(*[outcome(1, True) for _ in range(10)])
+        update_metrics_aggregate()
+        get_metrics_file().write_text(json.dumps(outcome(0, False)) + "\n")
+        agg = update_metrics_aggregate()
+        self.assertEqual(agg.total_events, 1)
+
+    def test_replaced_log_resets(self):
+        self.append(*[surface(["low"], ["risk"]) for _ in range(10)])
+        update_metrics_aggregate()
+        get_metrics_file().write_text(
+            "".join(json.dumps(outcome(0, False, ts="2026-02-02T00:00:00")) + "\n" for _ in range(12))
+        )
+        agg = update_metrics_aggregate()
+        self.assertEqual((agg.total_events, agg.surfaces), (12, 0))
+
+    def test_rewritten_log_with_same_start_resets(self):
+        kept = [surface(["low"], ["risk"]) for _ in range(10)]
+        self.append(*kept, *[surface(["low"], ["risk"]) for _ in range(5)])
+        update_metrics_aggregate()
+        get_metrics_file().write_text(
+            "".join(json.dumps(event) + "\n"
+                    for event in kept + [outcome(0, False) for _ in range(12)])
+        )
+        agg = update_metrics_aggregate()
+        self.assertEqual((agg.total_events, agg.surfaces), (22, 10))
+
+    def test_corrupt_checkpoint_ignored(self):
+        self.append(outcome(1, True))
+        update_metrics_aggregate()
+        get_checkpoint_file().write_text("{not json")
+        self.assertEqual(update_metrics_aggregate().total_events, 1)
+
+
+class TestRuleMetrics(MetricsTestCase):
+    """Test check cost and quarantine in the rule report."""
+
+    def test_report_shows_cost_and_quarantine(self):
+        import rules_engine
+        from outcome_tracker import record_rule_costs
+
+        record_rule_costs({"slow-rule": {"checks": 4, "ms": 10.0, "max_ms": 6.0, "overruns": 1}})
+        rules_engine._save_quarantine({
+            "quarantined": {"slow-rule": {"since": "2026-01-01T10:00:00",
+                                          "until": datetime(2099, 1, 1, 11).timestamp(),
+                                          "reason": "too slow"}},
+            "overruns": {},
+        })
+        report = format_rule_metrics(compute_rule_metrics())
+        self.assertIn("2.50ms avg, 6.0ms max over 4 checks, 1 over budget", report)
+        self.assertIn("**slow-rule** quarantined since 2026-01-01T10:00 until 2099-01-01T11:00",
+                      report)
+
+
+if __name__ == "__main__":
+    unittest.main()
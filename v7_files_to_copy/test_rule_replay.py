@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for rule_replay.py - candidate rules replayed over proof logs.
+"""
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import post_tool
+from proof_utils import archive_old_sessions, get_session_log_path, save_session_id
+from rule_replay import (
+    format_replay_report,
+    get_log_files,
+    iter_calls,
+    main,
+    plan_chunks,
+    replay_rule,
+)
+from rules_engine import Rule, load_rules
+from state_utils import log_proof
+
+BAD = "#!/usr/bin/env python\nprint('hi')\n"
+GOOD = "#!/usr/bin/env python3\nprint('hi')\n"
+
+NOW = datetime.now()
+OLD_SESSION = (NOW - timedelta(days=30)).strftime("%Y%m%d-%H%M%S")
+SESSIONS = [(NOW - timedelta(days=2)).strftime("%Y%m%d-%H%M%S"),
+            (NOW - timedelta(days=1)).strftime("%Y%m%d-%H%M%S")]
+
+
+def hook(tool_name, tool_input):
+    """Log a call through the PostToolUse hook, as Claude Code would."""
+    data = {"tool_name": tool_name, "tool_input": tool_input, "tool_result": {"success": True}}
+    with patch("sys.stdin", io.StringIO(json.dumps(data))), patch("post_tool.record_tool_outcome"):
+        post_tool.main()
+
+
+def shebang_copy():
+    return Rule(id="shebang-copy", trigger_pattern=r"\.py$",
+                check_fn="check_python_shebang", message="copy")
+
+
+class ReplayTestCase(unittest.TestCase):
+    """Base class with session logs and an archive written by post_tool."""
+
+    def setUp(self):
+        self.project = tempfile.mkdtemp()
+        self.env = patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": self.project})
+        self.env.start()
+        self.proof_dir = Path(self.project) / ".proof"
+
+        save_session_id(OLD_SESSION)
+        hook("Edit", {"file_path": "/p/d.py", "old_string": "x", "new_string": BAD})
+        archive_old_sessions()
+
+        save_session_id(SESSIONS[0])
+        hook("Write", {"file_path": "/p/a.py", "content": BAD})
+        hook("Bash", {"command": "ls"})
+        hook("Edit", {"file_path": "/p/b.py", "old_string": "x", "new_string": GOOD})
+        hook("Edit", {"file_path": "/p/notes.md", "old_string": "x", "new_string": "y"})
+        with open(get_session_log_path(), "a") as f:
+            f.write("{not json\n")
+
+        save_session_id(SESSIONS[1])
+        hook("Write", {"file_path": "/p/c.py", "content": BAD})
+        # As post_tool logged Writes before it kept their content
+        log_proof("Write", {"file": "/p/e.py"}, "Modified: /p/e.py", True)
+
+        self.files = get_log_files(self.proof_dir)
+
+    def tearDown(self):
+        self.env.stop()
+        shutil.rmtree(self.project, ignore_errors=True)
+
+    def replay(self, **kwargs):
+        kwargs.setdefault("existing", load_rules())
+        return replay_rule(shebang_copy(), files=self.files, **kwargs)
+
+
+class TestLogReading(ReplayTestCase):
+    """Test finding and chunking the logs."""
+
+    def test_sessions_then_archive(self):
+        self.assertEqual([f.name for f in self.files],
+                         [f"{SESSIONS[0]}.jsonl", f"{SESSIONS[1]}.jsonl", "archive.jsonl"])
+
+    def test_chunks_cover_each_call_once(self):
+        whole = [c for chunk in plan_chunks(self.files, 1 << 20) for c in iter_calls(chunk)]
+        small = plan_chunks(self.files, 37)
+        self.assertGreater(len(small), 10)
+        self.assertEqual([c for chunk in small for c in iter_calls(chunk)], whole)
+        self.assertEqual([i and i["file_path"] for _, i, _ in whole],
+                         ["/p/a.py", "/p/b.py", "/p/notes.md", "/p/c.py", None, "/p/d.py"])
+
+    def test_calls_rebuilt_from_the_logged_input(self):
+        calls = [c for chunk in plan_chunks(self.files) for c in iter_calls(chunk)]
+        self.assertEqual(calls[0][:2], ("Write", {"file_path": "/p/a.py", "content": BAD}))
+        self.assertEqual(calls[1][:2], ("Edit", {"file_path": "/p/b.py", "old_string": "x",
+                                                 "new_string": GOOD}))
+
+
+class TestReplay(ReplayTestCase):
+    """Test fire rate, latency and overlap."""
+
+    def test_report(self):
+        report = self.replay(jobs=1)
+        self.assertEqual((report["calls"], report["unreplayable"], report["matched"],
+                          report["fires"]), (5, 1, 4, 3))
+        self.assertAlmostEqual(report["fire_rate"], 0.6)
+        self.assertGreater(report["ms_per_match"], 0)
+        self.assertEqual(report["overlap"], {"python-shebang": 3})
+        self.assertEqual(report["overlap_rate"], 1.0)
+        self.assertLessEqual(report["first"], report["last"])
+
+    def test_no_overlap_without_the_existing_rule(self):
+        others = [r for r in load_rules() if r.id != "python-shebang"]
+        report = self.replay(existing=others, jobs=1)
+        self.assertEqual((report["overlap"], report["overlap_rate"]), ({}, 0.0))
+
+    def test_process_pool_matches_single_process(self):
+        single = self.replay(jobs=1, chunk_bytes=64)
+        pooled = self.replay(jobs=2, chunk_bytes=64)
+        self.assertEqual(pooled["jobs"], 2)
+        for key in ("calls", "unreplayable", "matched", "fires", "overlap", "first", "last"):
+            self.assertEqual(pooled[key], single[key], key)
+
+    def test_format(self):
+        text = format_replay_report(self.replay(jobs=1))
+        self.assertIn("**Fire rate**: 60.0% (3 fires, trigger matched 4 calls)", text)
+        self.assertIn("python-shebang: 3/3", text)
+        self.assertIn("**Unreplayable**: 1 calls logged without their content", text)
+
+    def test_no_history(self):
+        report = replay_rule(shebang_copy(), existing=[], files=[], jobs=4)
+        self.assertEqual(report["fire_rate"], 0.0)
+        self.assertIn("No recorded Edit/Write calls", format_replay_report(report))
+
+    def test_cli_rejects_unknown_check(self):
+        with self.assertRaises(SystemExit), patch("sys.stderr", io.StringIO()):
+            main(["rule_replay.py", "--id", "x", "--trigger", r"\.py$", "--check", "nope"])
+
+
+if __name__ == "__main__":
+    unittest.main()
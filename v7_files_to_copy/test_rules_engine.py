@@ -2,20 +2,44 @@
 """
 Tests for rules_engine.py - graduated lessons become enforcement.
 """
+import json
 import unittest
 import sys
 import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+import time
+from unittest.mock import MagicMock, patch
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import rules_engine
 from rules_engine import (
     Rule, RuleViolation,
-    check_rules, format_violations, get_blocking_violation,
+    check_rules, check_rules_batch, format_violations, get_blocking_violation,
+    RuleIndex, get_rule_index, load_rules, ContentView, DEFAULT_MAX_BYTES,
+    changed_regions, content_view, get_quarantined_rules, release_rule, take_notices,
     check_policy_has_enforcement, check_python_shebang, check_resolved_archived,
     should_graduate_lesson, get_graduation_candidates,
     GRADUATION_THRESHOLD,
 )
 
+_env = None
+
+
+def setUpModule():
+    # check_rules records costs and quarantines under the project dir
+    global _env
+    _env = patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": tempfile.mkdtemp()})
+    _env.start()
+
+
+def tearDownModule():
+    shutil.rmtree(os.environ["CLAUDE_PROJECT_DIR"], ignore_errors=True)
+    _env.stop()
+
 
 class TestRuleDataclasses(unittest.TestCase):
     """Test Rule and RuleViolation dataclasses."""
@@ -240,6 +264,397 @@ class TestGetBlockingViolation(unittest.TestCase):
         self.assertIsNone(blocking)
 
 
+class TestCheckRulesBatch(unittest.TestCase):
+    """Test batch rule evaluation."""
+
+    CALLS = [
+        ("Write", {"file_path": "/p/script.py", "content": "#!/usr/bin/env python\n"}),
+        ("Bash", {"command": "ls"}),
+        ("Edit", {"file_path": "/p/CLAUDE.md", "new_string": "You must do this."}),
+        ("Edit", {"file_path": "/p/ok.py", "new_string": "x = 1"}),
+        ("Write", {"file_path": "/p/script.py", "content": "#!/usr/bin/env python\n"}),
+        ("Edit", {}),
+    ]
+
+    def test_matches_check_rules(self):
+        batch = check_rules_batch(self.CALLS)
+        self.assertEqual(len(batch), len(self.CALLS))
+        for (tool_name, tool_input), violations in zip(self.CALLS, batch):
+            self.assertEqual(violations, check_rules(tool_name, tool_input))
+        self.assertEqual([len(v) for v in batch], [1, 0, 1, 0, 1, 0])
+
+    def test_identical_calls_checked_once(self):
+        rule = Rule(id="count", trigger_pattern=r"\.py$", check_fn="check_python_shebang",
+                    message="m")
+        calls = [("Write", {"file_path": "/p/a.py", "content": "#!/usr/bin/python\n"})] * 50
+        counted = MagicMock(wraps=check_python_shebang)
+        with patch.dict("rules_engine.CHECK_FUNCTIONS", {"check_python_shebang": counted}):
+            index = RuleIndex([rule])
+            results = check_rules_batch(calls, index)
+        self.assertEqual(counted.call_count, 1)
+        self.assertTrue(all(len(r) == 1 for r in results))
+        results[0].clear()  # Results don't share lists
+        self.assertEqual(len(results[1]), 1)
+
+    def test_index_skips_bad_rules(self):
+        index = RuleIndex([
+            Rule(id="bad-regex", trigger_pattern="(", check_fn="check_python_shebang", message="m"),
+            Rule(id="no-fn", trigger_pattern=".", check_fn="missing", message="m"),
+            Rule(id="ok", trigger_pattern=r"\.py$", check_fn="check_python_shebang", message="m"),
+        ])
+        self.assertEqual([r.id for r, _ in index.rules_for("a.py")], ["ok"])
+        self.assertEqual(index.rules_for("a.md"), [])
+
+
+class TestRulesFile(unittest.TestCase):
+    """Test loading and hot-reloading .claude/rules.yaml."""
+
+    def setUp(self):
+        self.project = Path(tempfile.mkdtemp())
+        (self.project / ".claude").mkdir()
+        self.rules_file = self.project / ".claude" / "rules.yaml"
+        rules_engine._loaded = None
+
+    def tearDown(self):
+        rules_engine._loaded = None
+        shutil.rmtree(self.project, ignore_errors=True)
+
+    def write(self, content, mtime_ns=None):
+        self.rules_file.write_text(content)
+        if mtime_ns is not None:
+            os.utime(self.rules_file, ns=(mtime_ns, mtime_ns))
+
+    def ids(self):
+        return [r.id for r in load_rules(self.project)]
+
+    def test_defaults_without_file(self):
+        self.assertEqual(self.ids(), ["policy-enforcement", "python-shebang", "resolved-archived"])
+
+    def test_override_and_add(self):
+        self.write(
+            "rules:\n"
+            "  - id: python-shebang\n"
+            "    enabled: false\n"
+            "  - id: policy-enforcement\n"
+            "    action: block\n"
+            "  - id: scripts-shebang\n"
+            '    trigger_pattern: "\\.sh$"\n'
+            "    check_fn: check_python_shebang\n"
+            "    max_bytes: 4096\n"
+            "  - id: incomplete\n"
+            '    trigger_pattern: "\\.js$"\n'
+        )
+        rules = {r.id: r for r in load_rules(self.project)}
+        self.assertEqual(sorted(rules), ["policy-enforcement", "resolved-archived", "scripts-shebang"])
+        self.assertEqual(rules["policy-enforcement"].action, "block")
+        self.assertEqual(rules["scripts-shebang"].trigger_pattern, r"\.sh$")
+        self.assertEqual(rules["scripts-shebang"].message, "scripts-shebang")
+        self.assertEqual(rules["scripts-shebang"].max_bytes, 4096)
+        self.assertIsNone(rules["policy-enforcement"].max_bytes)
+
+    def test_reloads_on_change(self):
+        self.write("rules:\n  - id: python-shebang\n    enabled: false\n", mtime_ns=10**18)
+        self.assertNotIn("python-shebang", self.ids())
+        index = get_rule_index(self.project)
+        self.assertIs(get_rule_index(self.project), index)  # Cached while unchanged
+
+        self.write("rules:\n  - id: python-shebang\n    enabled: true\n", mtime_ns=2 * 10**18)
+        self.assertIn("python-shebang", self.ids())
+        self.assertIsNot(get_rule_index(self.project), index)
+
+    def test_broken_file_falls_back_to_defaults(self):
+        self.write("rules: [")
+        with patch("state_utils.parse_simple_yaml", side_effect=ValueError("bad")):
+            self.assertEqual(len(self.ids()), 3)
+
+
+class TestRuleDispatch(unittest.TestCase):
+    """Test that the extension/basename index only narrows, never changes, matches."""
+
+    PATTERNS = [
+        r"\.py$", r"\.(md|txt)$", r"active_context\.yaml$", r"(^|/)Makefile$",
+        r"/setup\.py$", r"^Dockerfile$", r"test_.*\.py$", r"\.py", r"(?i)readme",
+    ]
+    PATHS = [
+        "a.py", "/x/a.py", "C:\\x\\a.py", "a.pyc", "a.py/", "notes.md", "x.txt", "x.TXT",
+        ".md", "/p/.claude/active_context.yaml", "myactive_context.yaml", "Makefile",
+        "/src/Makefile", "/src/xMakefile", "/pkg/setup.py", "setup.py", "Dockerfile",
+        "/d/Dockerfile", "/t/test_x.py", "/README.rst", "", "noext",
+    ]
+
+    def test_same_matches_as_linear_scan(self):
+        rules = [Rule(id=f"r{i}", trigger_pattern=p, check_fn="check_python_shebang", message="m")
+                 for i, p in enumerate(self.PATTERNS)]
+        index = RuleIndex(rules)
+        for path in self.PATHS:
+            with self.subTest(path=path):
+                expected = [r.id for r in rules if re.search(r.trigger_pattern, path)]
+                self.assertEqual([r.id for r, _ in index.rules_for(path)], expected)
+
+    def test_bucketed_rules_not_scanned(self):
+        rules = [Rule(id=f"r{i}", trigger_pattern=rf"\.ext{i}$", check_fn="check_python_shebang",
+                      message="m") for i in range(1000)]
+        index = RuleIndex(rules)
+        self.assertEqual(index.candidates("/src/file.ext7"), [7])
+        self.assertEqual(index.candidates("/src/file.py"), [])
+
+
+class TestContentView(unittest.TestCase):
+    """Test lazy, budgeted content reads."""
+
+    def test_lines_match_split(self):
+        for text in ["", "a", "a\nb", "a\n", "\n\nc\n"]:
+            with self.subTest(text=text):
+                expected = text.split("\n")
+                if expected[-1] == "":
+                    expected.pop()  # No empty line after a trailing newline
+                self.assertEqual(list(ContentView(text).lines()), expected)
+
+    def test_budget_limits_reads(self):
+        view = ContentView("first\nsecond\nthird", max_bytes=9)
+        self.assertEqual(list(view.lines()), ["first", "sec"])
+        self.assertEqual(ContentView("#!/usr/bin/env python", max_bytes=6).first_line(), "#!/usr")
+
+    def test_lines_are_lazy(self):
+        lines = ContentView("must\n" + "x\n" * 1000).lines()
+        self.assertEqual(next(lines), "must")
+
+    def test_check_stops_at_budget(self):
+        text = "intro\n" * 10 + "Callers must validate input.\n"
+        tool_input = {"file_path": "/p/CLAUDE.md", "new_string": text}
+        self.assertIsNotNone(check_policy_has_enforcement(tool_input))
+        self.assertIsNone(check_policy_has_enforcement(tool_input, ContentView(text, max_bytes=30)))
+
+    def test_rule_max_bytes_applied_by_engine(self):
+        text = "x = 1\n" * 100 + "mismatches:\n  - status: resolved\n"
+        calls = [("Write", {"file_path": "/p/active_context.yaml", "content": text})]
+        rule = Rule(id="resolved-archived", trigger_pattern=r"active_context\.yaml$",
+                    check_fn="check_resolved_archived", message="m")
+        self.assertEqual(len(check_rules_batch(calls, RuleIndex([rule]))[0]), 1)
+        rule.max_bytes = 100
+        self.assertEqual(check_rules_batch(calls, RuleIndex([rule]))[0], [])
+
+    def test_large_write_within_default_budget(self):
+        text = "#!/usr/bin/env python\n" + "value = 1\n" * 500000
+        violations = check_rules("Write", {"file_path": "/p/big.py", "content": text})
+        self.assertEqual([v.rule_id for v in violations], ["python-shebang"])
+        self.assertGreater(len(text), DEFAULT_MAX_BYTES)
+
+
+class TestDiffStage(unittest.TestCase):
+    """Test that rules only see the lines a call changes."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def existing(self, name, content):
+        path = self.temp_dir / name
+        path.write_text(content)
+        return str(path)
+
+    def test_changed_regions(self):
+        new = "a\nB\nc\nd\n"
+        regions = changed_regions("a\nb\nc\n", new)
+        self.assertEqual([new[s:e] for s, e in regions], ["B\n", "d\n"])
+        self.assertEqual(changed_regions(new, new), [])
+        with patch("rules_engine.DIFF_MAX_BYTES", 4):
+            self.assertIsNone(changed_regions("a\nb\nc\n", new))
+
+    def test_repetitive_input_diffs_in_linear_time(self):
+        old = "x = 1\n" * 100000
+        start = time.perf_counter()
+        self.assertEqual(changed_regions(old, "import os\n" + old), [(0, 10)])
+        self.assertEqual(changed_regions(old, old + "y = 2\n"), [(len(old), len(old) + 6)])
+        scattered = old.splitlines(keepends=True)
+        for i in range(0, len(scattered), 10000):
+            scattered[i] = f"edit {i}\n"
+        new = "".join(scattered)
+        self.assertEqual(["".join(new[s:e]) for s, e in changed_regions(old, new)],
+                         [f"edit {i}\n" for i in range(0, 100000, 10000)])
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_duplicated_line_still_reported(self):
+        old = "a\nstatus: resolved\nb\n"
+        new = "a\nstatus: resolved\nb\nstatus: resolved\n"
+        self.assertEqual([new[s:e] for s, e in changed_regions(old, new)], ["status: resolved\n"])
+
+    def test_edit_sees_new_string_minus_old_string(self):
+        view = content_view("Edit", {"file_path": "x.md", "old_string": "one\ntwo\n",
+                                     "new_string": "one\nTWO\nthree\n"})
+        self.assertEqual(list(view.lines()), ["TWO", "three"])
+        self.assertEqual(view.first_line(), "")
+
+    def test_unchanged_shebang_not_reflagged(self):
+        violations = check_rules("Edit", {
+            "file_path": "/p/x.py",
+            "old_string": "#!/usr/bin/env python\nimport os",
+            "new_string": "#!/usr/bin/env python\nimport os\nimport sys",
+        })
+        self.assertEqual(violations, [])
+
+    def test_write_only_checks_added_lines(self):
+        path = self.existing("CLAUDE.md", "# Rules\nYou must run tests.\n")
+        unchanged = check_rules("Write", {"file_path": path,
+                                          "content": "# Rules\nYou must run tests.\nSee docs.\n"})
+        self.assertEqual(unchanged, [])
+        added = check_rules("Write", {"file_path": path,
+                                      "content": "# Rules\nYou must run tests.\nAlways should lint.\n"})
+        self.assertEqual([v.rule_id for v in added], ["policy-enforcement"])
+
+    def test_new_resolved_status_uses_section_context(self):
+        path = self.existing("active_context.yaml",
+                             "mismatches:\n  - id: m1\n    status: open\n")
+        tool_input = {"file_path": path,
+                      "content": "mismatches:\n  - id: m1\n    status: resolved\n"}
+        self.assertEqual([v.rule_id for v in check_rules("Write", tool_input)], ["resolved-archived"])
+        self.existing("active_context.yaml", tool_input["content"])
+        self.assertEqual(check_rules("Write", tool_input), [])  # Already there - no repeat
+
+    def test_diff_off_checks_everything(self):
+        path = self.existing("CLAUDE.md", "You must run tests.\n")
+        calls = [("Write", {"file_path": path, "content": "You must run tests.\n"})]
+        self.assertEqual(check_rules_batch(calls), [[]])
+        self.assertEqual(len(check_rules_batch(calls, diff=False)[0]), 1)
+
+
+def slow_check(tool_input, view=None):
+    time.sleep(0.03)
+    return None
+
+
+def runaway_check(tool_input, view=None):
+    re.search(r"(a+)+$", "a" * 40 + "b")  # Catastrophic backtracking
+    return None
+
+
+class TestTimeBudgets(unittest.TestCase):
+    """Test per-rule time budgets, cost accounting and quarantine."""
+
+    def setUp(self):
+        self.project = tempfile.mkdtemp()
+        self.env = patch.dict(os.environ, {"CLAUDE_PROJECT_DIR": self.project})
+        self.env.start()
+        self.checks = patch.dict("rules_engine.CHECK_FUNCTIONS",
+                                 {"slow_check": slow_check, "runaway_check": runaway_check})
+        self.checks.start()
+        rules_engine._quarantine = None
+        take_notices()
+
+    def tearDown(self):
+        self.checks.stop()
+        self.env.stop()
+        rules_engine._quarantine = None
+        shutil.rmtree(self.project, ignore_errors=True)
+
+    def check(self, index, n=1):
+        calls = [("Edit", {"file_path": "/p/a.py", "new_string": f"x = {i}"}) for i in range(n)]
+        return check_rules_batch(calls, index, budgets=True)
+
+    def stats(self, rule_id):
+        from outcome_tracker import get_rule_effectiveness
+        return get_rule_effectiveness(rule_id)
+
+    def test_costs_recorded(self):
+        index = RuleIndex([Rule(id="shebang", trigger_pattern=r"\.py$",
+                                check_fn="check_python_shebang", message="m")])
+        self.check(index, n=3)
+        stats = self.stats("shebang")
+        self.assertEqual((stats["checks"], stats["overruns"]), (3, 0))
+        self.assertGreater(stats["total_ms"], 0)
+
+    def test_repeated_overruns_quarantine(self):
+        index = RuleIndex([Rule(id="slow", trigger_pattern=r"\.py$", check_fn="slow_check",
+                                message="m", max_ms=1)])
+        self.check(index, n=2)  # One overrun per batch, however many checks ran over
+        self.check(index)
+        self.assertEqual(get_quarantined_rules(), {})
+        self.check(index)
+        self.assertIn("slow", get_quarantined_rules())
+        notices = take_notices()
+        self.assertEqual(len(notices), 1)
+        self.assertIn("'slow' quarantined", notices[0])
+        self.assertEqual(self.stats("slow")["checks"], 4)
+
+        self.check(index)  # Skipped while quarantined
+        self.assertEqual(self.stats("slow")["checks"], 4)
+
+        self.assertTrue(release_rule("slow"))
+        self.check(index)
+        self.assertEqual(self.stats("slow")["checks"], 5)
+        self.assertNotIn("slow", get_quarantined_rules())
+
+    def test_release_holds_quarantine_lock(self):
+        import state_utils
+        with patch("state_utils.file_lock", wraps=state_utils.file_lock) as lock:
+            self.assertFalse(release_rule("slow"))
+        lock.assert_called_once_with(rules_engine.get_quarantine_file())
+
+    def test_quarantine_expires(self):
+        index = RuleIndex([Rule(id="slow", trigger_pattern=r"\.py$", check_fn="slow_check",
+                                message="m", max_ms=1)])
+        for _ in range(rules_engine.QUARANTINE_OVERRUNS):
+            self.check(index)
+        self.assertIn("skipped for 60 minutes", take_notices()[0])
+        until = get_quarantined_rules()["slow"]["until"]
+        self.assertAlmostEqual(until, time.time() + rules_engine.QUARANTINE_SECONDS, delta=60)
+
+        data = rules_engine._read_quarantine()
+        data["quarantined"]["slow"]["until"] = time.time() - 1
+        rules_engine._save_quarantine(data)
+        self.check(index)  # Checked again once the quarantine is over
+        self.assertEqual(self.stats("slow")["checks"], 4)
+        self.assertEqual(take_notices(), ["▶️ Rule 'slow' is checked again: its quarantine expired."])
+        self.assertEqual(rules_engine._read_quarantine()["quarantined"], {})
+
+    def test_costs_spooled_until_the_next_delta(self):
+        from outcome_tracker import log_outcome_event, log_surface_event
+        index = RuleIndex([Rule(id="shebang", trigger_pattern=r"\.py$",
+                                check_fn="check_python_shebang", message="m")])
+        proof = Path(self.project) / ".proof"
+        with patch("jsonl_utils.os.fsync") as fsync:
+            self.check(index)
+            self.check(index)
+        fsync.assert_not_called()
+        self.assertFalse((proof / "rule_stats.deltas.jsonl").exists())
+        self.assertEqual(self.stats("shebang")["checks"], 2)
+
+        log_surface_event("c1", "/p/a.py", ["shebang"], [], "Edit")
+        log_outcome_event("c1", success=True)
+        deltas = (proof / "rule_stats.deltas.jsonl").read_text().splitlines()
+        self.assertEqual(len(deltas), 1)
+        self.assertEqual(json.loads(deltas[0])["costs"]["shebang"]["checks"], 2)
+        self.assertEqual(self.stats("shebang")["checks"], 2)
+
+    def test_runaway_check_interrupted(self):
+        index = RuleIndex([Rule(id="runaway", trigger_pattern=r"\.py$", check_fn="runaway_check",
+                                message="m", max_ms=5)])
+        start = time.perf_counter()
+        self.assertEqual(self.check(index), [[]])
+        self.assertLess(time.perf_counter() - start, 2.0)
+        self.assertEqual(self.stats("runaway")["overruns"], 1)
+
+    def test_diff_counts_against_the_first_rule(self):
+        def stalled_diff(tool_name, tool_input):
+            time.sleep(0.05)
+        index = RuleIndex([Rule(id="shebang", trigger_pattern=r"\.py$",
+                                check_fn="check_python_shebang", message="m", max_ms=1)])
+        call = ("Edit", {"file_path": "/p/a.py", "old_string": "x",
+                         "new_string": "#!/usr/bin/env python\nx"})
+        with patch("rules_engine.content_view", side_effect=stalled_diff):
+            violations = check_rules_batch([call], index, budgets=True)[0]
+        self.assertEqual([v.rule_id for v in violations], ["python-shebang"])  # Full view
+        self.assertEqual(self.stats("shebang")["overruns"], 1)
+
+    def test_no_budgets_for_plain_batches(self):
+        index = RuleIndex([Rule(id="slow", trigger_pattern=r"\.py$", check_fn="slow_check",
+                                message="m", max_ms=1)])
+        check_rules_batch([("Edit", {"file_path": "/p/a.py", "new_string": "x"})], index)
+        self.assertIsNone(self.stats("slow"))
+
+
 class TestLessonGraduation(unittest.TestCase):
     """Test lesson graduation logic."""
 
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for state_cache.py - snapshot cache for active_context.yaml.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import state_cache
+from state_cache import load_yaml_state
+
+STATE = """objective: "Ship the cache"
+plan:
+  - description: "Write it"
+    status: in_progress
+risks:
+  - risk: "Stale reads"
+"""
+
+
+class StateCacheTestCase(unittest.TestCase):
+    """Base class with an isolated project dir and an old-enough file."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.project = Path(self.temp_dir)
+        self.state_file = self.project / "active_context.yaml"
+        self.patchers = [
+            patch("state_cache.get_project_dir", return_value=self.project),
+            patch("state_cache.get_state_dir", return_value=self.project / ".claude" / "state"),
+        ]
+        for p in self.patchers:
+            p.start()
+        state_cache._memo = None
+        self.write(STATE)
+
+    def tearDown(self):
+        for p in self.patchers:
+            p.stop()
+        state_cache._memo = None
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write(self, content, age=60):
+        """Write the state file with an mtime `age` seconds in the past."""
+        self.state_file.write_text(content)
+        mtime = time.time() - age
+        os.utime(self.state_file, (mtime, mtime))
+
+    def count_parses(self):
+        return patch("state_cache.parse_simple_yaml", wraps=state_cache.parse_simple_yaml)
+
+
+class TestLoad(StateCacheTestCase):
+    """Test results match an uncached parse."""
+
+    def test_missing_file(self):
+        self.state_file.unlink()
+        self.assertIsNone(load_yaml_state())
+
+    def test_same_result_as_parser(self):
+        expected = state_cache.parse_simple_yaml(STATE)
+        self.assertEqual(load_yaml_state(), expected)
+        self.assertEqual(load_yaml_state(), expected)
+
+    def test_returns_fresh_copies(self):
+        load_yaml_state()["plan"].append("mutated")
+        self.assertEqual(len(load_yaml_state()["plan"]), 1)
+
+
+class TestInvalidation(StateCacheTestCase):
+    """Test the cache follows the file."""
+
+    def test_memo_hit_skips_parse(self):
+        load_yaml_state()
+        with self.count_parses() as parse:
+            load_yaml_state()
+        parse.assert_not_called()
+
+    def test_snapshot_shared_across_processes(self):
+        load_yaml_state()
+        state_cache._memo = None  # As seen by a new hook process
+        with self.count_parses() as parse:
+            self.assertEqual(load_yaml_state()["objective"], "Ship the cache")
+        parse.assert_not_called()
+
+    def test_change_invalidates(self):
+        load_yaml_state()
+        self.write(STATE.replace("Ship the cache", "Something else"), age=30)
+        self.assertEqual(load_yaml_state()["objective"], "Something else")
+
+    def test_touch_without_change_reuses_by_hash(self):
+        load_yaml_state()
+        self.write(STATE, age=10)
+        with self.count_parses() as parse:
+            load_yaml_state()
+        parse.assert_not_called()
+
+    def test_recent_same_size_rewrite_detected(self):
+        """Same size, same mtime tick: the content hash catches it."""
+        self.write(STATE, age=0)
+        st = os.stat(self.state_file)
+        load_yaml_state()
+
+        self.state_file.write_text(STATE.replace("Ship", "Skip"))
+        os.utime(self.state_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(load_yaml_state()["objective"], "Skip the cache")
+
+    def test_corrupt_snapshot_ignored(self):
+        load_yaml_state()
+        state_cache._memo = None
+        (self.project / ".claude" / "state" / state_cache.SNAPSHOT_NAME).write_bytes(b"junk")
+        self.assertEqual(load_yaml_state()["objective"], "Ship the cache")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for surface_cache.py - memoized pattern surfacing.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import surface_cache
+from pattern_engine import Pattern, PatternBundle, PatternType
+from pattern_metrics import compute_surface_cache_metrics, format_surface_cache_metrics
+from surface_cache import get_cache_stats, surface_patterns_cached
+
+FILE = "src/app.py"
+
+
+def make_state(step="Refactor app.py", objective="Speed up hooks"):
+    return {
+        "objective": objective,
+        "plan": [{"description": step, "status": "in_progress"}],
+        "risks": [{"risk": "app.py refactor breaks imports", "mitigation": "run tests"}],
+    }
+
+
+def make_bundle(context="ctx", intent_action="file_modify", max_patterns=5, **_):
+    return PatternBundle(
+        context=context,
+        patterns=[Pattern(type=PatternType.RISK, trigger="app.py", content="Risk: imports",
+                          relevance=0.5, source="risk_register", metadata={"status": "active"})],
+        total_found=1,
+        intent_action=intent_action,
+    )
+
+
+class SurfaceCacheTestCase(unittest.TestCase):
+    """Base class with an isolated state dir and a counting surface_patterns."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        patch("surface_cache.get_state_dir", return_value=Path(self.temp_dir)).start()
+        patch("surface_cache._git_head", return_value="abc123").start()
+        self.surface = patch("pattern_engine.surface_patterns", side_effect=make_bundle).start()
+
+    def tearDown(self):
+        patch.stopall()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def lookup(self, state=None, file_path=FILE):
+        state = state or make_state()
+        return surface_patterns_cached(state, file_path, f"{file_path} ctx", "file_modify")
+
+
+class TestCaching(SurfaceCacheTestCase):
+    """Test hits, misses and what invalidates an entry."""
+
+    def test_repeat_lookup_is_a_hit(self):
+        first = self.lookup()
+        second = self.lookup()
+        self.assertEqual(self.surface.call_count, 1)
+        self.assertEqual(second.to_dict(), first.to_dict())
+        self.assertEqual(get_cache_stats()["hit_rate"], 0.5)
+
+    def test_key_parts_invalidate(self):
+        self.lookup()
+        self.lookup(file_path="src/other.py")
+        self.lookup(make_state(step="Write tests"))
+        self.lookup(make_state(objective="Something else"))
+        state = make_state()
+        state["memory"] = [{"trigger": "app", "lesson": "new lesson"}]
+        self.lookup(state)
+        self.assertEqual(self.surface.call_count, 5)
+
+    def test_new_commit_invalidates(self):
+        self.lookup()
+        with patch("surface_cache._git_head", return_value="def456"):
+            self.lookup()
+        self.assertEqual(self.surface.call_count, 2)
+
+    def test_expired_entry_recomputed(self):
+        self.lookup()
+        with patch("surface_cache.time.time", return_value=surface_cache.time.time() + 301):
+            self.lookup()
+        self.assertEqual(self.surface.call_count, 2)
+
+    def test_least_recently_used_evicted(self):
+        with patch("surface_cache.MAX_ENTRIES", 2):
+            self.lookup(file_path="a.py")
+            self.lookup(file_path="b.py")
+            self.lookup(file_path="a.py")  # b.py is now least recently used
+            self.lookup(file_path="c.py")
+            self.assertEqual(get_cache_stats()["entries"], 2)
+            self.lookup(file_path="a.py")
+            self.assertEqual(self.surface.call_count, 3)
+            self.lookup(file_path="b.py")
+            self.assertEqual(self.surface.call_count, 4)
+
+    def test_corrupt_cache_recomputes(self):
+        surface_cache.get_cache_file().write_text("{not json")
+        bundle = self.lookup()
+        self.assertEqual(bundle.patterns[0].type, PatternType.RISK)
+        self.assertEqual(get_cache_stats()["misses"], 1)
+
+
+class TestMetrics(SurfaceCacheTestCase):
+    """Test the hit rate in the metrics report."""
+
+    def test_no_lookups(self):
+        self.assertEqual(compute_surface_cache_metrics()["status"], "no_data")
+
+    def test_report_shows_hit_rate(self):
+        for _ in range(4):
+            self.lookup()
+        report = format_surface_cache_metrics(compute_surface_cache_metrics())
+        self.assertIn("Hit rate: 75% (3 hits / 4 lookups)", report)
+
+
+class TestBundleRoundTrip(unittest.TestCase):
+    """Test PatternBundle serialization used by the cache."""
+
+    def test_from_dict(self):
+        bundle = make_bundle()
+        restored = PatternBundle.from_dict(bundle.to_dict())
+        self.assertEqual(restored, bundle)
+        self.assertIs(restored.patterns[0].type, PatternType.RISK)
+
+
+if __name__ == "__main__":
+    unittest.main()